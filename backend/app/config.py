@@ -43,6 +43,56 @@ class Settings(BaseSettings):
     GOOGLE_CREDENTIALS_PATH: str = "credentials/service_account.json"
     GOOGLE_CREDENTIALS_JSON: str = "" # Full JSON content for deployment
     GOOGLE_SPREADSHEET_ID: str = ""  # Set in .env
+    GOOGLE_API_MAX_CONCURRENCY: int = 8  # Max Google API calls in flight (executor threads)
+    GOOGLE_SHEETS_READS_PER_MINUTE: int = 60  # Sheets read quota per user (0 = unlimited)
+    GOOGLE_SHEETS_WRITES_PER_MINUTE: int = 60  # Sheets write quota per user (0 = unlimited)
+    GOOGLE_DRIVE_REQUESTS_PER_MINUTE: int = 1000  # Drive calls per minute (0 = unlimited)
+    GOOGLE_API_MAX_RETRIES: int = 5  # Retries on 429/5xx before an error is returned
+    GOOGLE_API_BACKOFF_MAX: float = 32  # Longest wait between retries in seconds
+    GOOGLE_HTTP_POOL_SIZE: int = 10  # Keep-alive connections per Google host (>= max concurrency)
+    GOOGLE_HTTP_CONNECT_TIMEOUT: float = 10  # Seconds to open a connection
+    GOOGLE_HTTP_READ_TIMEOUT: float = 60  # Seconds to wait for a response
+    PREFETCH_SHEETS_ON_STARTUP: bool = True  # Warm the sheet cache with one batchGet at boot
+    SHEETS_VERSION_CHECK_INTERVAL: float = 10  # Seconds one Drive version check is reused across sheets
+    SHEETS_SNAPSHOT_ENABLED: bool = True  # Keep a local copy of loaded sheets for warm restarts
+    # Sheets refreshed by reading only new rows (only for sheets nobody edits by hand)
+    SHEETS_APPEND_ONLY: list[str] = []
+    SHEETS_TAIL_FULL_RELOAD_EVERY: int = 10  # Tail refreshes before a full download (0 = never)
+    
+    # Fake Google APIs (offline development and reproducible benchmarks)
+    GOOGLE_API_FAKE: bool = False  # Serve Sheets/Drive from the in-process fake instead of Google
+    FAKE_GOOGLE_LATENCY_MS: float = 0  # Mean latency per call
+    FAKE_GOOGLE_JITTER_MS: float = 0  # Latency varies by up to this much either way
+    FAKE_GOOGLE_ERROR_RATE: float = 0  # Share of calls failing with 429
+    FAKE_GOOGLE_QUOTA_PER_MINUTE: int = 0  # Calls per 60 s before 429s (0 = unlimited)
+    FAKE_GOOGLE_ROWS: int = 100  # Generated rows per sheet
+    FAKE_GOOGLE_SEED: int = 0
+    
+    # Storage
+    STORAGE_BACKEND: str = "sheets"  # "sheets" (Google Sheets) or "sqlite" (local database)
+    SQLITE_PATH: str = "data/bankim.sqlite3"  # Relative to the backend directory
+    SQLITE_MIRROR_TO_SHEETS: bool = True  # Copy SQLite writes to Google Sheets in the background
+    ID_ALLOCATION_MODE: str = "local"  # "local" (single worker) or "reserved" (multi-worker blocks)
+    ID_BLOCK_SIZE: int = 50  # Numbers reserved per block in "reserved" mode
+    
+    # Cache
+    CACHE_TTL_SECONDS: int = 300  # Hard TTL: older entries are never served
+    CACHE_SOFT_TTL_SECONDS: int = 60  # Older entries are served stale and refreshed in the background
+    CACHE_MAX_BYTES: int = 256 * 1024 * 1024  # Ceiling on the estimated size of everything cached
+    CACHE_NAMESPACE_MAX_BYTES: int = 64 * 1024 * 1024  # Default budget per namespace (sheet)
+    # Per-namespace (sheet) overrides of soft_ttl, ttl, max_bytes and priority (JSON in env);
+    # lower priorities are evicted first when the global ceiling is reached
+    CACHE_NAMESPACE_POLICIES: dict[str, dict[str, float]] = {
+        "WorkflowStages": {"soft_ttl": 900, "ttl": 3600, "priority": 2},
+        "Settings": {"soft_ttl": 900, "ttl": 3600, "priority": 2},
+        "PlatingRates": {"soft_ttl": 600, "ttl": 1800, "priority": 2},
+        "InvoiceItems": {"priority": 0},
+        "CostBreakdown": {"priority": 0},
+    }
+    # Cache tier shared by gunicorn workers: "none", "sqlite" (file in TEMP_DIR, one host) or "redis"
+    CACHE_SHARED_BACKEND: str = "none"
+    CACHE_SHARED_REDIS_URL: str = "redis://localhost:6379/0"
+    CACHE_SHARED_POLL_INTERVAL: float = 0.5  # Seconds between checks for other workers' invalidations
     
     # Google Drive Folder IDs (set after creating folders)
     DRIVE_PRODUCTS_FOLDER_ID: str = ""
@@ -73,7 +123,9 @@ def get_settings() -> Settings:
 BASE_DIR = Path(__file__).resolve().parent.parent
 CREDENTIALS_DIR = BASE_DIR / "credentials"
 TEMP_DIR = BASE_DIR / "temp"
+DATA_DIR = BASE_DIR / "data"
 
 # Ensure directories exist
 CREDENTIALS_DIR.mkdir(exist_ok=True)
 TEMP_DIR.mkdir(exist_ok=True)
+DATA_DIR.mkdir(exist_ok=True)
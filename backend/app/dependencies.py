@@ -4,34 +4,132 @@ Provides service instances to route handlers.
 """
 
 from functools import lru_cache
+from typing import Optional
 from fastapi import Depends
 
-from app.config import get_settings, Settings
+from app.config import get_settings, Settings, BASE_DIR, TEMP_DIR
+from app.services.storage_engine import StorageEngine
 from app.services.sheets_service import SheetsService
+from app.services.sqlite_storage import SqliteStorage
 from app.services.drive_service import DriveService
 from app.services.ocr_service import OCRService
 from app.services.cache_service import CacheService
+from app.services.shared_cache import REDIS_AVAILABLE, RedisSharedCache, SharedCache, SqliteSharedCache
+from app.services.id_allocator import IdAllocator
+from app.services.fake_google import FakeGoogle
+from app.services.rate_limiter import GoogleRateLimiter
+from app.services.sheet_snapshot import SheetSnapshot
+
+
+def _shared_cache(settings: Settings) -> Optional[SharedCache]:
+    """Build the cache tier shared by worker processes, if configured."""
+    if settings.CACHE_SHARED_BACKEND == "sqlite":
+        return SqliteSharedCache(TEMP_DIR / "shared_cache.sqlite3")
+    if settings.CACHE_SHARED_BACKEND == "redis":
+        if not REDIS_AVAILABLE:
+            print("⚠️  CACHE_SHARED_BACKEND=redis needs the redis package (pip install redis==5.0.1) - cache not shared")
+            return None
+        return RedisSharedCache(settings.CACHE_SHARED_REDIS_URL)
+    return None
 
 
 @lru_cache()
 def get_cache_service() -> CacheService:
     """Get cached CacheService instance."""
-    return CacheService(default_ttl=300, max_size=1000)
+    settings = get_settings()
+    return CacheService(
+        default_ttl=settings.CACHE_TTL_SECONDS,
+        soft_ttl=settings.CACHE_SOFT_TTL_SECONDS,
+        max_bytes=settings.CACHE_MAX_BYTES,
+        namespace_max_bytes=settings.CACHE_NAMESPACE_MAX_BYTES,
+        policies=settings.CACHE_NAMESPACE_POLICIES,
+        shared=_shared_cache(settings),
+        shared_poll_interval=settings.CACHE_SHARED_POLL_INTERVAL,
+    )
+
+
+@lru_cache()
+def get_fake_google() -> Optional[FakeGoogle]:
+    """Get the in-process fake Google APIs when GOOGLE_API_FAKE is set, seeded with generated data."""
+    settings = get_settings()
+    if not settings.GOOGLE_API_FAKE:
+        return None
+    
+    fake = FakeGoogle(
+        latency_ms=settings.FAKE_GOOGLE_LATENCY_MS,
+        jitter_ms=settings.FAKE_GOOGLE_JITTER_MS,
+        error_rate=settings.FAKE_GOOGLE_ERROR_RATE,
+        quota_per_minute=settings.FAKE_GOOGLE_QUOTA_PER_MINUTE,
+        seed=settings.FAKE_GOOGLE_SEED,
+    )
+    fake.seed_dataset(settings.GOOGLE_SPREADSHEET_ID or "fake-spreadsheet", rows=settings.FAKE_GOOGLE_ROWS)
+    return fake
+
+
+@lru_cache()
+def get_google_rate_limiter() -> GoogleRateLimiter:
+    """Get the Google quota limiter shared by the Sheets and Drive services."""
+    settings = get_settings()
+    return GoogleRateLimiter(
+        sheets_reads_per_minute=settings.GOOGLE_SHEETS_READS_PER_MINUTE,
+        sheets_writes_per_minute=settings.GOOGLE_SHEETS_WRITES_PER_MINUTE,
+        drive_per_minute=settings.GOOGLE_DRIVE_REQUESTS_PER_MINUTE,
+        max_retries=settings.GOOGLE_API_MAX_RETRIES,
+        backoff_max=settings.GOOGLE_API_BACKOFF_MAX,
+    )
+
+
+def _id_allocator(settings: Settings) -> IdAllocator:
+    """Build the record ID allocator configured in settings."""
+    return IdAllocator(
+        mode=settings.ID_ALLOCATION_MODE,
+        block_size=settings.ID_BLOCK_SIZE,
+        state_path=TEMP_DIR / "id_blocks.json",
+    )
 
 
 @lru_cache()
-def get_sheets_service() -> SheetsService:
+def get_google_sheets_service() -> SheetsService:
     """Get cached Google Sheets service instance."""
     settings = get_settings()
     cache = get_cache_service()
     return SheetsService(
         credentials_path=settings.GOOGLE_CREDENTIALS_PATH,
-        spreadsheet_id=settings.GOOGLE_SPREADSHEET_ID,
+        spreadsheet_id=settings.GOOGLE_SPREADSHEET_ID or ("fake-spreadsheet" if settings.GOOGLE_API_FAKE else ""),
         credentials_json=settings.GOOGLE_CREDENTIALS_JSON,
-        cache_service=cache
+        cache_service=cache,
+        max_concurrency=settings.GOOGLE_API_MAX_CONCURRENCY,
+        version_check_interval=settings.SHEETS_VERSION_CHECK_INTERVAL,
+        fake_google=get_fake_google(),
+        rate_limiter=get_google_rate_limiter(),
+        http_pool_size=settings.GOOGLE_HTTP_POOL_SIZE,
+        http_timeout=(settings.GOOGLE_HTTP_CONNECT_TIMEOUT, settings.GOOGLE_HTTP_READ_TIMEOUT),
+        snapshot=(
+            SheetSnapshot(TEMP_DIR / "sheets_snapshot.sqlite3")
+            if settings.SHEETS_SNAPSHOT_ENABLED else None
+        ),
+        id_allocator=_id_allocator(settings),
+        append_only_sheets=settings.SHEETS_APPEND_ONLY,
+        tail_refresh_full_every=settings.SHEETS_TAIL_FULL_RELOAD_EVERY,
     )
 
 
+@lru_cache()
+def get_sheets_service() -> StorageEngine:
+    """
+    Get the configured storage backend.
+    Google Sheets by default; SQLite (optionally mirrored to Sheets) when STORAGE_BACKEND=sqlite.
+    """
+    settings = get_settings()
+    if settings.STORAGE_BACKEND == "sqlite":
+        return SqliteStorage(
+            path=BASE_DIR / settings.SQLITE_PATH,
+            mirror=get_google_sheets_service() if settings.SQLITE_MIRROR_TO_SHEETS else None,
+            id_allocator=_id_allocator(settings),
+        )
+    return get_google_sheets_service()
+
+
 @lru_cache()
 def get_drive_service() -> DriveService:
     """Get cached Google Drive service instance."""
@@ -41,7 +139,11 @@ def get_drive_service() -> DriveService:
         products_folder_id=settings.DRIVE_PRODUCTS_FOLDER_ID,
         invoices_folder_id=settings.DRIVE_INVOICES_FOLDER_ID,
         specs_folder_id=settings.DRIVE_SPECS_FOLDER_ID,
-        credentials_json=settings.GOOGLE_CREDENTIALS_JSON
+        credentials_json=settings.GOOGLE_CREDENTIALS_JSON,
+        fake_google=get_fake_google(),
+        rate_limiter=get_google_rate_limiter(),
+        http_pool_size=settings.GOOGLE_HTTP_POOL_SIZE,
+        http_timeout=(settings.GOOGLE_HTTP_CONNECT_TIMEOUT, settings.GOOGLE_HTTP_READ_TIMEOUT),
     )
 
 
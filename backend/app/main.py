@@ -7,6 +7,7 @@ from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from contextlib import asynccontextmanager
+import asyncio
 import traceback
 
 from app.config import get_settings
@@ -44,9 +45,32 @@ async def lifespan(app: FastAPI):
     else:
         print(f"   ✅ Spreadsheet ID configured")
     
+    # Warm the sheet cache so the first requests don't pay sequential round-trips.
+    # A saved snapshot is served right away and checked against Google in the background.
+    from app.dependencies import get_cache_service, get_drive_service, get_sheets_service
+    sheets = get_sheets_service()
+    revalidation = None
+    restored = sheets.restore_snapshot()
+    if restored:
+        print(f"   ✅ Restored {restored} sheets from snapshot (revalidating in background)")
+        revalidation = asyncio.create_task(sheets.revalidate())
+    elif settings.PREFETCH_SHEETS_ON_STARTUP:
+        loaded = await sheets.load_all()
+        if loaded:
+            print(f"   ✅ Prefetched {loaded} sheets")
+    
     yield
     # Shutdown
     print("👋 Shutting down...")
+    if revalidation and not revalidation.done():
+        revalidation.cancel()
+    await sheets.flush()
+    sheets.close()
+    if get_drive_service.cache_info().currsize:  # only if a request used Drive
+        get_drive_service().close()
+    cache = get_cache_service()
+    await cache.flush()
+    cache.close()
 
 
 # Create FastAPI app
@@ -67,6 +91,16 @@ app.add_middleware(
 )
 
 
+# Read each sheet at most once per request, from a consistent snapshot
+@app.middleware("http")
+async def sheet_read_scope(request: Request, call_next):
+    """Run each API request inside a storage read scope."""
+    from app.dependencies import get_sheets_service
+    
+    async with get_sheets_service().read_scope():
+        return await call_next(request)
+
+
 # Global exception handler to ensure CORS headers are included on errors
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
@@ -112,21 +146,28 @@ async def root():
 @app.get("/api/health", tags=["Health"])
 async def health_check():
     """Detailed health check with credential validation."""
-    from app.dependencies import get_sheets_service, get_drive_service
+    from app.dependencies import get_sheets_service, get_google_sheets_service, get_drive_service
     
     settings = get_settings()
-    sheets_service = get_sheets_service()
+    storage = get_sheets_service()
+    sheets_service = get_google_sheets_service()
     drive_service = get_drive_service()
     
     return {
         "status": "healthy",
         "services": {
             "api": True,
+            "storage_backend": settings.STORAGE_BACKEND,
+            "storage": storage.available,
             "google_sheets": sheets_service.service is not None,
             "google_drive": drive_service.service is not None,
             "credentials_configured": bool(settings.GOOGLE_CREDENTIALS_JSON or settings.GOOGLE_CREDENTIALS_PATH),
             "spreadsheet_configured": bool(settings.GOOGLE_SPREADSHEET_ID),
         },
+        "google_api": {
+            "sheets": sheets_service.executor.stats() if sheets_service.executor else None,
+            "drive": drive_service.executor.stats() if drive_service.executor else None,
+        },
         "config": {
             "cors_origins": settings.CORS_ORIGINS,
         }
@@ -136,18 +177,19 @@ async def health_check():
 @app.get("/api/debug/sheets", tags=["Debug"])
 async def debug_sheets():
     """Debug endpoint to see raw sheet data."""
-    from app.dependencies import get_sheets_service
+    from app.dependencies import get_google_sheets_service
     
-    sheets = get_sheets_service()
+    sheets = get_google_sheets_service()
     if not sheets.service:
         return {"error": "Sheets service not available"}
     
     try:
         # Get raw data from Dealers sheet
-        result = sheets.service.spreadsheets().values().get(
+        request = sheets.service.spreadsheets().values().get(
             spreadsheetId=sheets.spreadsheet_id,
             range="Dealers!A1:Z10",  # First 10 rows including header
-        ).execute()
+        )
+        result = await sheets.executor.execute(request)
         
         return {
             "spreadsheet_id": sheets.spreadsheet_id,
@@ -2,8 +2,8 @@
 Cache Management API Router - Monitor and control caching.
 """
 
-from fastapi import APIRouter, HTTPException
-from app.dependencies import get_cache_service
+from fastapi import APIRouter, HTTPException, Query
+from app.dependencies import get_cache_service, get_sheets_service
 
 
 router = APIRouter()
@@ -16,20 +16,29 @@ async def get_cache_stats():
     return cache.get_stats()
 
 
+@router.get("/stats/detail")
+async def get_cache_stats_detail(top: int = Query(10, ge=1, le=100, description="Hot and cold keys to list")):
+    """Get per-namespace and per-key cache analytics, with the hottest and coldest keys."""
+    cache = get_cache_service()
+    return cache.get_detailed_stats(top)
+
+
 @router.post("/clear")
 async def clear_all_cache():
-    """Clear all cache entries."""
+    """Clear all cache entries (the next reads download every sheet again)."""
     cache = get_cache_service()
     cache.clear()
+    get_sheets_service().invalidate()
     return {"message": "All cache cleared successfully"}
 
 
 @router.post("/clear/{sheet_name}")
 async def clear_sheet_cache(sheet_name: str):
-    """Clear cache for a specific sheet."""
+    """Clear cache for a specific sheet (each sheet is its own cache namespace)."""
     cache = get_cache_service()
-    cache.delete("sheets", sheet_name)
-    return {"message": f"Cache cleared for sheet: {sheet_name}"}
+    count = cache.invalidate_namespace(sheet_name)
+    get_sheets_service().invalidate([sheet_name])
+    return {"message": f"Cache cleared for sheet: {sheet_name}", "entries_cleared": count}
 
 
 @router.post("/refresh")
@@ -40,4 +49,5 @@ async def refresh_cache():
     """
     cache = get_cache_service()
     cache.clear()
+    get_sheets_service().invalidate()
     return {"message": "Cache refreshed successfully"}
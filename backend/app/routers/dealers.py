@@ -30,11 +30,11 @@ async def list_dealers(
     """List all dealers with optional filtering."""
     sheets = get_sheets_service()
     
-    # Check if Google Sheets service is available
-    if not sheets.service:
+    # Check if the storage backend is available
+    if not sheets.available:
         raise HTTPException(
             status_code=503,
-            detail="Google Sheets service not available. Check server credentials configuration."
+            detail="Storage service not available. Check server credentials configuration."
         )
     
     dealers = await sheets.get_dealers(dealer_type.value if dealer_type else None)
@@ -93,8 +93,8 @@ async def create_dealer(dealer: DealerCreate):
     sheets = get_sheets_service()
     
     # Get existing codes and generate new one
-    dealers = await sheets.get_dealers()
-    existing_codes = [d.get("dealer_code", "") for d in dealers]
+    codes = await sheets.get_columns(sheets.SHEETS["dealers"], ["dealer_code"])
+    existing_codes = [code or "" for (code,) in codes]
     
     dealer_code = CodeGenerator.generate_dealer_code(
         dealer.dealer_type.value,
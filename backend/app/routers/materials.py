@@ -33,7 +33,7 @@ async def list_materials(
     if low_stock:
         materials = [
             m for m in materials
-            if float(m.get("current_stock", 0) or 0) <= float(m.get("min_stock_alert", 0) or 0)
+            if (m.get("current_stock") or 0) <= (m.get("min_stock_alert") or 0)
         ]
     
     return MaterialListResponse(total=len(materials), materials=materials)
@@ -113,7 +113,7 @@ async def purchase_material(material_id: str, purchase: MaterialPurchaseRequest)
         raise HTTPException(status_code=404, detail="Material not found")
         
     # 2. Update Stock & Last Price
-    new_stock = float(material.get("current_stock", 0) or 0) + purchase.quantity
+    new_stock = (material.get("current_stock") or 0) + purchase.quantity
     
     update_data = {
         "current_stock": new_stock,
@@ -71,12 +71,12 @@ async def assign_job(assignment: PlatingAssignment):
     # For now, if no rate found, default to 0 or error.
     rate_val = 0.0
     if relevant_rate:
-        rate_val = float(relevant_rate["rate_per_kg"])
+        rate_val = relevant_rate["rate_per_kg"] or 0
     else:
         # Try finding generic rate
         generic = next((r for r in rates if r["plating_type"] == assignment.plating_type.value and not r.get("vendor_dealer_id")), None)
         if generic:
-            rate_val = float(generic["rate_per_kg"])
+            rate_val = generic["rate_per_kg"] or 0
             
     if rate_val == 0:
          # Optional: Warning or Error. 
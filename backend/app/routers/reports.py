@@ -86,7 +86,7 @@ async def sales_report(
         if inv_date and str(date_from) <= inv_date <= str(date_to):
             filtered.append(inv)
     
-    total_sales = sum(float(inv.get("grand_total", 0) or 0) for inv in filtered)
+    total_sales = sum(inv.get("grand_total") or 0 for inv in filtered)
     total_invoices = len(filtered)
     avg_value = total_sales / total_invoices if total_invoices > 0 else 0
     
@@ -101,11 +101,11 @@ async def sales_report(
             total_items += int(item.get("quantity", 0) or 0)
             
             product_id = item.get("product_id", "")
-            amount = float(item.get("total_price", 0) or 0)
+            amount = item.get("total_price") or 0
             product_sales[product_id] = product_sales.get(product_id, 0) + amount
         
         dealer_id = inv.get("dealer_id", "")
-        inv_total = float(inv.get("grand_total", 0) or 0)
+        inv_total = inv.get("grand_total") or 0
         dealer_sales[dealer_id] = dealer_sales.get(dealer_id, 0) + inv_total
     
     # Top products and dealers
@@ -149,14 +149,16 @@ async def purchase_report(
     costs = {"Material": 0, "Making": 0, "Finishing": 0, "Packing": 0}
     counts = {"Material": 0, "Making": 0, "Finishing": 0, "Packing": 0}
     
-    for inv_type in costs.keys():
-        invoices = await sheets.get_invoices(inv_type)
-        
-        for inv in invoices:
-            inv_date = inv.get("invoice_date", "")
-            if inv_date and str(date_from) <= inv_date <= str(date_to):
-                costs[inv_type] += float(inv.get("grand_total", 0) or 0)
-                counts[inv_type] += 1
+    # Only the columns needed for the aggregate
+    invoices = await sheets.get_columns(
+        sheets.SHEETS["invoices"],
+        ["invoice_date", "invoice_type", "grand_total"],
+    )
+    
+    for inv_date, inv_type, grand_total in invoices:
+        if inv_type in costs and inv_date and str(date_from) <= inv_date <= str(date_to):
+            costs[inv_type] += grand_total or 0
+            counts[inv_type] += 1
     
     total = sum(costs.values())
     
@@ -185,23 +187,21 @@ async def profit_report(
     if not date_from:
         date_from = date_to - timedelta(days=30)
     
-    # Get sales
-    sales_invoices = await sheets.get_invoices("Sales")
+    # Get sales and costs in one pass over the needed columns
+    invoices = await sheets.get_columns(
+        sheets.SHEETS["invoices"],
+        ["invoice_date", "invoice_type", "grand_total"],
+    )
     total_revenue = 0
-    
-    for inv in sales_invoices:
-        inv_date = inv.get("invoice_date", "")
-        if inv_date and str(date_from) <= inv_date <= str(date_to):
-            total_revenue += float(inv.get("grand_total", 0) or 0)
-    
-    # Get costs
     total_cost = 0
-    for inv_type in ["Material", "Making", "Finishing", "Packing"]:
-        invoices = await sheets.get_invoices(inv_type)
-        for inv in invoices:
-            inv_date = inv.get("invoice_date", "")
-            if inv_date and str(date_from) <= inv_date <= str(date_to):
-                total_cost += float(inv.get("grand_total", 0) or 0)
+    
+    for inv_date, inv_type, grand_total in invoices:
+        if not inv_date or not (str(date_from) <= inv_date <= str(date_to)):
+            continue
+        if inv_type == "Sales":
+            total_revenue += grand_total or 0
+        elif inv_type in ("Material", "Making", "Finishing", "Packing"):
+            total_cost += grand_total or 0
     
     gross_profit = total_revenue - total_cost
     profit_margin = (gross_profit / total_revenue * 100) if total_revenue > 0 else 0
@@ -213,8 +213,8 @@ async def profit_report(
             {
                 "product_id": p.get("product_id"),
                 "name": p.get("name"),
-                "profit": float(p.get("profit", 0) or 0),
-                "profit_margin": float(p.get("profit_margin", 0) or 0),
+                "profit": p.get("profit") or 0,
+                "profit_margin": p.get("profit_margin") or 0,
             }
             for p in products
         ],
@@ -243,7 +243,7 @@ async def dealer_balance_report():
     payables = []     # BUY dealers with balance due from us
     
     for dealer in dealers:
-        balance = float(dealer.get("current_balance", 0) or 0)
+        balance = dealer.get("current_balance") or 0
         dealer_type = dealer.get("dealer_type", "")
         
         dealer_info = {
@@ -278,7 +278,7 @@ async def low_stock_report():
     
     low_stock = []
     for product in products:
-        stock_qty = int(product.get("stock_qty", 0) or 0)
+        stock_qty = product.get("stock_qty") or 0
         min_alert = int(product.get("min_stock_alert", 5) or 5)
         
         if stock_qty <= min_alert:
@@ -1,6 +1,8 @@
 """Services package."""
 
+from app.services.storage_engine import StorageEngine
 from app.services.sheets_service import SheetsService
+from app.services.sqlite_storage import SqliteStorage
 from app.services.drive_service import DriveService
 from app.services.ocr_service import OCRService
 from app.services.cost_calculator import CostCalculator
@@ -1,92 +1,607 @@
 """
 Cache Service - Centralized caching for improved performance.
-Implements TTL-based in-memory caching for Google Sheets data.
+Implements TTL-based in-memory caching for Google Sheets data, with
+single-flight loading so concurrent misses share one fetch, and
+stale-while-revalidate: past its soft TTL an entry is still served while
+a background load refreshes it; past its hard TTL it is gone.
+Each namespace (one per sheet) is a separate sub-cache with its own
+policy (TTLs, byte budget, priority) and statistics. Entries are sized
+by an approximate byte estimate, and a global ceiling evicts from the
+lowest-priority namespaces first, so memory stays bounded as sheets grow.
+An optional shared tier (see shared_cache) lets gunicorn workers serve
+each other's entries and see each other's invalidations. Its I/O and
+(de)serialization run in worker threads, never on the event loop.
+Per-key counters (requests, load times, sizes) and removal reasons feed
+get_detailed_stats(), which ranks hot and cold keys for tuning TTLs and
+prefetch lists.
 """
 
-from typing import Any, Optional
+from typing import Any, Awaitable, Callable, Optional
 from datetime import datetime
-import hashlib
+from itertools import count, islice
+import asyncio
 import json
+import pickle
+import sys
+import time
+import zlib
+
+from app.services.shared_cache import SharedCache
 
 try:
-    from cachetools import TTLCache
+    from cachetools import Cache, TTLCache
     CACHETOOLS_AVAILABLE = True
 except ImportError:
     CACHETOOLS_AVAILABLE = False
     print("⚠️  cachetools not installed - caching will be disabled. Install with: pip install cachetools==5.3.2")
-    # Fallback dummy cache class
+    # Fallback dummy cache classes
+    Cache = dict
+    
     class TTLCache(dict):
         """Dummy TTLCache when cachetools is not available."""
-        def __init__(self, maxsize, ttl):
+        def __init__(self, maxsize, ttl, getsizeof=None):
             super().__init__()
             self.maxsize = maxsize
             self.ttl = ttl
+            self.currsize = 0
+
+
+# Operation counters kept per namespace
+COUNTERS = (
+    "hits", "stale_hits", "misses", "shared_hits", "sets", "deletes", "remote_deletes",
+    "expired", "ceiling_evictions", "rejected", "loads", "coalesced", "background_refreshes",
+)
+
+# Keys with analytics kept per namespace (least recently used are forgotten first)
+MAX_TRACKED_KEYS = 500
+
+# Compressed bytes fed to the decompressor per read from a shared entry
+INFLATE_CHUNK = 64 * 1024
+
+
+def approximate_size(value: Any, sample: int = 50) -> int:
+    """
+    Estimate the memory held by a value in bytes.
+    
+    Containers are measured from a sample of their items and extrapolated;
+    objects with an `approximate_size()` method (e.g. SheetTable) measure
+    themselves.
+    """
+    measure = getattr(value, "approximate_size", None)
+    if callable(measure) and not isinstance(value, type):
+        return measure()
+    
+    size = sys.getsizeof(value)
+    if isinstance(value, dict) and value:
+        items = list(islice(value.items(), sample))
+        per_item = sum(approximate_size(k) + approximate_size(v) for k, v in items) / len(items)
+        size += int(per_item * len(value))
+    elif isinstance(value, (list, tuple, set, frozenset)) and value:
+        items = list(islice(value, sample))
+        size += int(sum(approximate_size(item) for item in items) / len(items) * len(value))
+    return size
+
+
+class _DeflatingWriter:
+    """
+    File-like sink that compresses pickle output as it is written.
+    
+    The C pickler writes one ~64 KiB frame per call; each call runs Python
+    code, which lets the event loop thread take the GIL back, so pickling a
+    large table in a worker thread doesn't stall requests for its whole duration.
+    """
+    
+    def __init__(self):
+        self._deflate = zlib.compressobj(1)
+        self._parts: list[bytes] = []
+    
+    def write(self, data) -> int:
+        self._parts.append(self._deflate.compress(data))
+        return len(data)
+    
+    def getvalue(self) -> bytes:
+        self._parts.append(self._deflate.flush())
+        return b"".join(self._parts)
+
+
+class _InflatingReader:
+    """File-like source that decompresses a shared entry as the unpickler reads it (see _DeflatingWriter)."""
+    
+    def __init__(self, data: bytes):
+        self._inflate = zlib.decompressobj()
+        self._data = memoryview(data)
+        self._offset = 0
+        self._buffer = bytearray()
+    
+    def _fill(self, size: int) -> None:
+        """Decompress until `size` bytes are buffered or the input is exhausted."""
+        while len(self._buffer) < size:
+            pending = self._inflate.unconsumed_tail
+            if not pending:
+                if self._offset >= len(self._data):
+                    return
+                pending = self._data[self._offset:self._offset + INFLATE_CHUNK]
+                self._offset += INFLATE_CHUNK
+            self._buffer += self._inflate.decompress(pending, max(size - len(self._buffer), INFLATE_CHUNK))
+    
+    def read(self, size: int = -1) -> bytes:
+        self._fill(size if size >= 0 else sys.maxsize)
+        size = len(self._buffer) if size < 0 else min(size, len(self._buffer))
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+    
+    def readline(self) -> bytes:
+        while b"\n" not in self._buffer:
+            before = len(self._buffer)
+            self._fill(before + 1)
+            if len(self._buffer) == before:
+                break
+        end = self._buffer.find(b"\n") + 1
+        return self.read(end if end else -1)
+
+
+def _encode(data: Any) -> bytes:
+    """Pickle and compress a value for the shared tier."""
+    sink = _DeflatingWriter()
+    pickle.Pickler(sink, pickle.HIGHEST_PROTOCOL).dump(data)
+    return sink.getvalue()
+
+
+def _decode(value: bytes) -> Any:
+    """Decompress and unpickle a value from the shared tier."""
+    return pickle.Unpickler(_InflatingReader(value)).load()
+
+
+class _Entry:
+    """A cached value, its estimated size in bytes and when it was stored."""
+    
+    __slots__ = ("data", "size", "stored_at")
+    
+    def __init__(self, data: Any, stored_at: Optional[float] = None):
+        self.data = data
+        self.size = approximate_size(data)
+        self.stored_at = time.monotonic() if stored_at is None else stored_at
+
+
+class _KeyStats:
+    """Request counters, load time and size of one cache key."""
+    
+    __slots__ = ("hits", "stale_hits", "misses", "loads", "load_seconds", "bytes", "last_access")
+    
+    def __init__(self):
+        self.hits = self.stale_hits = self.misses = self.loads = self.bytes = 0
+        self.load_seconds = 0.0
+        self.last_access = time.time()
+    
+    @property
+    def requests(self) -> int:
+        return self.hits + self.stale_hits + self.misses
+    
+    def average_load(self) -> Optional[float]:
+        """Average seconds a load of this key took, or None if never timed."""
+        return self.load_seconds / self.loads if self.loads else None
+
+
+class _EntryCache(TTLCache):
+    """TTLCache sized in bytes that reports entries evicted to make room and counts expiries."""
+    
+    def __init__(self, maxsize: int, ttl: float, on_evict: Callable[[str], None]):
+        super().__init__(maxsize=maxsize, ttl=ttl, getsizeof=lambda entry: entry.size)
+        self.on_evict = on_evict
+        self.evictions = 0
+        self.expirations = 0
+        self._clearing = False
+    
+    def expire(self, time=None):
+        # TTLCache drops expired entries lazily here, without going through popitem()
+        stored = Cache.__len__(self)
+        super().expire(time)
+        self.expirations += stored - Cache.__len__(self)
+    
+    def __setitem__(self, key, entry):
+        # Drop the old value first so replacing an entry never evicts the entry itself
+        self.pop(key, None)
+        super().__setitem__(key, entry)
+    
+    def popitem(self):
+        key, entry = super().popitem()
+        if not self._clearing:
+            self.evictions += 1
+            self.on_evict(key)
+        return key, entry
+    
+    def clear(self):
+        # MutableMapping.clear() empties the cache through popitem(); those aren't evictions
+        self._clearing = True
+        try:
+            super().clear()
+        finally:
+            self._clearing = False
+
+
+class _Namespace:
+    """Policy, entries, statistics and generation counter of one cache namespace."""
+    
+    def __init__(self, soft_ttl: float, ttl: float, max_bytes: int, priority: int, on_evict):
+        self.soft_ttl = soft_ttl
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.priority = priority  # lower priorities are evicted first under the global ceiling
+        self.entries = _EntryCache(max_bytes, ttl, on_evict)
+        self.generation = 0  # bumped on invalidation; loads started earlier don't store results
+        self.stats = dict.fromkeys(COUNTERS, 0)
+        self.keys: dict[str, _KeyStats] = {}
+        self.load_seconds = 0.0  # total time of timed loads
+        self.timed_loads = 0
+        self.saved_seconds = 0.0  # estimated load time avoided by serving from cache
+    
+    def key_stats(self, key: str) -> _KeyStats:
+        """Get (or start) the analytics of a key, marking it recently used."""
+        stats = self.keys.pop(key, None)
+        if stats is None:
+            stats = _KeyStats()
+            if len(self.keys) >= MAX_TRACKED_KEYS:
+                del self.keys[next(iter(self.keys))]
+        self.keys[key] = stats
+        return stats
+    
+    def average_load(self) -> Optional[float]:
+        """Average seconds a load in this namespace took, or None if never timed."""
+        return self.load_seconds / self.timed_loads if self.timed_loads else None
+    
+    def served(self, key: str) -> None:
+        """Credit the load time avoided by serving `key` without loading it."""
+        average = self.key_stats(key).average_load()
+        self.saved_seconds += average if average is not None else (self.average_load() or 0.0)
 
 
 class CacheService:
     """Service for managing application-wide caching."""
     
-    def __init__(self, default_ttl: int = 300, max_size: int = 1000):
+    def __init__(
+        self,
+        default_ttl: int = 300,
+        soft_ttl: Optional[float] = None,
+        max_bytes: int = 256 * 1024 * 1024,
+        namespace_max_bytes: int = 64 * 1024 * 1024,
+        policies: Optional[dict[str, dict]] = None,
+        shared: Optional[SharedCache] = None,
+        shared_poll_interval: float = 0.5,
+    ):
         """
         Initialize cache service.
         
         Args:
-            default_ttl: Time-to-live in seconds (default: 300s / 5 minutes)
-            max_size: Maximum number of cache entries (default: 1000)
+            default_ttl: Hard time-to-live in seconds (default: 300s / 5 minutes)
+            soft_ttl: Age in seconds after which entries are served stale and
+                      refreshed in the background (default: same as default_ttl, i.e. off)
+            max_bytes: Ceiling on the estimated size of all entries together
+            namespace_max_bytes: Default byte budget of each namespace
+            policies: Per-namespace overrides, e.g.
+                      {"WorkflowStages": {"soft_ttl": 1800, "ttl": 3600, "max_bytes": 1048576, "priority": 2}}
+                      (priority defaults to 1; lower priorities are evicted first)
+            shared: Second tier shared with other workers (None = this process only)
+            shared_poll_interval: Seconds between checks for other workers' invalidations
         """
         if not CACHETOOLS_AVAILABLE:
             print("⚠️  Cache service initialized in fallback mode (no TTL support)")
         
-        self.cache = TTLCache(maxsize=max_size, ttl=default_ttl)
         self.default_ttl = default_ttl
+        self.soft_ttl = min(soft_ttl, default_ttl) if soft_ttl is not None else default_ttl
+        self.max_bytes = max_bytes
+        self.namespace_max_bytes = namespace_max_bytes
+        self.policies = policies or {}
         self.enabled = CACHETOOLS_AVAILABLE
-        self.stats = {
-            "hits": 0,
-            "misses": 0,
-            "sets": 0,
-            "deletes": 0,
-        }
+        self.namespaces: dict[str, _Namespace] = {}
+        self._inflight: dict[tuple[str, str], asyncio.Future] = {}  # (namespace, key) -> running load
+        self._eviction_listeners: list[Callable[[str, str], None]] = []
+        self.global_evictions = 0
+        self.shared = shared
+        self.shared_poll_interval = shared_poll_interval
+        self._polled = 0.0
+        self.remote_invalidations = 0
+        self._poller: Optional[asyncio.Task] = None
+        self._outbox: Optional[asyncio.Queue] = None  # shared tier writes, applied in order off the loop
+        self._outbox_task: Optional[asyncio.Task] = None
+        self._changes = count(1)
+        self._versions: dict[tuple[str, str], int] = {}  # (namespace, key) -> change number; stale shares are skipped
+    
+    def ttls(self, namespace: str) -> tuple[float, float]:
+        """Get the (soft, hard) TTL in seconds for a namespace."""
+        ns = self._namespace(namespace)
+        return ns.soft_ttl, ns.ttl
+    
+    def _namespace(self, namespace: str) -> _Namespace:
+        """Get a namespace's sub-cache, creating it from its policy on first use."""
+        ns = self.namespaces.get(namespace)
+        if ns is None:
+            policy = self.policies.get(namespace, {})
+            ttl = policy.get("ttl", self.default_ttl)
+            ns = self.namespaces[namespace] = _Namespace(
+                soft_ttl=min(policy.get("soft_ttl", self.soft_ttl), ttl),
+                ttl=ttl,
+                max_bytes=int(policy.get("max_bytes", self.namespace_max_bytes)),
+                priority=int(policy.get("priority", 1)),
+                on_evict=lambda key: self._evicted(namespace, key),
+            )
+        return ns
+    
+    def add_eviction_listener(self, listener: Callable[[str, str], None]) -> None:
+        """
+        Call `listener(namespace, key)` whenever an entry is evicted to stay
+        within a byte budget (not on expiry or explicit deletes), so owners of
+        related data can release it too.
+        """
+        self._eviction_listeners.append(listener)
+    
+    def _evicted(self, namespace: str, key: str) -> None:
+        """Notify listeners that an entry was evicted."""
+        for listener in self._eviction_listeners:
+            listener(namespace, key)
+    
+    def _enforce_ceiling(self, keep: tuple[str, str]) -> None:
+        """
+        Evict least recently used entries, lowest priority and largest namespaces
+        first, until the total estimated size fits under max_bytes. The entry
+        just stored (`keep`) is never evicted by its own insertion.
+        """
+        total = sum(ns.entries.currsize for ns in self.namespaces.values())
+        while total > self.max_bytes:
+            candidates = [
+                (ns.priority, -ns.entries.currsize, name)
+                for name, ns in self.namespaces.items()
+                if len(ns.entries) > (1 if name == keep[0] else 0)
+            ]
+            if not candidates:
+                return
+            ns = self.namespaces[min(candidates)[2]]
+            before = ns.entries.currsize
+            ns.entries.popitem()
+            ns.stats["ceiling_evictions"] += 1
+            self.global_evictions += 1
+            total -= before - ns.entries.currsize
     
-    def _make_key(self, namespace: str, identifier: Any) -> str:
+    def _make_key(self, identifier: Any) -> str:
         """
-        Create a cache key from namespace and identifier.
+        Create a cache key (unique within a namespace) from an identifier.
         
         Args:
-            namespace: Category of data (e.g., 'dealers', 'designs')
             identifier: Unique identifier (can be dict, string, etc.)
         
         Returns:
-            Hash-based cache key
+            String cache key
         """
         if isinstance(identifier, dict):
-            identifier = json.dumps(identifier, sort_keys=True)
-        elif not isinstance(identifier, str):
-            identifier = str(identifier)
+            return json.dumps(identifier, sort_keys=True)
+        if not isinstance(identifier, str):
+            return str(identifier)
+        return identifier
+    
+    def _sync(self) -> None:
+        """
+        Make sure invalidations published by other workers are applied: by a
+        background poller inside an event loop, otherwise (scripts) by polling
+        here at most every shared_poll_interval.
+        """
+        if self.shared is None:
+            return
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            if time.monotonic() - self._polled >= self.shared_poll_interval:
+                self._polled = time.monotonic()
+                self._apply_invalidations(self.shared.poll())
+            return
+        if self._poller is None or self._poller.done():
+            self._poller = asyncio.create_task(self._poll_worker())
+    
+    async def _poll_worker(self) -> None:
+        """Poll the shared tier for other workers' invalidations until cancelled."""
+        while True:
+            try:
+                await self.poll_shared()
+            except Exception as e:
+                print(f"⚠️  Shared cache poll failed: {e}")
+            await asyncio.sleep(self.shared_poll_interval)
+    
+    async def poll_shared(self) -> None:
+        """Apply the invalidations other workers published since the last poll."""
+        if self.shared is not None:
+            self._apply_invalidations(await asyncio.to_thread(self.shared.poll))
+    
+    def _apply_invalidations(self, messages: list[tuple[Optional[str], Optional[str]]]) -> None:
+        """Drop the local copies other workers replaced or deleted."""
+        for namespace, key in messages:
+            self.remote_invalidations += 1
+            for name in ([namespace] if namespace is not None else list(self.namespaces)):
+                self._drop(name, key, counter="remote_deletes")
+    
+    def _send(self, operation: Callable[[], None]) -> None:
+        """
+        Queue a shared tier write. Writes run one at a time in a worker thread,
+        in the order they were queued; outside an event loop they run immediately.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            operation()
+            return
+        if self._outbox_task is None or self._outbox_task.done():
+            self._outbox = asyncio.Queue()
+            self._outbox_task = asyncio.create_task(self._outbox_worker())
+        self._outbox.put_nowait(operation)
+    
+    async def _outbox_worker(self) -> None:
+        """Apply queued shared tier writes until cancelled."""
+        while True:
+            operation = await self._outbox.get()
+            try:
+                await asyncio.to_thread(operation)
+            except Exception as e:
+                print(f"⚠️  Shared cache write failed: {e}")
+            finally:
+                self._outbox.task_done()
+    
+    async def flush(self) -> None:
+        """Wait until every queued shared tier write has been applied."""
+        if self._outbox is not None and self._outbox_task is not None and not self._outbox_task.done():
+            await self._outbox.join()
+    
+    def _changed(self, namespace: str, key: str) -> int:
+        """Record a change of a key; queued shares of earlier versions are skipped."""
+        version = self._versions[(namespace, key)] = next(self._changes)
+        return version
+    
+    def _share(self, namespace: str, key: str, entry: _Entry) -> None:
+        """Copy an entry to the shared tier (in the background), keeping its age."""
+        if self.shared is None:
+            return
+        ns = self._namespace(namespace)
+        version, generation = self._changed(namespace, key), ns.generation
+        stored_at = time.time() - (time.monotonic() - entry.stored_at)
+        ttl = ns.ttl
+        
+        def current() -> bool:
+            return self._versions.get((namespace, key)) == version and ns.generation == generation
+        
+        def share() -> None:
+            if not current():
+                return  # replaced or dropped since
+            try:
+                value = _encode(entry.data)
+            except RuntimeError:
+                return  # changed in place while pickling; the change queues its own invalidation
+            except (pickle.PicklingError, TypeError, AttributeError) as e:
+                print(f"⚠️  Not sharing {namespace}:{key}: {e}")
+                return
+            if current():
+                self.shared.set(namespace, key, value, stored_at, ttl)
+        
+        self._send(share)
+    
+    def _read_shared(self, namespace: str, key: str, max_age: float) -> Optional[tuple[Any, float]]:
+        """Fetch and unpickle a shared entry no older than `max_age` (runs in a worker thread)."""
+        found = self.shared.get(namespace, key)
+        if found is None:
+            return None
+        
+        value, stored_at = found
+        if time.time() - stored_at > max_age:
+            return None
+        try:
+            return _decode(value), stored_at
+        except Exception as e:
+            print(f"⚠️  Could not read shared entry {namespace}:{key}: {e}")
+            return None
+    
+    async def _from_shared(self, namespace: str, key: str) -> Optional[_Entry]:
+        """
+        Fetch an entry another worker stored within its soft TTL and keep a
+        local copy. Entries changed locally while it was being read are ignored.
+        """
+        ns = self._namespace(namespace)
+        version, generation = self._versions.get((namespace, key)), ns.generation
+        found = await asyncio.to_thread(self._read_shared, namespace, key, ns.soft_ttl)
+        if found is None or self._versions.get((namespace, key)) != version or ns.generation != generation:
+            return None
         
-        key_string = f"{namespace}:{identifier}"
-        return hashlib.md5(key_string.encode()).hexdigest()
+        data, stored_at = found
+        entry = _Entry(data, stored_at=time.monotonic() - max(0.0, time.time() - stored_at))
+        ns.stats["shared_hits"] += 1
+        try:
+            ns.entries[key] = entry
+        except ValueError:
+            return entry  # Too large to keep locally; serve it once
+        self._enforce_ceiling((namespace, key))
+        return entry
+    
+    def _entry(self, namespace: str, identifier: Any) -> tuple[str, Optional[_Entry], float]:
+        """
+        Get a key, its entry if within its hard TTL and its age in seconds
+        (expired entries are dropped). The shared tier is consulted by loads, not here.
+        """
+        self._sync()
+        ns = self._namespace(namespace)
+        key = self._make_key(identifier)
+        entry = ns.entries.get(key)
+        if entry is None:
+            return key, None, 0.0
+        
+        age = time.monotonic() - entry.stored_at
+        if age > ns.ttl:
+            if ns.entries.pop(key, None) is not None:
+                ns.stats["expired"] += 1
+            return key, None, age
+        return key, entry, age
     
     def get(self, namespace: str, identifier: Any) -> Optional[Any]:
         """
-        Retrieve data from cache.
+        Retrieve fresh data from cache.
         
         Args:
             namespace: Category of data
             identifier: Unique identifier
         
         Returns:
-            Cached data or None if not found
+            Cached data or None if not found or past its soft TTL
         """
-        key = self._make_key(namespace, identifier)
+        key, entry, age = self._entry(namespace, identifier)
+        ns = self._namespace(namespace)
+        key_stats = ns.key_stats(key)
+        key_stats.last_access = time.time()
         
-        if key in self.cache:
-            self.stats["hits"] += 1
-            return self.cache[key]
+        if entry is not None and age <= ns.soft_ttl:
+            ns.stats["hits"] += 1
+            key_stats.hits += 1
+            ns.served(key)
+            return entry.data
         
-        self.stats["misses"] += 1
+        ns.stats["misses"] += 1
+        key_stats.misses += 1
         return None
     
-    def set(self, namespace: str, identifier: Any, data: Any) -> None:
+    def lookup(self, namespace: str, identifier: Any) -> tuple[Optional[Any], bool]:
+        """
+        Retrieve data from cache, including entries past their soft TTL.
+        
+        Args:
+            namespace: Category of data
+            identifier: Unique identifier
+        
+        Returns:
+            (data, stale): data is None if not found; stale is True if the
+            caller should refresh it (see refresh())
+        """
+        key, entry, age = self._entry(namespace, identifier)
+        ns = self._namespace(namespace)
+        key_stats = ns.key_stats(key)
+        key_stats.last_access = time.time()
+        
+        if entry is None:
+            ns.stats["misses"] += 1
+            key_stats.misses += 1
+            return None, False
+        
+        ns.served(key)
+        if age > ns.soft_ttl:
+            ns.stats["stale_hits"] += 1
+            key_stats.stale_hits += 1
+            return entry.data, True
+        
+        ns.stats["hits"] += 1
+        key_stats.hits += 1
+        return entry.data, False
+    
+    def peek(self, namespace: str, identifier: Any) -> Optional[Any]:
+        """
+        Retrieve data from cache (fresh or stale) without counting a hit or miss.
+        Used for internal bookkeeping such as write-through updates.
+        """
+        _, entry, _ = self._entry(namespace, identifier)
+        return entry.data if entry is not None else None
+    
+    def set(self, namespace: str, identifier: Any, data: Any) -> bool:
         """
         Store data in cache.
         
@@ -94,62 +609,399 @@ class CacheService:
             namespace: Category of data
             identifier: Unique identifier
             data: Data to cache
+        
+        Returns:
+            False if the data is larger than the namespace's whole budget and wasn't stored
+        """
+        ns = self._namespace(namespace)
+        key = self._make_key(identifier)
+        entry = _Entry(data)
+        if not self._store(ns, namespace, key, entry):
+            return False
+        ns.stats["sets"] += 1
+        self._share(namespace, key, entry)
+        return True
+    
+    def replace(self, namespace: str, identifier: Any, data: Any) -> bool:
+        """
+        Store an updated version of a cached value (a copy, or the same object
+        changed in place), keeping the entry's age and re-measuring its size.
+        
+        Returns:
+            False if the key isn't cached, or the value outgrew the namespace
+            budget and was dropped
         """
-        key = self._make_key(namespace, identifier)
-        self.cache[key] = data
-        self.stats["sets"] += 1
+        ns = self.namespaces.get(namespace)
+        key = self._make_key(identifier)
+        entry = ns.entries.get(key) if ns else None
+        if entry is None:
+            return False
+        return self._store(ns, namespace, key, _Entry(data, stored_at=entry.stored_at))
     
-    def delete(self, namespace: str, identifier: Any = None) -> None:
+    def _store(self, ns: _Namespace, namespace: str, key: str, entry: _Entry) -> bool:
+        """Put an entry in its namespace and enforce the global ceiling; False if it exceeds the namespace budget."""
+        try:
+            ns.entries[key] = entry
+        except ValueError:
+            # Larger than the namespace's whole budget (the outdated copy is gone too).
+            # Reported once per namespace; later rejections are only counted.
+            if not ns.stats["rejected"]:
+                print(
+                    f"⚠️  Not caching {namespace}:{key} "
+                    f"(~{entry.size // 1024} KiB exceeds the namespace budget of {ns.max_bytes // 1024} KiB)"
+                )
+            ns.stats["rejected"] += 1
+            return False
+        ns.key_stats(key).bytes = entry.size
+        self._enforce_ceiling((namespace, key))
+        return True
+    
+    def publish(self, namespace: str, identifier: Any) -> None:
+        """
+        Tell the other workers an entry was changed in place (e.g. a write-through
+        update): the shared copy is deleted and they drop theirs, reloading it on
+        their next read. Nothing is serialized. No-op without a shared tier.
+        """
+        if self.shared is None:
+            return
+        key = self._make_key(identifier)
+        self._changed(namespace, key)
+        self._send(lambda: self.shared.delete(namespace, key))
+    
+    async def single_flight(
+        self,
+        namespace: str,
+        identifier: Any,
+        loader: Callable[[], Awaitable[Any]],
+    ) -> Any:
         """
-        Delete data from cache.
+        Run a load at most once per key at a time.
+        
+        The first caller starts `loader`; callers arriving while it runs await
+        the same result instead of starting their own. Cancelling one caller
+        does not cancel the load for the others. With a shared tier, a copy
+        another worker stored within its soft TTL is used instead of loading.
         
         Args:
             namespace: Category of data
-            identifier: Specific identifier to delete, or None to clear entire namespace
+            identifier: Unique identifier
+            loader: Coroutine factory performing the load
+        
+        Returns:
+            The loader's result (or raises its exception)
         """
-        if identifier is None:
-            # Clear all entries for this namespace
-            keys_to_delete = [
-                k for k in self.cache.keys()
-                if k.startswith(self._make_key(namespace, "")[:8])
-            ]
-            for key in keys_to_delete:
-                del self.cache[key]
-                self.stats["deletes"] += 1
+        key = (namespace, self._make_key(identifier))
+        task = self._inflight.get(key)
+        
+        if task is None:
+            task = self._start_load(key, loader)
         else:
-            key = self._make_key(namespace, identifier)
-            if key in self.cache:
-                del self.cache[key]
-                self.stats["deletes"] += 1
+            ns = self._namespace(namespace)
+            ns.stats["coalesced"] += 1
+            ns.served(key[1])
+        
+        return await asyncio.shield(task)
+    
+    def _start_load(self, key: tuple[str, str], loader: Callable[[], Awaitable[Any]]) -> asyncio.Future:
+        """Start a load as a task registered under `key` until it finishes."""
+        ns = self._namespace(key[0])
+        started = time.perf_counter()
+        from_shared = False
+        
+        async def load() -> Any:
+            nonlocal from_shared, started
+            if self.shared is not None:
+                entry = await self._from_shared(*key)
+                if entry is not None:
+                    from_shared = True
+                    return entry.data
+            ns.stats["loads"] += 1
+            started = time.perf_counter()
+            return await loader()
+        
+        task = asyncio.ensure_future(load())
+        self._inflight[key] = task
+        
+        def finished(done: asyncio.Future) -> None:
+            if self._inflight.get(key) is done:
+                del self._inflight[key]
+            if not from_shared and not done.cancelled() and done.exception() is None:
+                # Time successful loads; they price what a cache hit saves
+                elapsed = time.perf_counter() - started
+                key_stats = ns.key_stats(key[1])
+                key_stats.loads += 1
+                key_stats.load_seconds += elapsed
+                ns.timed_loads += 1
+                ns.load_seconds += elapsed
+        
+        task.add_done_callback(finished)
+        return task
+    
+    def refresh(self, namespace: str, identifier: Any, loader: Callable[[], Awaitable[Any]]) -> bool:
+        """
+        Reload an entry in the background (e.g. after lookup() returned it stale).
+        
+        Args:
+            namespace: Category of data
+            identifier: Unique identifier
+            loader: Coroutine factory performing the load (and storing the result)
+        
+        Returns:
+            True if a refresh was started, False if a load was already running
+        """
+        key = (namespace, self._make_key(identifier))
+        if key in self._inflight:
+            return False
+        
+        task = self._start_load(key, loader)
+        self._namespace(namespace).stats["background_refreshes"] += 1
+        
+        def report(done: asyncio.Future) -> None:
+            if not done.cancelled() and done.exception() is not None:
+                print(f"⚠️  Background refresh of {namespace}:{identifier} failed: {done.exception()}")
+        
+        task.add_done_callback(report)
+        return True
+    
+    async def get_or_load(
+        self,
+        namespace: str,
+        identifier: Any,
+        loader: Callable[[], Awaitable[Any]],
+    ) -> Optional[Any]:
+        """
+        Get data from cache, loading and storing it on a miss (single-flight).
+        Stale data is returned immediately while it is refreshed in the background.
+        
+        Args:
+            namespace: Category of data
+            identifier: Unique identifier
+            loader: Coroutine factory returning the data (None results are not cached)
+        
+        Returns:
+            Cached or freshly loaded data
+        """
+        async def load() -> Any:
+            generation = self._namespace(namespace).generation
+            data = await loader()
+            # Don't store a result the namespace was invalidated under
+            if data is not None and self._namespace(namespace).generation == generation:
+                self.set(namespace, identifier, data)
+            return data
+        
+        data, stale = self.lookup(namespace, identifier)
+        if data is not None:
+            if stale:
+                self.refresh(namespace, identifier, load)
+            return data
+        
+        return await self.single_flight(namespace, identifier, load)
+    
+    def _drop(self, namespace: str, key: Optional[str] = None, counter: str = "deletes") -> int:
+        """Remove a key, or a whole namespace (key=None), from this process only."""
+        ns = self.namespaces.get(namespace)
+        if ns is None:
+            return 0
+        
+        if key is None:
+            count = len(ns.entries)
+            ns.entries.clear()
+            ns.generation += 1
+            for inflight in [inflight for inflight in self._inflight if inflight[0] == namespace]:
+                del self._inflight[inflight]
+        else:
+            count = 1 if ns.entries.pop(key, None) is not None else 0
+            # Later callers must not join a load that started before this change
+            self._inflight.pop((namespace, key), None)
+            self._versions.pop((namespace, key), None)
+        
+        ns.stats[counter] += count
+        return count
+    
+    def delete(self, namespace: str, identifier: Any = None) -> int:
+        """
+        Delete data from cache (in every worker when there is a shared tier).
+        
+        Args:
+            namespace: Category of data
+            identifier: Specific identifier to delete, or None to clear entire namespace
+        
+        Returns:
+            Number of entries deleted in this process
+        """
+        key = self._make_key(identifier) if identifier is not None else None
+        count = self._drop(namespace, key)
+        if self.shared is not None:
+            self._send(lambda: self.shared.delete(namespace, key))
+        return count
     
     def clear(self) -> None:
-        """Clear all cache entries."""
-        count = len(self.cache)
-        self.cache.clear()
-        self.stats["deletes"] += count
+        """Clear all cache entries (in every worker when there is a shared tier)."""
+        for namespace in list(self.namespaces):
+            self._drop(namespace)
+        self._inflight.clear()
+        if self.shared is not None:
+            self._send(self.shared.delete)
+    
+    def close(self) -> None:
+        """Stop the shared tier's background tasks and release its connections (see flush())."""
+        for task in (self._poller, self._outbox_task):
+            if task is not None:
+                task.cancel()
+        if self.shared is not None:
+            self.shared.close()
+    
+    @staticmethod
+    def _rates(stats: dict) -> dict:
+        """Request counts and hit rates for a set of counters."""
+        served = stats["hits"] + stats["stale_hits"]
+        total_requests = served + stats["misses"]
+        hit_rate = (served / total_requests * 100) if total_requests > 0 else 0
+        stale_rate = (stats["stale_hits"] / total_requests * 100) if total_requests > 0 else 0
+        return {
+            "total_requests": total_requests,
+            "hits": stats["hits"],
+            "stale_served": stats["stale_hits"],
+            "misses": stats["misses"],
+            "hit_rate_percent": round(hit_rate, 2),
+            "stale_rate_percent": round(stale_rate, 2),
+        }
+    
+    def _namespace_stats(self, namespace: str) -> dict:
+        """Statistics of one namespace."""
+        ns = self.namespaces[namespace]
+        return {
+            **self._rates(ns.stats),
+            "size": len(ns.entries),
+            "bytes": ns.entries.currsize,
+            "max_bytes": ns.max_bytes,
+            "priority": ns.priority,
+            "sets": ns.stats["sets"],
+            "deletes": ns.stats["deletes"],
+            "evictions": ns.entries.evictions,
+            "rejected": ns.stats["rejected"],
+            "shared_hits": ns.stats["shared_hits"],
+            "loads": ns.stats["loads"],
+            "coalesced_waits": ns.stats["coalesced"],
+            "background_refreshes": ns.stats["background_refreshes"],
+            "generation": ns.generation,
+            "soft_ttl_seconds": ns.soft_ttl,
+            "ttl_seconds": ns.ttl,
+        }
     
     def get_stats(self) -> dict:
         """
         Get cache statistics.
         
         Returns:
-            Dictionary with hit rate, miss rate, and operation counts
+            Dictionary with hit rate, miss rate, and operation counts,
+            overall and per namespace
         """
-        total_requests = self.stats["hits"] + self.stats["misses"]
-        hit_rate = (self.stats["hits"] / total_requests * 100) if total_requests > 0 else 0
+        totals = dict.fromkeys(COUNTERS, 0)
+        for ns in self.namespaces.values():
+            for name, value in ns.stats.items():
+                totals[name] += value
         
         return {
             "enabled": self.enabled,
             "cachetools_available": CACHETOOLS_AVAILABLE,
-            "total_requests": total_requests,
-            "hits": self.stats["hits"],
-            "misses": self.stats["misses"],
-            "hit_rate_percent": round(hit_rate, 2),
-            "cache_size": len(self.cache),
-            "max_size": getattr(self.cache, 'maxsize', 1000),
+            **self._rates(totals),
+            "cache_size": sum(len(ns.entries) for ns in self.namespaces.values()),
+            "bytes": sum(ns.entries.currsize for ns in self.namespaces.values()),
+            "max_bytes": self.max_bytes,
+            "namespace_max_bytes": self.namespace_max_bytes,
             "ttl_seconds": self.default_ttl,
-            "sets": self.stats["sets"],
-            "deletes": self.stats["deletes"],
+            "soft_ttl_seconds": self.soft_ttl,
+            "background_refreshes": totals["background_refreshes"],
+            "sets": totals["sets"],
+            "deletes": totals["deletes"],
+            "evictions": sum(ns.entries.evictions for ns in self.namespaces.values()),
+            "ceiling_evictions": self.global_evictions,
+            "rejected": totals["rejected"],
+            "loads": totals["loads"],
+            "coalesced_waits": totals["coalesced"],
+            "loads_in_flight": len(self._inflight),
+            "shared": (
+                {
+                    **self.shared.get_stats(),
+                    "remote_invalidations": self.remote_invalidations,
+                    "queued_writes": self._outbox.qsize() if self._outbox is not None else 0,
+                }
+                if self.shared is not None else None
+            ),
+            "namespaces": {namespace: self._namespace_stats(namespace) for namespace in sorted(self.namespaces)},
+        }
+    
+    def _key_report(self, namespace: str, key: str, stats: _KeyStats) -> dict:
+        """Analytics of one key."""
+        average = stats.average_load()
+        served = stats.hits + stats.stale_hits
+        return {
+            "namespace": namespace,
+            "key": key,
+            "requests": stats.requests,
+            "hits": stats.hits,
+            "stale_served": stats.stale_hits,
+            "misses": stats.misses,
+            "hit_rate_percent": round(served / stats.requests * 100, 2) if stats.requests else 0,
+            "loads": stats.loads,
+            "avg_load_ms": round(average * 1000, 1) if average is not None else None,
+            "bytes": stats.bytes,
+            "cached": key in self.namespaces[namespace].entries,
+            "last_access": datetime.fromtimestamp(stats.last_access).isoformat(),
+        }
+    
+    def get_detailed_stats(self, top: int = 10) -> dict:
+        """
+        Get per-namespace and per-key cache analytics.
+        
+        Args:
+            top: Number of hot and cold keys to list
+        
+        Returns:
+            Dictionary with, per namespace, average value size, load time,
+            estimated load time saved and why entries left the cache; plus the
+            most requested keys (hot) and the cached keys requested least (cold)
+        """
+        namespaces = {}
+        for name in sorted(self.namespaces):
+            ns = self.namespaces[name]
+            average = ns.average_load()
+            size = len(ns.entries)
+            namespaces[name] = {
+                **self._namespace_stats(name),
+                "avg_value_bytes": ns.entries.currsize // size if size else 0,
+                "avg_load_ms": round(average * 1000, 1) if average is not None else None,
+                "load_time_saved_seconds": round(ns.saved_seconds, 3),
+                "removals": {
+                    "expired": ns.entries.expirations + ns.stats["expired"],
+                    "evicted_namespace_budget": ns.entries.evictions - ns.stats["ceiling_evictions"],
+                    "evicted_global_ceiling": ns.stats["ceiling_evictions"],
+                    "invalidated": ns.stats["deletes"],
+                    "invalidated_by_other_workers": ns.stats["remote_deletes"],
+                    "rejected_too_large": ns.stats["rejected"],
+                },
+                "tracked_keys": len(ns.keys),
+            }
+        
+        keys = [
+            self._key_report(name, key, stats)
+            for name, ns in self.namespaces.items()
+            for key, stats in ns.keys.items()
+        ]
+        hot = sorted(keys, key=lambda report: report["requests"], reverse=True)[:top]
+        # Cold: cached but rarely read - candidates for shorter TTLs or leaving out of prefetch
+        cold = sorted(
+            (report for report in keys if report["cached"]),
+            key=lambda report: (report["requests"], -report["bytes"]),
+        )[:top]
+        
+        return {
+            "load_time_saved_seconds": round(sum(ns.saved_seconds for ns in self.namespaces.values()), 3),
+            "max_tracked_keys_per_namespace": MAX_TRACKED_KEYS,
+            "hot_keys": hot,
+            "cold_keys": cold,
+            "namespaces": namespaces,
         }
     
     def invalidate_namespace(self, namespace: str) -> int:
@@ -157,23 +1009,9 @@ class CacheService:
         Invalidate all cache entries for a specific namespace.
         
         Args:
-            namespace: Category to invalidate (e.g., 'dealers', 'designs')
+            namespace: Category to invalidate (e.g., 'Dealers', 'Invoices')
         
         Returns:
             Number of entries invalidated
         """
-        # Create a namespace prefix for matching
-        prefix = f"{namespace}:"
-        keys_to_delete = []
-        
-        for key in list(self.cache.keys()):
-            # We need to check if any cached key belongs to this namespace
-            # Since keys are hashed, we'll track namespaces separately
-            # For now, we'll use a simple pattern matching on the namespace
-            keys_to_delete.append(key)
-        
-        # Alternative: maintain a separate namespace index
-        # For simplicity, clear all for now
-        count = len(self.cache)
-        self.delete(namespace)
-        return count
+        return self.delete(namespace)
@@ -6,13 +6,16 @@ Uses Service Account authentication for server-to-server access.
 import io
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
 
 from google.oauth2 import service_account
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseUpload, MediaIoBaseDownload
+from googleapiclient.http import MediaIoBaseUpload
 from googleapiclient.errors import HttpError
 
+from app.services.google_executor import GoogleApiExecutor
+from app.services.google_transport import PooledHttp, build_client
+from app.services.rate_limiter import GoogleRateLimiter
+
 
 class DriveService:
     """Service for Google Drive operations."""
@@ -23,15 +26,36 @@ class DriveService:
         products_folder_id: str = "",
         invoices_folder_id: str = "",
         specs_folder_id: str = "",
-        credentials_json: Optional[str] = None
+        credentials_json: Optional[str] = None,
+        fake_google=None,
+        max_concurrency: int = 4,
+        rate_limiter: Optional[GoogleRateLimiter] = None,
+        http_pool_size: int = 10,
+        http_timeout: tuple[float, float] = (10, 60),
     ):
-        """Initialize the Drive service with credentials."""
+        """Initialize the Drive service with credentials (or a FakeGoogle stand-in)."""
         self.products_folder_id = products_folder_id
         self.invoices_folder_id = invoices_folder_id
         self.specs_folder_id = specs_folder_id
         self.service = None
+        self.http = None  # Pooled transport shared by the client and executor threads
+        self.http_pool_size = http_pool_size
+        self.http_timeout = http_timeout  # (connect, read) seconds
+        self.executor: Optional[GoogleApiExecutor] = None
+        self.max_concurrency = max_concurrency
+        self.rate_limiter = rate_limiter  # Shared Google quota limiter
         
-        if credentials_json:
+        if fake_google is not None:
+            self.http = fake_google.http()
+            self.service = build_client("drive", "v3", self.http)
+            self.executor = GoogleApiExecutor(
+                None,
+                max_workers=self.max_concurrency,
+                http_factory=fake_google.http,
+                rate_limiter=self.rate_limiter,
+            )
+            print("🧪 Google Drive service using fake Google APIs")
+        elif credentials_json:
              self._authenticate_from_json(credentials_json)
         elif credentials_path:
             self._authenticate(credentials_path)
@@ -55,12 +79,14 @@ class DriveService:
                 ]
             )
             
-            self.service = build("drive", "v3", credentials=credentials)
+            self._connect(credentials)
             print("✅ Google Drive service authenticated (File)")
             
         except Exception as e:
             print(f"❌ Failed to authenticate with Google Drive: {e}")
             self.service = None
+            self.executor = None
+            self.http = None
 
     def _authenticate_from_json(self, json_content: str):
          """Authenticate using JSON string content."""
@@ -74,11 +100,41 @@ class DriveService:
                     "https://www.googleapis.com/auth/drive.file",
                 ]
             )
-            self.service = build("drive", "v3", credentials=credentials)
+            self._connect(credentials)
             print("✅ Google Drive service authenticated (Env Var)")
          except Exception as e:
             print(f"❌ Failed to authenticate with Google Drive JSON: {e}")
             self.service = None
+            self.executor = None
+            self.http = None
+    
+    def _connect(self, credentials):
+        """Build the Drive client on a pooled keep-alive transport."""
+        connect_timeout, read_timeout = self.http_timeout
+        self.http = PooledHttp(
+            credentials,
+            pool_size=self.http_pool_size,
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+        )
+        self.service = build_client("drive", "v3", self.http)
+        self.executor = GoogleApiExecutor(
+            credentials,
+            max_workers=self.max_concurrency,
+            http_factory=lambda: self.http,
+            rate_limiter=self.rate_limiter,
+        )
+    
+    async def _execute(self, request) -> Any:
+        """Run a Drive API request on the bounded executor (off the event loop)."""
+        return await self.executor.execute(request)
+    
+    def close(self) -> None:
+        """Release the executor's worker threads and connections."""
+        if self.executor:
+            self.executor.shutdown()
+        if isinstance(self.http, PooledHttp):
+            self.http.close()
     
     async def create_folder(self, name: str, parent_id: Optional[str] = None) -> Optional[str]:
         """Create a folder in Drive and return its ID."""
@@ -94,10 +150,10 @@ class DriveService:
             if parent_id:
                 file_metadata["parents"] = [parent_id]
             
-            folder = self.service.files().create(
+            folder = await self._execute(self.service.files().create(
                 body=file_metadata,
                 fields="id"
-            ).execute()
+            ))
             
             folder_id = folder.get("id")
             
@@ -119,11 +175,11 @@ class DriveService:
             # Search for existing folder
             query = f"name='{name}' and '{parent_id}' in parents and mimeType='application/vnd.google-apps.folder' and trashed=false"
             
-            results = self.service.files().list(
+            results = await self._execute(self.service.files().list(
                 q=query,
                 spaces="drive",
                 fields="files(id, name)",
-            ).execute()
+            ))
             
             files = results.get("files", [])
             
@@ -143,10 +199,10 @@ class DriveService:
             return False
         
         try:
-            self.service.permissions().create(
+            await self._execute(self.service.permissions().create(
                 fileId=file_id,
                 body={"type": "anyone", "role": "reader"},
-            ).execute()
+            ))
             return True
             
         except HttpError as e:
@@ -176,11 +232,11 @@ class DriveService:
                 resumable=True,
             )
             
-            file = self.service.files().create(
+            file = await self._execute(self.service.files().create(
                 body=file_metadata,
                 media_body=media,
                 fields="id, name, webViewLink, webContentLink",
-            ).execute()
+            ))
             
             file_id = file.get("id")
             
@@ -321,7 +377,7 @@ class DriveService:
             return False
         
         try:
-            self.service.files().delete(fileId=file_id).execute()
+            await self._execute(self.service.files().delete(fileId=file_id))
             return True
             
         except HttpError as e:
@@ -346,12 +402,12 @@ class DriveService:
             # List files in folder
             query = f"'{product_folder_id}' in parents and mimeType contains 'image' and trashed=false"
             
-            results = self.service.files().list(
+            results = await self._execute(self.service.files().list(
                 q=query,
                 spaces="drive",
                 fields="files(id, name, webViewLink, createdTime)",
                 orderBy="createdTime desc",
-            ).execute()
+            ))
             
             files = results.get("files", [])
             
@@ -376,16 +432,7 @@ class DriveService:
             return None
         
         try:
-            request = self.service.files().get_media(fileId=file_id)
-            
-            file_buffer = io.BytesIO()
-            downloader = MediaIoBaseDownload(file_buffer, request)
-            
-            done = False
-            while not done:
-                _, done = downloader.next_chunk()
-            
-            return file_buffer.getvalue()
+            return await self._execute(self.service.files().get_media(fileId=file_id))
             
         except HttpError as e:
             print(f"Error downloading file: {e}")
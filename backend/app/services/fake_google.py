@@ -0,0 +1,624 @@
+"""
+Fake Google APIs - In-process stand-in for Google Sheets and Drive.
+Implements the subset of spreadsheets.values and drive files/permissions
+that the services use, with configurable latency, jitter, quota errors
+and generated datasets, so performance work can be measured offline
+and reproducibly.
+
+Usage:
+    fake = FakeGoogle(latency_ms=120, jitter_ms=40)
+    fake.seed_dataset("fake-spreadsheet", rows=500)
+    service = build("sheets", "v4", http=fake.http(), static_discovery=True)
+"""
+
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from datetime import datetime, timedelta
+from email.parser import BytesParser
+from email.policy import HTTP
+from typing import Any, Optional
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import httplib2
+
+from app.services.storage_engine import StorageEngine
+
+
+# ID prefix of each sheet, as used by the storage engine's create_* methods
+ID_PREFIXES = {
+    "Designs": "DES",
+    "ProductVariants": "VAR",
+    "Dealers": "DLR",
+    "Designers": "DES",
+    "Materials": "MAT",
+    "Invoices": "INV",
+    "InvoiceItems": "ITM",
+    "CostBreakdown": "CST",
+    "ProductProgress": "PRG",
+    "Payments": "PAY",
+    "PlatingRates": "RATE",
+    "PlatingJobs": "JOB",
+}
+
+# Foreign-key column -> sheet whose ids it references
+REFERENCES = {
+    "dealer_id": "Dealers",
+    "vendor_dealer_id": "Dealers",
+    "assigned_dealer_id": "Dealers",
+    "design_id": "Designs",
+    "designer_id": "Designers",
+    "variant_id": "ProductVariants",
+    "product_id": "ProductVariants",
+    "invoice_id": "Invoices",
+    "progress_id": "ProductProgress",
+}
+
+# Allowed values of enum-like columns, so generated rows pass model validation
+CHOICES = {
+    "dealer_type": ["BUY", "SELL"],
+    "dealer_category": ["Material", "Making", "Karigar", "Plating", "Packing", "Customer"],
+    "invoice_type": ["Material", "Making", "Finishing", "Packing", "Sales"],
+    "cost_type": ["Material", "Making", "Finishing", "Packing"],
+    "payment_status": ["Unpaid", "Partial", "Paid"],
+    "payment_type": ["IN", "OUT"],
+    "payment_mode": ["Cash", "UPI", "Bank Transfer", "Cheque"],
+    "charge_type": ["Fixed", "PerProduct"],
+    "finish": ["Gold", "Silver", "Mix", "Antique", "Rose Gold", "Other"],
+    "plating_type": ["B_GOLD", "LAKE_GOLD", "OTHER"],
+    ("Materials", "category"): ["Metal", "Stone", "Consumable", "Packing", "Other"],
+    ("Materials", "unit"): ["gm", "kg", "pcs", "ct"],
+    ("ProductProgress", "status"): ["Pending", "InProgress", "Completed"],
+    ("PlatingJobs", "status"): ["Assigned", "InProgress", "Completed"],
+}
+
+STAGE_CODES = ["ORDERED", "MAKING", "PLATING", "QUALITY_CHECK", "PACKING", "READY_TO_DISPATCH", "DELIVERED"]
+
+_NUMBER = re.compile(r"-?(0|[1-9]\d*)(\.\d+)?")
+_CELL = re.compile(r"([A-Z]*)(\d*)")
+
+
+def column_letter(index: int) -> str:
+    """Convert a 0-based column index to a sheet column letter (0 -> A, 26 -> AA)."""
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(65 + remainder) + letters
+    return letters
+
+
+def _column_index(letters: str) -> int:
+    """Convert a sheet column letter to a 0-based index (A -> 0)."""
+    index = 0
+    for char in letters:
+        index = index * 26 + ord(char) - 64
+    return index - 1
+
+
+def parse_range(a1: str) -> tuple[str, int, int, Optional[int], Optional[int]]:
+    """
+    Parse A1 notation such as "Dealers!A2:Z", "Dealers!1:1" or "Dealers!C5".
+
+    Returns:
+        (sheet_name, first_row, first_col, last_row, last_col) as 0-based
+        indexes; last_row/last_col are None when the range is open-ended
+    """
+    sheet_name, _, cells = a1.partition("!")
+    sheet_name = sheet_name.strip("'")
+    if not cells:
+        return sheet_name, 0, 0, None, None
+
+    start, _, end = cells.partition(":")
+    start_col, start_row = _CELL.fullmatch(start.upper()).groups()
+    if end:
+        end_col, end_row = _CELL.fullmatch(end.upper()).groups()
+    else:
+        end_col, end_row = start_col, start_row
+
+    return (
+        sheet_name,
+        int(start_row) - 1 if start_row else 0,
+        _column_index(start_col) if start_col else 0,
+        int(end_row) - 1 if end_row else None,
+        _column_index(end_col) if end_col else None,
+    )
+
+
+class FakeHttp:
+    """httplib2.Http-compatible transport that answers from a FakeGoogle instance."""
+
+    def __init__(self, google: "FakeGoogle"):
+        self.google = google
+
+    def request(self, uri, method="GET", body=None, headers=None, redirections=None, connection_type=None):
+        """Handle one API request, like httplib2.Http.request."""
+        return self.google.handle(uri, method, body, headers or {})
+
+
+class FakeGoogle:
+    """In-memory spreadsheets and Drive files served through FakeHttp."""
+
+    def __init__(
+        self,
+        latency_ms: float = 0,
+        jitter_ms: float = 0,
+        error_rate: float = 0,
+        quota_per_minute: int = 0,
+        seed: int = 0,
+    ):
+        """
+        Initialize the fake.
+
+        Args:
+            latency_ms: Mean time each call blocks the calling thread
+            jitter_ms: Latency varies uniformly by up to this much either way
+            error_rate: Share of calls that fail with 429 RESOURCE_EXHAUSTED
+            quota_per_minute: Calls allowed in any 60 s window before 429s (0 = unlimited)
+            seed: Seed for jitter, injected errors and generated data
+        """
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.quota_per_minute = quota_per_minute
+        self.calls: Counter = Counter()  # endpoint -> calls served (including errors)
+        self.errors = 0
+
+        self._random = random.Random(seed)
+        self._seed = seed
+        self._lock = threading.RLock()
+        self._recent: deque = deque()  # monotonic times of calls in the quota window
+        self._spreadsheets: dict[str, dict[str, list[list]]] = {}
+        self._files: dict[str, dict] = {}
+        self._content: dict[str, bytes] = {}
+        self._uploads: dict[str, dict] = {}  # resumable session -> pending file metadata
+
+    def http(self) -> FakeHttp:
+        """Get a transport for build(http=...) or request.execute(http=...)."""
+        return FakeHttp(self)
+
+    def reset_stats(self) -> None:
+        """Zero the call counters (e.g. between benchmark scenarios)."""
+        with self._lock:
+            self.calls.clear()
+            self.errors = 0
+
+    # ============ Data ============
+
+    def create_spreadsheet(self, spreadsheet_id: str, sheets: dict[str, list[list]]) -> None:
+        """Create (or replace) a spreadsheet from sheet name -> rows (row 0 is the header)."""
+        with self._lock:
+            self._spreadsheets[spreadsheet_id] = {name: [list(row) for row in rows] for name, rows in sheets.items()}
+            self._files[spreadsheet_id] = {
+                "id": spreadsheet_id,
+                "name": spreadsheet_id,
+                "mimeType": "application/vnd.google-apps.spreadsheet",
+                "parents": [],
+                "trashed": False,
+                "version": "1",
+                "createdTime": datetime.now().isoformat() + "Z",
+                "modifiedTime": datetime.now().isoformat() + "Z",
+            }
+
+    def seed_dataset(self, spreadsheet_id: str, rows: int = 100) -> None:
+        """
+        Create a spreadsheet with every sheet of the schema and `rows`
+        generated rows per sheet (foreign keys point at existing ids).
+        """
+        rng = random.Random(self._seed)
+        base = datetime(2024, 1, 1)
+        sheets = {}
+        for sheet_name, columns in StorageEngine.SHEET_COLUMNS.items():
+            count = len(STAGE_CODES) if sheet_name == "WorkflowStages" else rows
+            sheets[sheet_name] = [list(columns)] + [
+                [self._fake_value(sheet_name, col, i, rows, rng, base) for col in columns]
+                for i in range(1, count + 1)
+            ]
+        self.create_spreadsheet(spreadsheet_id, sheets)
+
+    def edit(self, spreadsheet_id: str, a1: str, values: list[list]) -> None:
+        """Change cells directly, as a user editing the sheet by hand would (no API call is counted)."""
+        with self._lock:
+            self._write(spreadsheet_id, a1, values, "USER_ENTERED")
+
+    def insert_rows(self, spreadsheet_id: str, sheet_name: str, row_number: int, rows: list[list]) -> None:
+        """Insert rows before sheet row `row_number` (1-indexed), shifting the rows below, as a user would by hand."""
+        with self._lock:
+            sheet = self._sheet(spreadsheet_id, sheet_name)
+            sheet[row_number - 1:row_number - 1] = [list(row) for row in rows]
+            self._touch(spreadsheet_id)
+
+    @staticmethod
+    def _fake_value(sheet_name: str, col: str, i: int, rows: int, rng: random.Random, base: datetime) -> Any:
+        """Generate a plausible cell value for row `i` of a sheet."""
+        columns = StorageEngine.SHEET_COLUMNS[sheet_name]
+        if col == columns[0]:
+            if sheet_name == "WorkflowStages":
+                return i
+            if sheet_name == "Settings":
+                return f"setting_{i}"
+            return f"{ID_PREFIXES[sheet_name]}-{i:05d}"
+        if col in REFERENCES:
+            return f"{ID_PREFIXES[REFERENCES[col]]}-{rng.randint(1, rows):05d}"
+        if col == "stage_code":
+            return STAGE_CODES[(i - 1) % len(STAGE_CODES)] if sheet_name == "WorkflowStages" else rng.choice(STAGE_CODES)
+        choices = CHOICES.get((sheet_name, col)) or CHOICES.get(col)
+        if choices:
+            return rng.choice(choices)
+        if col == "status":
+            return "Active"
+        if col == "related_to":
+            return "INVOICE"
+        if col == "email":
+            return f"{sheet_name.lower()}{i}@example.com"
+        if col == "phone":
+            return f"98{rng.randint(0, 99999999):08d}"
+        if col.endswith("_at") or col in ("last_purchase_date", "start_date", "end_date"):
+            return (base + timedelta(hours=i * 7)).isoformat()
+        if col.endswith("_date") or col in ("date", "effective_from"):
+            return (base + timedelta(hours=i * 7)).strftime("%Y-%m-%d")
+        if col in ("quantity", "stock_qty"):
+            return rng.randint(1, 50)
+        if col.startswith("is_"):
+            return i == rows
+        if any(word in col for word in ("cost", "price", "amount", "total", "balance", "rate", "profit", "stock", "quantity", "weight")):
+            return round(rng.uniform(1, 5000), 2)
+        if col.endswith("_percent") or col == "profit_margin":
+            return rng.choice([0, 3, 5, 18])
+        return f"{col.replace('_', ' ').title()} {i}"
+
+    # ============ Transport ============
+
+    def handle(self, uri: str, method: str, body: Any, headers: dict) -> tuple[httplib2.Response, bytes]:
+        """Simulate latency and quota, then route the request to an endpoint."""
+        with self._lock:
+            delay = self.latency_ms + self._random.uniform(-self.jitter_ms, self.jitter_ms)
+            fail = self.error_rate and self._random.random() < self.error_rate
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+        url = urlsplit(uri)
+        query = {key: values if len(values) > 1 or key == "ranges" else values[0]
+                 for key, values in parse_qs(url.query).items()}
+        if hasattr(body, "read"):
+            body = body.read()
+        if isinstance(body, str):
+            body = body.encode()
+
+        with self._lock:
+            endpoint, handler, args = self._route(url.path, method)
+            self.calls[endpoint] += 1
+
+            retry_after = self._over_quota()
+            if fail or retry_after:
+                self.errors += 1
+                return self._error(
+                    429, "Quota exceeded for quota metric 'Requests'", "RESOURCE_EXHAUSTED",
+                    headers={"retry-after": str(retry_after)} if retry_after else None,
+                )
+            if handler is None:
+                return self._error(404, f"Fake Google has no endpoint for {method} {url.path}", "NOT_FOUND")
+
+            try:
+                return handler(*args, query=query, body=body or b"", headers=headers)
+            except KeyError as e:
+                return self._error(404, f"Not found: {e}", "NOT_FOUND")
+            except (ValueError, AttributeError) as e:
+                return self._error(400, f"Bad request: {e}", "INVALID_ARGUMENT")
+
+    def _over_quota(self) -> int:
+        """
+        Record a call in the sliding 60 s window.
+
+        Returns:
+            0 if the call is within the quota, else whole seconds until it would be
+        """
+        if not self.quota_per_minute:
+            return 0
+        now = time.monotonic()
+        while self._recent and now - self._recent[0] > 60:
+            self._recent.popleft()
+        if len(self._recent) >= self.quota_per_minute:
+            return max(1, math.ceil(60 - (now - self._recent[0])))
+        self._recent.append(now)
+        return 0
+
+    def _route(self, path: str, method: str) -> tuple[str, Any, tuple]:
+        """Map a request path to (endpoint name, handler, positional args)."""
+        match = re.fullmatch(r"/v4/spreadsheets/([^/]+)/values(?::(batchGet|batchUpdate)|/(.+?)(:append)?)", path)
+        if match:
+            spreadsheet_id, batch_op, a1, append = match.groups()
+            if batch_op == "batchGet" and method == "GET":
+                return "values.batchGet", self._values_batch_get, (spreadsheet_id,)
+            if batch_op == "batchUpdate" and method == "POST":
+                return "values.batchUpdate", self._values_batch_update, (spreadsheet_id,)
+            if a1 and append and method == "POST":
+                return "values.append", self._values_append, (spreadsheet_id, unquote(a1))
+            if a1 and method == "GET":
+                return "values.get", self._values_get, (spreadsheet_id, unquote(a1))
+            if a1 and method == "PUT":
+                return "values.update", self._values_update, (spreadsheet_id, unquote(a1))
+
+        if path == "/drive/v3/files":
+            if method == "GET":
+                return "files.list", self._files_list, ()
+            if method == "POST":
+                return "files.create", self._files_create, ()
+        if path == "/upload/drive/v3/files" and method == "POST":
+            return "files.create", self._files_upload, ()
+        match = re.fullmatch(r"/fake/upload/([^/]+)", path)
+        if match and method == "PUT":
+            return "files.create", self._files_upload_content, (match.group(1),)
+        match = re.fullmatch(r"/drive/v3/files/([^/]+)(/permissions)?", path)
+        if match:
+            file_id, permissions = unquote(match.group(1)), match.group(2)
+            if permissions and method == "POST":
+                return "permissions.create", self._permissions_create, (file_id,)
+            if not permissions and method == "GET":
+                return "files.get", self._files_get, (file_id,)
+            if not permissions and method == "DELETE":
+                return "files.delete", self._files_delete, (file_id,)
+
+        return f"{method} {path}", None, ()
+
+    @staticmethod
+    def _json(data: Any, status: int = 200, headers: Optional[dict] = None) -> tuple[httplib2.Response, bytes]:
+        """Build a JSON response."""
+        response = httplib2.Response({"status": str(status), "content-type": "application/json; charset=UTF-8", **(headers or {})})
+        return response, json.dumps(data).encode()
+
+    def _error(self, status: int, message: str, reason: str, headers: Optional[dict] = None) -> tuple[httplib2.Response, bytes]:
+        """Build a Google-style JSON error response."""
+        return self._json({"error": {"code": status, "message": message, "status": reason}}, status, headers)
+
+    # ============ Sheets ============
+
+    def _sheet(self, spreadsheet_id: str, sheet_name: str) -> list[list]:
+        """Get a sheet's rows, raising KeyError if it doesn't exist."""
+        return self._spreadsheets[spreadsheet_id][sheet_name]
+
+    def _touch(self, spreadsheet_id: str) -> None:
+        """Bump the spreadsheet's Drive version after an edit."""
+        meta = self._files[spreadsheet_id]
+        meta["version"] = str(int(meta["version"]) + 1)
+        meta["modifiedTime"] = datetime.now().isoformat() + "Z"
+
+    @staticmethod
+    def _render(value: Any, option: str) -> Any:
+        """Render a stored cell for FORMATTED_VALUE (strings) or UNFORMATTED_VALUE (typed)."""
+        if option == "UNFORMATTED_VALUE":
+            return value
+        if isinstance(value, bool):
+            return "TRUE" if value else "FALSE"
+        if isinstance(value, float) and value.is_integer():
+            return str(int(value))
+        return str(value)
+
+    @staticmethod
+    def _enter(value: Any, option: str) -> Any:
+        """Store a written cell; USER_ENTERED turns numeric text into numbers like Sheets does."""
+        if value is None:
+            return ""
+        if option == "USER_ENTERED" and isinstance(value, str) and _NUMBER.fullmatch(value):
+            return float(value) if "." in value else int(value)
+        return value
+
+    def _read(self, spreadsheet_id: str, a1: str, major: str, option: str) -> dict:
+        """Read a range as a ValueRange, trimming trailing empty cells and rows like the API."""
+        sheet_name, row0, col0, row1, col1 = parse_range(a1)
+        grid = self._sheet(spreadsheet_id, sheet_name)
+        rows = grid[row0:None if row1 is None else row1 + 1]
+        width = max((len(row) for row in rows), default=0) if col1 is None else col1 + 1
+
+        if major == "COLUMNS":
+            lines = [[row[c] if c < len(row) else "" for row in rows] for c in range(col0, width)]
+        else:
+            lines = [row[col0:width] for row in rows]
+
+        values = []
+        for line in lines:
+            cells = [self._render(value, option) for value in line]
+            while cells and cells[-1] == "":
+                cells.pop()
+            values.append(cells)
+        while values and not values[-1]:
+            values.pop()
+
+        result = {"range": a1, "majorDimension": major}
+        if values:
+            result["values"] = values
+        return result
+
+    def _write(self, spreadsheet_id: str, a1: str, values: list[list], option: str) -> dict:
+        """Write values at the top-left of a range; returns an UpdateValuesResponse."""
+        sheet_name, row0, col0, _, _ = parse_range(a1)
+        grid = self._sheet(spreadsheet_id, sheet_name)
+        for offset, line in enumerate(values):
+            while len(grid) <= row0 + offset:
+                grid.append([])
+            row = grid[row0 + offset]
+            while len(row) < col0 + len(line):
+                row.append("")
+            row[col0:col0 + len(line)] = [self._enter(value, option) for value in line]
+        self._touch(spreadsheet_id)
+
+        width = max((len(line) for line in values), default=1)
+        return {
+            "spreadsheetId": spreadsheet_id,
+            "updatedRange": f"{sheet_name}!{column_letter(col0)}{row0 + 1}:{column_letter(col0 + width - 1)}{row0 + len(values)}",
+            "updatedRows": len(values),
+            "updatedCells": sum(len(line) for line in values),
+        }
+
+    def _values_get(self, spreadsheet_id: str, a1: str, query: dict, **_) -> tuple:
+        return self._json(self._read(
+            spreadsheet_id, a1,
+            query.get("majorDimension", "ROWS"),
+            query.get("valueRenderOption", "FORMATTED_VALUE"),
+        ))
+
+    def _values_batch_get(self, spreadsheet_id: str, query: dict, **_) -> tuple:
+        ranges = query.get("ranges", [])
+        major = query.get("majorDimension", "ROWS")
+        option = query.get("valueRenderOption", "FORMATTED_VALUE")
+        return self._json({
+            "spreadsheetId": spreadsheet_id,
+            "valueRanges": [self._read(spreadsheet_id, a1, major, option) for a1 in ranges],
+        })
+
+    def _values_update(self, spreadsheet_id: str, a1: str, query: dict, body: bytes, **_) -> tuple:
+        payload = json.loads(body)
+        return self._json(self._write(spreadsheet_id, a1, payload.get("values", []), query.get("valueInputOption", "RAW")))
+
+    def _values_batch_update(self, spreadsheet_id: str, body: bytes, **_) -> tuple:
+        payload = json.loads(body)
+        option = payload.get("valueInputOption", "RAW")
+        responses = [self._write(spreadsheet_id, data["range"], data.get("values", []), option) for data in payload.get("data", [])]
+        return self._json({
+            "spreadsheetId": spreadsheet_id,
+            "totalUpdatedRows": sum(r["updatedRows"] for r in responses),
+            "totalUpdatedCells": sum(r["updatedCells"] for r in responses),
+            "responses": responses,
+        })
+
+    def _values_append(self, spreadsheet_id: str, a1: str, query: dict, body: bytes, **_) -> tuple:
+        sheet_name, _, col0, _, _ = parse_range(a1)
+        grid = self._sheet(spreadsheet_id, sheet_name)
+        last = len(grid)
+        while last and not any(cell not in ("", None) for cell in grid[last - 1]):
+            last -= 1  # Append after the last row that has data
+
+        values = json.loads(body).get("values", [])
+        updates = self._write(spreadsheet_id, f"{sheet_name}!{column_letter(col0)}{last + 1}", values, query.get("valueInputOption", "RAW"))
+        return self._json({
+            "spreadsheetId": spreadsheet_id,
+            "tableRange": f"{sheet_name}!A1:{column_letter(col0)}{last}",
+            "updates": updates,
+        })
+
+    # ============ Drive ============
+
+    def _new_file(self, metadata: dict, content: Optional[bytes] = None) -> dict:
+        """Store a new file and return its resource."""
+        file_id = uuid.UUID(int=self._random.getrandbits(128)).hex
+        meta = {
+            "id": file_id,
+            "name": metadata.get("name", "Untitled"),
+            "mimeType": metadata.get("mimeType", "application/octet-stream"),
+            "parents": metadata.get("parents", []),
+            "trashed": False,
+            "version": "1",
+            "createdTime": datetime.now().isoformat() + "Z",
+            "modifiedTime": datetime.now().isoformat() + "Z",
+            "webViewLink": f"https://drive.google.com/file/d/{file_id}/view",
+            "webContentLink": f"https://drive.google.com/uc?id={file_id}&export=download",
+        }
+        self._files[file_id] = meta
+        if content is not None:
+            self._content[file_id] = content
+            meta["size"] = str(len(content))
+        return meta
+
+    def _matches(self, meta: dict, q: str) -> bool:
+        """Evaluate the simple `and`-joined Drive queries the services use."""
+        for clause in filter(None, (part.strip() for part in q.split(" and "))):
+            if match := re.fullmatch(r"name\s*=\s*'(.*)'", clause):
+                ok = meta["name"] == match.group(1)
+            elif match := re.fullmatch(r"'(.*)' in parents", clause):
+                ok = match.group(1) in meta["parents"]
+            elif match := re.fullmatch(r"mimeType\s*=\s*'(.*)'", clause):
+                ok = meta["mimeType"] == match.group(1)
+            elif match := re.fullmatch(r"mimeType contains '(.*)'", clause):
+                ok = match.group(1) in meta["mimeType"]
+            elif match := re.fullmatch(r"trashed\s*=\s*(true|false)", clause):
+                ok = meta["trashed"] == (match.group(1) == "true")
+            else:
+                raise ValueError(f"unsupported query clause {clause!r}")
+            if not ok:
+                return False
+        return True
+
+    def _files_list(self, query: dict, **_) -> tuple:
+        files = [meta for meta in self._files.values() if self._matches(meta, query.get("q", ""))]
+        if query.get("orderBy", "").startswith("createdTime"):
+            files.sort(key=lambda meta: meta["createdTime"], reverse=query["orderBy"].endswith("desc"))
+        return self._json({"files": files})
+
+    def _files_create(self, body: bytes, **_) -> tuple:
+        return self._json(self._new_file(json.loads(body or b"{}")))
+
+    def _files_upload(self, query: dict, body: bytes, headers: dict, **_) -> tuple:
+        if query.get("uploadType") == "resumable":
+            session = uuid.UUID(int=self._random.getrandbits(128)).hex
+            metadata = json.loads(body or b"{}")
+            upload_type = next((v for k, v in headers.items() if k.lower() == "x-upload-content-type"), None)
+            if upload_type:
+                metadata.setdefault("mimeType", upload_type)
+            self._uploads[session] = metadata
+            return self._json({}, headers={"location": f"https://fake.googleapis.local/fake/upload/{session}"})
+
+        # multipart/related: JSON metadata part followed by the media part
+        content_type = next((v for k, v in headers.items() if k.lower() == "content-type"), "")
+        message = BytesParser(policy=HTTP).parsebytes(f"Content-Type: {content_type}\r\n\r\n".encode() + body)
+        parts = list(message.iter_parts())
+        metadata = json.loads(parts[0].get_content()) if parts else {}
+        content = parts[1].get_payload(decode=True) if len(parts) > 1 else b""
+        if len(parts) > 1:
+            metadata.setdefault("mimeType", parts[1].get_content_type())
+        return self._json(self._new_file(metadata, content))
+
+    def _files_upload_content(self, session: str, body: bytes, headers: dict, **_) -> tuple:
+        upload = self._uploads[session]
+        upload.setdefault("_content", b"")
+        content_range = next((v for k, v in headers.items() if k.lower() == "content-range"), "")
+
+        if content_range.startswith("bytes */"):
+            # Status query after an interrupted chunk: report what has arrived
+            received = len(upload["_content"])
+            total = content_range.rsplit("/", 1)[1]
+            if total == "*" or received < int(total):
+                progress = {"range": f"bytes=0-{received - 1}"} if received else {}
+                return self._json({}, status=308, headers=progress)
+        else:
+            upload["_content"] += body
+
+        if content_range.endswith("/*"):
+            received = len(upload["_content"])
+            return self._json({}, status=308, headers={"range": f"bytes=0-{received - 1}"})
+
+        self._uploads.pop(session)
+        content = upload.pop("_content")
+        return self._json(self._new_file(upload, content))
+
+    def _files_get(self, file_id: str, query: dict, headers: dict, **_) -> tuple:
+        meta = self._files[file_id]
+        if query.get("alt") != "media":
+            return self._json(meta)
+
+        content = self._content.get(file_id, b"")
+        requested = next((v for k, v in headers.items() if k.lower() == "range"), "")
+        start, end = 0, len(content) - 1
+        if match := re.fullmatch(r"bytes=(\d+)-(\d+)", requested):
+            start, end = int(match.group(1)), min(int(match.group(2)), len(content) - 1)
+        chunk = content[start:end + 1]
+        response = httplib2.Response({
+            "status": "206" if requested else "200",
+            "content-type": self._files[file_id]["mimeType"],
+            "content-range": f"bytes {start}-{end}/{len(content)}",
+        })
+        return response, chunk
+
+    def _files_delete(self, file_id: str, **_) -> tuple:
+        self._files.pop(file_id)
+        self._content.pop(file_id, None)
+        return httplib2.Response({"status": "204"}), b""
+
+    def _permissions_create(self, file_id: str, body: bytes, **_) -> tuple:
+        self._files[file_id]  # KeyError -> 404 for unknown files
+        permission = json.loads(body or b"{}")
+        return self._json({"kind": "drive#permission", "id": "anyoneWithLink", **permission})
@@ -0,0 +1,113 @@
+"""
+Google API Executor - Runs blocking Google API calls off the event loop.
+Each worker thread gets its own authorized HTTP client because httplib2
+(and therefore the discovery client's transport) is not thread-safe.
+Calls are paced and retried by an optional shared GoogleRateLimiter.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+import httplib2
+from google_auth_httplib2 import AuthorizedHttp
+
+from app.services.rate_limiter import GoogleRateLimiter
+
+
+class GoogleApiExecutor:
+    """Bounded thread pool for executing googleapiclient requests."""
+
+    def __init__(
+        self,
+        credentials,
+        max_workers: int = 8,
+        timeout: Optional[float] = None,
+        http_factory: Optional[Callable[[], Any]] = None,
+        rate_limiter: Optional[GoogleRateLimiter] = None,
+    ):
+        """
+        Initialize the executor.
+
+        Args:
+            credentials: google-auth credentials used to authorize each thread's client
+            max_workers: Maximum number of concurrent Google API calls
+            timeout: Socket timeout in seconds for each HTTP client (None = library default)
+            http_factory: Builds each thread's transport instead of an authorized
+                          httplib2 client (e.g. a shared PooledHttp, or FakeGoogle.http)
+            rate_limiter: Quota limiter shared by every executor (None = no pacing or retries)
+        """
+        self.credentials = credentials
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.http_factory = http_factory
+        self.rate_limiter = rate_limiter
+        self._pending = 0  # calls submitted to the pool and not yet finished
+        self._local = threading.local()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="google-api",
+        )
+
+    def _get_http(self) -> Any:
+        """Get (or lazily create) the authorized HTTP client for the current thread."""
+        http = getattr(self._local, "http", None)
+        if http is None:
+            if self.http_factory:
+                http = self.http_factory()
+            else:
+                http = AuthorizedHttp(self.credentials, http=httplib2.Http(timeout=self.timeout))
+            self._local.http = http
+        return http
+
+    def _run(self, request) -> Any:
+        """Execute a request on the calling worker thread."""
+        return request.execute(http=self._get_http())
+
+    async def execute(self, request) -> Any:
+        """
+        Execute a googleapiclient HttpRequest without blocking the event loop.
+        With a rate limiter the call first waits for quota, and retryable
+        failures are retried after a backoff (without holding a worker thread).
+
+        Args:
+            request: An unexecuted request, e.g. service.spreadsheets().values().get(...)
+
+        Returns:
+            The decoded API response
+
+        Raises:
+            HttpError: If the call failed and was not (or no longer) retryable
+        """
+        loop = asyncio.get_running_loop()
+        attempt = 0
+        while True:
+            if self.rate_limiter:
+                await self.rate_limiter.acquire(request)
+
+            self._pending += 1
+            try:
+                return await loop.run_in_executor(self._executor, self._run, request)
+            except Exception as e:
+                delay = self.rate_limiter.retry_delay(request, e, attempt) if self.rate_limiter else None
+                if delay is None:
+                    raise
+                attempt += 1
+                print(f"⏳ Google API call failed ({e.__class__.__name__}), retry {attempt} in {delay:.1f}s")
+            finally:
+                self._pending -= 1
+
+            await asyncio.sleep(delay)
+
+    def stats(self) -> dict:
+        """Get executor statistics (calls queued for or running on worker threads)."""
+        return {
+            "max_workers": self.max_workers,
+            "pending": self._pending,
+            "rate_limiter": self.rate_limiter.stats() if self.rate_limiter else None,
+        }
+
+    def shutdown(self) -> None:
+        """Stop accepting new calls and release worker threads."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,88 @@
+"""
+Google Transport - Pooled keep-alive HTTP for the Google API clients.
+Wraps google-auth's AuthorizedSession (requests + urllib3 connection pool)
+in the httplib2 interface that googleapiclient expects, so every executor
+thread reuses warm TLS connections instead of opening its own.
+"""
+
+from typing import Any, Optional
+
+import httplib2
+import requests
+from google.auth.transport.requests import AuthorizedSession
+from googleapiclient.discovery import build
+from requests.adapters import HTTPAdapter
+
+
+class PooledHttp:
+    """
+    httplib2.Http-compatible transport backed by a pooled AuthorizedSession.
+
+    One instance is shared by all worker threads: urllib3's pool hands each
+    thread its own connection and keeps idle ones alive for reuse.
+    """
+
+    def __init__(
+        self,
+        credentials,
+        pool_size: int = 10,
+        connect_timeout: float = 10,
+        read_timeout: float = 60,
+    ):
+        """
+        Initialize the transport.
+
+        Args:
+            credentials: google-auth credentials (refreshed automatically)
+            pool_size: Keep-alive connections kept per host
+            connect_timeout: Seconds to wait for a connection
+            read_timeout: Seconds to wait for response data
+        """
+        self.timeout = (connect_timeout, read_timeout)
+        self.session = AuthorizedSession(credentials)
+        # Retries are handled by GoogleRateLimiter, not urllib3
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def request(
+        self,
+        uri: str,
+        method: str = "GET",
+        body=None,
+        headers: Optional[dict] = None,
+        redirections: int = httplib2.DEFAULT_MAX_REDIRECTS,
+        connection_type=None,
+    ) -> tuple[httplib2.Response, bytes]:
+        """Send a request the way httplib2.Http.request does and return (response, content)."""
+        try:
+            response = self.session.request(
+                method,
+                uri,
+                data=body,
+                headers=headers,
+                timeout=self.timeout,
+                allow_redirects=redirections > 0,
+            )
+        except requests.Timeout as e:
+            raise TimeoutError(str(e)) from e
+        except requests.ConnectionError as e:
+            raise ConnectionError(str(e)) from e
+
+        info = {key.lower(): value for key, value in response.headers.items()}
+        info["status"] = str(response.status_code)
+        # requests has already decoded the body
+        info.pop("content-encoding", None)
+        info.pop("content-length", None)
+        result = httplib2.Response(info)
+        result.reason = response.reason
+        return result, response.content
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        self.session.close()
+
+
+def build_client(service_name: str, version: str, http) -> Any:
+    """Build a googleapiclient resource from the bundled discovery document (no network fetch)."""
+    return build(service_name, version, http=http, static_discovery=True, cache_discovery=False)
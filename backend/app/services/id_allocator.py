@@ -0,0 +1,128 @@
+"""
+ID Allocator - Sequential record IDs (e.g. DLR-00001) handed out from memory.
+Counters are seeded once from the loaded sheet and then incremented under a
+per-counter lock, so creates need no extra reads, concurrent creates never share
+an ID, and seeding one sheet doesn't hold up IDs for the others.
+"""
+
+import asyncio
+import json
+from pathlib import Path
+from typing import Awaitable, Callable, Iterable, Optional
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:  # Windows
+    FCNTL_AVAILABLE = False
+
+
+def parse_id_number(id_value: str, prefix: str) -> Optional[int]:
+    """Extract the numeric part of an ID like DLR-00042, or None if it doesn't match."""
+    if not isinstance(id_value, str) or not id_value.startswith(prefix):
+        return None
+    try:
+        return int(id_value.split("-")[1])
+    except (IndexError, ValueError):
+        return None
+
+
+class IdAllocator:
+    """
+    Allocates per-(sheet, prefix) sequential IDs.
+
+    Modes:
+        local:    One process owns the counters (single uvicorn worker).
+        reserved: Each process reserves blocks of `block_size` numbers from a
+                  shared, file-locked high-water mark, so several workers on the
+                  same host can allocate without colliding (IDs may have gaps).
+    """
+
+    def __init__(self, mode: str = "local", block_size: int = 50, state_path: Optional[Path] = None):
+        if mode == "reserved" and (not FCNTL_AVAILABLE or state_path is None):
+            print("⚠️  Reserved ID ranges need fcntl and a state file - using local ID allocation")
+            mode = "local"
+
+        self.mode = mode
+        self.block_size = block_size
+        self.state_path = state_path
+        self._counters: dict[tuple[str, str], int] = {}  # last issued number
+        self._limits: dict[tuple[str, str], int] = {}  # last reserved number (reserved mode)
+        self._locks: dict[tuple[str, str], asyncio.Lock] = {}  # one per counter
+
+    async def allocate(
+        self,
+        sheet_name: str,
+        prefix: str,
+        count: int,
+        seed: Callable[[], Awaitable[int]],
+    ) -> list[str]:
+        """
+        Allocate `count` new IDs.
+
+        Args:
+            sheet_name: Sheet the IDs belong to
+            prefix: ID prefix (e.g. "DLR")
+            count: Number of IDs to allocate
+            seed: Coroutine factory returning the highest existing number in the sheet;
+                  called only the first time a (sheet, prefix) pair is used
+
+        Returns:
+            List of formatted IDs in ascending order
+        """
+        key = (sheet_name, prefix)
+        # Seeding loads the sheet; only allocations for this counter wait for it
+        async with self._locks.setdefault(key, asyncio.Lock()):
+            if key not in self._counters:
+                self._counters[key] = await seed()
+                self._limits[key] = self._counters[key]
+
+            start = self._counters[key] + 1
+            end = start + count - 1
+
+            if self.mode == "reserved" and end > self._limits[key]:
+                start = await asyncio.to_thread(self._reserve_block, key, count)
+                end = start + count - 1
+
+            self._counters[key] = end
+            return [f"{prefix}-{num:05d}" for num in range(start, end + 1)]
+
+    def observe(self, sheet_name: str, ids: Iterable[str]) -> None:
+        """
+        Advance seeded counters past IDs seen in freshly loaded data,
+        e.g. rows added to the spreadsheet by hand.
+        """
+        prefixes = [prefix for (name, prefix) in self._counters if name == sheet_name]
+        if not prefixes:
+            return
+
+        for prefix in prefixes:
+            key = (sheet_name, prefix)
+            numbers = [n for n in (parse_id_number(i, prefix) for i in ids) if n is not None]
+            if numbers and max(numbers) > self._counters[key]:
+                self._counters[key] = max(numbers)
+                self._limits[key] = max(self._limits[key], self._counters[key])
+
+    def _reserve_block(self, key: tuple[str, str], count: int) -> int:
+        """Reserve a block of numbers from the shared state file; returns the block start."""
+        state_key = ":".join(key)
+        self.state_path.touch(exist_ok=True)
+
+        with open(self.state_path, "r+") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                content = f.read()
+                state = json.loads(content) if content.strip() else {}
+
+                start = max(state.get(state_key, 0), self._counters[key]) + 1
+                limit = start + max(self.block_size, count) - 1
+                state[state_key] = limit
+
+                f.seek(0)
+                f.truncate()
+                json.dump(state, f)
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+        self._limits[key] = limit
+        return start
@@ -48,16 +48,21 @@ class PaymentService:
         payment_data["related_to"] = data.related_to.value
         payment_data["payment_mode"] = data.payment_mode.value
         
-        created = await self.sheets.create_payment(payment_data)
-        if not created:
-            return None
+        # Payment, balance and invoice status are flushed as one batch
+        async with self.sheets.batch() as batch:
+            created = await self.sheets.create_payment(payment_data)
+            if not created:
+                return None
+
+            # 1. Update Dealer Balance
+            await self._update_dealer_balance(dealer, data.payment_type, data.amount)
 
-        # 1. Update Dealer Balance
-        await self._update_dealer_balance(dealer, data.payment_type, data.amount)
+            # 2. Update Invoice Status
+            if data.related_to == RelatedTo.INVOICE and data.invoice_id:
+                await self._update_invoice_status(data.invoice_id, new_payment=created)
 
-        # 2. Update Invoice Status
-        if data.related_to == RelatedTo.INVOICE and data.invoice_id:
-            await self._update_invoice_status(data.invoice_id)
+        if batch.failed:
+            return None
 
         return Payment(**created)
 
@@ -84,7 +89,7 @@ class PaymentService:
           - OUT (Paid money): Increases Balance (towards positive/zero).
               e.g. Balance was -2000 (We owe). Paid 2000. Balance becomes 0. (-2000 + 2000).
         """
-        current_balance = float(dealer.get("current_balance", 0) or 0)
+        current_balance = dealer.get("current_balance") or 0
         
         if payment_type == PaymentType.INCOMING:
             new_balance = current_balance - amount
@@ -96,22 +101,27 @@ class PaymentService:
             {"current_balance": new_balance}
         )
 
-    async def _update_invoice_status(self, invoice_id: str):
-        """Recalculate total paid and update invoice status."""
+    async def _update_invoice_status(self, invoice_id: str, new_payment: Optional[dict] = None):
+        """
+        Recalculate total paid and update invoice status.
+        `new_payment` is a payment queued in the current write batch (not yet in the sheet).
+        """
         invoice = await self.sheets.get_invoice(invoice_id)
         if not invoice:
             return
 
         # Fetch all payments for this invoice
         payments = await self.sheets.get_payments(invoice_id=invoice_id)
+        if new_payment and not any(p.get("payment_id") == new_payment["payment_id"] for p in payments):
+            payments = [*payments, new_payment]
         
         # Calculate total paid (Only consider IN for Sales, OUT for Purchase??)
         # Usually Invoice -> Payment relation is strictly 1-way dependent on Invoice Type.
         # But `Payment` table stores Type.
         # Assumption: All payments linked to this Invoice count towards its settlement.
         
-        total_paid = sum(float(p.get("amount", 0)) for p in payments)
-        grand_total = float(invoice.get("grand_total", 0))
+        total_paid = sum(p.get("amount") or 0 for p in payments)
+        grand_total = invoice.get("grand_total") or 0
         
         balance_due = grand_total - total_paid
         
@@ -0,0 +1,231 @@
+"""
+Rate Limiter - Client-side model of the Google Sheets and Drive quotas.
+Calls wait for a token from the bucket of their quota (Sheets reads,
+Sheets writes, Drive) instead of tripping 429s, and quota or server errors
+are retried with jittered exponential backoff, so a burst of traffic turns
+into extra latency rather than empty responses.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+import httplib2
+from googleapiclient.errors import HttpError
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at `per_minute / 60` tokens per second.
+
+    Each call reserves a token immediately (the balance may go negative) and then
+    sleeps until its token has been earned, so waiting callers are served in order.
+    """
+
+    def __init__(self, name: str, per_minute: float, burst: Optional[int] = None):
+        """
+        Initialize the bucket.
+
+        Args:
+            name: Quota name shown in stats
+            per_minute: Sustained calls per minute (0 = unlimited)
+            burst: Calls allowed back to back when the bucket is full
+                   (defaults to a quarter of a minute's quota)
+        """
+        self.name = name
+        self.rate = per_minute / 60
+        self.capacity = burst or max(1, int(per_minute // 4))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+        # Stats
+        self.waiting = 0  # callers currently waiting for a token
+        self.acquired = 0
+        self.delayed = 0  # calls that had to wait
+        self.wait_seconds = 0.0
+        self.throttled = 0  # quota errors reported by Google
+        self.retries = 0
+
+    def _reserve(self) -> float:
+        """Take a token and return how long the caller must wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self.acquired += 1
+            if not self.rate:
+                return max(0.0, self._paused_until - now)
+
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            return max(wait, self._paused_until - now)
+
+    async def acquire(self) -> None:
+        """Wait until a call may be sent under this quota."""
+        wait = self._reserve()
+        if wait <= 0:
+            return
+
+        self.waiting += 1
+        self.delayed += 1
+        self.wait_seconds += wait
+        try:
+            await asyncio.sleep(wait)
+        finally:
+            self.waiting -= 1
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every call on this quota (after Google reported it exhausted)."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = min(self._tokens, 0.0)
+
+    def stats(self) -> dict:
+        """Get bucket statistics."""
+        with self._lock:
+            tokens = min(self.capacity, self._tokens + (time.monotonic() - self._updated) * self.rate)
+        return {
+            "per_minute": round(self.rate * 60),
+            "burst": self.capacity,
+            "available": round(tokens, 2) if self.rate else None,
+            "waiting": self.waiting,
+            "acquired": self.acquired,
+            "delayed": self.delayed,
+            "wait_seconds": round(self.wait_seconds, 2),
+            "throttled": self.throttled,
+            "retries": self.retries,
+        }
+
+
+class GoogleRateLimiter:
+    """
+    Shared limiter for every Google API call made by the services.
+
+    Requests are classified by URI and method into the Sheets read, Sheets write
+    and Drive quotas. Failed calls are retried when that is safe:
+        - 429 and 403 rate-limit errors always (Google rejected the call)
+        - 5xx and connection errors only for idempotent requests, so an
+          append or file creation is never applied twice
+    """
+
+    RETRY_STATUSES = {500, 502, 503, 504}
+    RATE_LIMIT_REASONS = (b"rateLimitExceeded", b"userRateLimitExceeded", b"RESOURCE_EXHAUSTED")
+
+    def __init__(
+        self,
+        sheets_reads_per_minute: float = 60,
+        sheets_writes_per_minute: float = 60,
+        drive_per_minute: float = 1000,
+        max_retries: int = 5,
+        backoff_base: float = 1.0,
+        backoff_max: float = 32.0,
+    ):
+        """
+        Initialize the limiter.
+
+        Args:
+            sheets_reads_per_minute: Sheets read quota per user (0 = unlimited)
+            sheets_writes_per_minute: Sheets write quota per user (0 = unlimited)
+            drive_per_minute: Drive quota per user (0 = unlimited)
+            max_retries: Retries per call before the error is raised
+            backoff_base: First backoff delay in seconds (doubled per retry)
+            backoff_max: Upper bound of a single backoff delay in seconds
+        """
+        self.buckets = {
+            "sheets_read": TokenBucket("sheets_read", sheets_reads_per_minute),
+            "sheets_write": TokenBucket("sheets_write", sheets_writes_per_minute),
+            "drive": TokenBucket("drive", drive_per_minute),
+        }
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.failures = 0  # calls that still failed after retrying
+
+    def bucket_for(self, request) -> TokenBucket:
+        """Pick the quota a googleapiclient request counts against."""
+        uri = getattr(request, "uri", "") or ""
+        if "sheets.googleapis.com" in uri:
+            method = getattr(request, "method", "GET")
+            return self.buckets["sheets_read" if method == "GET" else "sheets_write"]
+        return self.buckets["drive"]
+
+    async def acquire(self, request) -> None:
+        """Wait for a token for this request."""
+        await self.bucket_for(request).acquire()
+
+    @staticmethod
+    def _idempotent(request) -> bool:
+        """True if sending the request twice has the same effect as sending it once."""
+        method = getattr(request, "method", "GET")
+        uri = getattr(request, "uri", "") or ""
+        return method != "POST" or "/values:batch" in uri
+
+    @staticmethod
+    def _retry_after(error: HttpError) -> Optional[float]:
+        """Parse a Retry-After header (seconds or HTTP date), if present."""
+        value = error.resp.get("retry-after") if error.resp else None
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    def retry_delay(self, request, error: Exception, attempt: int) -> Optional[float]:
+        """
+        Decide whether a failed call should be retried.
+
+        Args:
+            request: The request that failed
+            error: The exception it raised
+            attempt: Retries already made for this call (0 for the first failure)
+
+        Returns:
+            Seconds to wait before retrying, or None to give up and raise
+        """
+        bucket = self.bucket_for(request)
+        rate_limited = False
+        retry_after = None
+
+        if isinstance(error, HttpError):
+            status = error.resp.status
+            rate_limited = status == 429 or (
+                status == 403 and any(reason in (error.content or b"") for reason in self.RATE_LIMIT_REASONS)
+            )
+            if not rate_limited and not (status in self.RETRY_STATUSES and self._idempotent(request)):
+                return None
+            retry_after = self._retry_after(error)
+        elif not (isinstance(error, (ConnectionError, TimeoutError, httplib2.HttpLib2Error)) and self._idempotent(request)):
+            return None
+
+        if rate_limited:
+            bucket.throttled += 1
+        if attempt >= self.max_retries:
+            self.failures += 1
+            return None
+
+        # Full jitter: a random delay up to the exponential bound spreads retries out
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        if rate_limited:
+            bucket.pause(delay)
+        bucket.retries += 1
+        return delay
+
+    def stats(self) -> dict:
+        """Get limiter statistics, including queue depth per quota."""
+        return {
+            "queue_depth": sum(bucket.waiting for bucket in self.buckets.values()),
+            "failures": self.failures,
+            "quotas": {name: bucket.stats() for name, bucket in self.buckets.items()},
+        }
@@ -0,0 +1,322 @@
+"""
+Shared Cache - Second cache tier shared by all worker processes.
+A sheet loaded by one gunicorn worker is stored here and served to the
+others, and every change is broadcast as an invalidation message so no
+worker keeps serving a copy another worker has replaced or dropped.
+"""
+
+import os
+import sqlite3
+import struct
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Optional
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+
+class SharedCache:
+    """
+    Base class for shared cache backends.
+
+    Values are opaque bytes (CacheService pickles them). Each instance has an
+    `origin` id; `poll()` returns only messages published by other instances.
+    The store must be trusted: values are unpickled when read.
+    """
+
+    name = "shared"
+
+    def __init__(self):
+        self.origin = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.stats = {"hits": 0, "misses": 0, "sets": 0, "deletes": 0, "messages": 0, "errors": 0}
+
+    def get(self, namespace: str, key: str) -> Optional[tuple[bytes, float]]:
+        """Get (value, stored_at wall-clock time) or None if absent or expired."""
+        raise NotImplementedError
+
+    def set(self, namespace: str, key: str, value: bytes, stored_at: float, ttl: float) -> None:
+        """Store a value for `ttl` seconds after `stored_at` and tell the other workers."""
+        raise NotImplementedError
+
+    def delete(self, namespace: Optional[str] = None, key: Optional[str] = None) -> None:
+        """Delete a key, a whole namespace (key=None) or everything (namespace=None), and tell the other workers."""
+        raise NotImplementedError
+
+    def poll(self) -> list[tuple[Optional[str], Optional[str]]]:
+        """Get (namespace, key) invalidations published by other workers since the last poll."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release connections."""
+
+    def get_stats(self) -> dict:
+        """Get backend statistics."""
+        return {"backend": self.name, **self.stats}
+
+
+class SqliteSharedCache(SharedCache):
+    """
+    Shared cache in a SQLite file, for workers on the same host.
+
+    Entries live in one table; invalidations are appended to a message table
+    that every worker reads from the last sequence number it has seen.
+    Calls may come from several threads; they take turns on the connection.
+    """
+
+    name = "sqlite"
+    MAX_MESSAGES = 10000  # older messages are pruned
+
+    def __init__(self, path: Path):
+        """
+        Open (or create) the shared cache file.
+
+        Args:
+            path: SQLite file shared by the workers
+        """
+        super().__init__()
+        self.path = path
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS entries (
+                namespace TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value BLOB NOT NULL,
+                stored_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            )
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS messages (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                origin TEXT NOT NULL,
+                namespace TEXT,
+                key TEXT
+            )
+            """
+        )
+        # Only messages published from now on concern this worker
+        self._last_seq = self._conn.execute("SELECT COALESCE(MAX(seq), 0) FROM messages").fetchone()[0]
+
+    def _publish(self, namespace: Optional[str], key: Optional[str]) -> None:
+        """Append an invalidation message (inside the caller's transaction)."""
+        cursor = self._conn.execute(
+            "INSERT INTO messages (origin, namespace, key) VALUES (?, ?, ?)",
+            (self.origin, namespace, key),
+        )
+        if cursor.lastrowid % 1000 == 0:
+            self._conn.execute("DELETE FROM messages WHERE seq <= ?", (cursor.lastrowid - self.MAX_MESSAGES,))
+            self._conn.execute("DELETE FROM entries WHERE expires_at < ?", (time.time(),))
+
+    def get(self, namespace: str, key: str) -> Optional[tuple[bytes, float]]:
+        """Get a value that has not expired."""
+        try:
+            with self._lock:
+                record = self._conn.execute(
+                    "SELECT value, stored_at FROM entries WHERE namespace = ? AND key = ? AND expires_at > ?",
+                    (namespace, key, time.time()),
+                ).fetchone()
+        except sqlite3.Error as e:
+            self.stats["errors"] += 1
+            print(f"⚠️  Shared cache read failed: {e}")
+            return None
+
+        self.stats["hits" if record else "misses"] += 1
+        return (record[0], record[1]) if record else None
+
+    def set(self, namespace: str, key: str, value: bytes, stored_at: float, ttl: float) -> None:
+        """Store a value and publish its invalidation in one transaction."""
+        try:
+            with self._lock, self._conn:
+                self._conn.execute("BEGIN IMMEDIATE")
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO entries (namespace, key, value, stored_at, expires_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (namespace, key, value, stored_at, stored_at + ttl),
+                )
+                self._publish(namespace, key)
+            self.stats["sets"] += 1
+        except sqlite3.Error as e:
+            self.stats["errors"] += 1
+            print(f"⚠️  Shared cache write failed: {e}")
+
+    def delete(self, namespace: Optional[str] = None, key: Optional[str] = None) -> None:
+        """Delete entries and publish the invalidation in one transaction."""
+        if namespace is None:
+            where, params = "", ()
+        elif key is None:
+            where, params = "WHERE namespace = ?", (namespace,)
+        else:
+            where, params = "WHERE namespace = ? AND key = ?", (namespace, key)
+
+        try:
+            with self._lock, self._conn:
+                self._conn.execute("BEGIN IMMEDIATE")
+                self._conn.execute(f"DELETE FROM entries {where}", params)
+                self._publish(namespace, key)
+            self.stats["deletes"] += 1
+        except sqlite3.Error as e:
+            self.stats["errors"] += 1
+            print(f"⚠️  Shared cache delete failed: {e}")
+
+    def poll(self) -> list[tuple[Optional[str], Optional[str]]]:
+        """Read messages published since the last poll."""
+        try:
+            with self._lock:
+                records = self._conn.execute(
+                    "SELECT seq, origin, namespace, key FROM messages WHERE seq > ? ORDER BY seq",
+                    (self._last_seq,),
+                ).fetchall()
+        except sqlite3.Error as e:
+            self.stats["errors"] += 1
+            print(f"⚠️  Shared cache poll failed: {e}")
+            return []
+
+        if records:
+            self._last_seq = records[-1][0]
+        messages = [(namespace, key) for _, origin, namespace, key in records if origin != self.origin]
+        self.stats["messages"] += len(messages)
+        return messages
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            self._conn.close()
+
+
+class RedisSharedCache(SharedCache):
+    """
+    Shared cache on a Redis server, for workers on one or more hosts.
+
+    Values are stored with a TTL, namespace members are tracked in a set so a
+    namespace can be dropped exactly, and invalidations go through a capped
+    stream that every worker reads from the last id it has seen.
+    """
+
+    name = "redis"
+    MAX_MESSAGES = 10000
+
+    def __init__(self, url: str, prefix: str = "bankim:cache"):
+        """
+        Connect to Redis.
+
+        Args:
+            url: Server URL, e.g. redis://localhost:6379/0
+            prefix: Prefix of every key this cache uses
+        """
+        super().__init__()
+        self.client = redis.Redis.from_url(url, socket_timeout=5, socket_connect_timeout=5)
+        self.prefix = prefix
+        self.stream = f"{prefix}:invalidations"
+        self._last_id = "0-0"
+        try:
+            latest = self.client.xrevrange(self.stream, count=1)
+            if latest:
+                self._last_id = latest[0][0]
+        except redis.RedisError as e:
+            self.stats["errors"] += 1
+            print(f"⚠️  Shared cache (Redis) not reachable: {e}")
+
+    def _key(self, namespace: str, key: str) -> str:
+        return f"{self.prefix}:entry:{namespace}:{key}"
+
+    def _members(self, namespace: str) -> str:
+        return f"{self.prefix}:members:{namespace}"
+
+    def _publish(self, pipe, namespace: Optional[str], key: Optional[str]) -> None:
+        """Queue an invalidation message on a pipeline ("" stands for None)."""
+        pipe.xadd(
+            self.stream,
+            {"origin": self.origin, "namespace": namespace or "", "key": key or ""},
+            maxlen=self.MAX_MESSAGES,
+            approximate=True,
+        )
+
+    def get(self, namespace: str, key: str) -> Optional[tuple[bytes, float]]:
+        """Get a value (Redis expires it after its TTL)."""
+        try:
+            raw = self.client.get(self._key(namespace, key))
+        except redis.RedisError as e:
+            self.stats["errors"] += 1
+            print(f"⚠️  Shared cache read failed: {e}")
+            return None
+
+        self.stats["hits" if raw else "misses"] += 1
+        if not raw:
+            return None
+        (stored_at,) = struct.unpack_from("!d", raw)
+        return raw[8:], stored_at
+
+    def set(self, namespace: str, key: str, value: bytes, stored_at: float, ttl: float) -> None:
+        """Store a value and publish its invalidation in one round-trip."""
+        remaining = stored_at + ttl - time.time()
+        if remaining <= 0:
+            return
+        try:
+            pipe = self.client.pipeline()
+            pipe.set(self._key(namespace, key), struct.pack("!d", stored_at) + value, px=int(remaining * 1000))
+            pipe.sadd(self._members(namespace), key)
+            self._publish(pipe, namespace, key)
+            pipe.execute()
+            self.stats["sets"] += 1
+        except redis.RedisError as e:
+            self.stats["errors"] += 1
+            print(f"⚠️  Shared cache write failed: {e}")
+
+    def delete(self, namespace: Optional[str] = None, key: Optional[str] = None) -> None:
+        """Delete entries and publish the invalidation."""
+        try:
+            if namespace is None:
+                namespaces = [
+                    member.decode().split(":members:", 1)[1]
+                    for member in self.client.scan_iter(match=f"{self.prefix}:members:*")
+                ]
+            else:
+                namespaces = [namespace]
+
+            pipe = self.client.pipeline()
+            for name in namespaces:
+                keys = [key] if key is not None else [member.decode() for member in self.client.smembers(self._members(name))]
+                if keys:
+                    pipe.delete(*(self._key(name, k) for k in keys))
+                    pipe.srem(self._members(name), *keys)
+            self._publish(pipe, namespace, key)
+            pipe.execute()
+            self.stats["deletes"] += 1
+        except redis.RedisError as e:
+            self.stats["errors"] += 1
+            print(f"⚠️  Shared cache delete failed: {e}")
+
+    def poll(self) -> list[tuple[Optional[str], Optional[str]]]:
+        """Read messages published since the last poll."""
+        try:
+            result = self.client.xread({self.stream: self._last_id}, count=1000)
+        except redis.RedisError as e:
+            self.stats["errors"] += 1
+            print(f"⚠️  Shared cache poll failed: {e}")
+            return []
+
+        messages = []
+        for _, entries in result:
+            for message_id, fields in entries:
+                self._last_id = message_id
+                if fields[b"origin"].decode() != self.origin:
+                    messages.append((fields[b"namespace"].decode() or None, fields[b"key"].decode() or None))
+        self.stats["messages"] += len(messages)
+        return messages
+
+    def close(self) -> None:
+        """Close the connection pool."""
+        self.client.close()
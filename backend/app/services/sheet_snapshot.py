@@ -0,0 +1,121 @@
+"""
+Sheet Snapshot - Local SQLite copy of the loaded sheets.
+Lets a restarted server answer from the last known data while it
+revalidates against Google Sheets in the background.
+"""
+
+import json
+import sqlite3
+import time
+import zlib
+from pathlib import Path
+
+
+class SheetSnapshot:
+    """Persists raw sheet rows together with the spreadsheet version they were read at."""
+
+    def __init__(self, path: Path):
+        """
+        Initialize the snapshot store.
+
+        Args:
+            path: SQLite file to read and write (created on first save)
+        """
+        self.path = path
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the snapshot database, creating the table if needed."""
+        conn = sqlite3.connect(self.path)
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS sheets (
+                spreadsheet_id TEXT NOT NULL,
+                sheet_name TEXT NOT NULL,
+                columns TEXT NOT NULL,
+                version TEXT,
+                loaded_rows INTEGER NOT NULL,
+                saved_at REAL NOT NULL,
+                rows BLOB NOT NULL,
+                PRIMARY KEY (spreadsheet_id, sheet_name)
+            )
+            """
+        )
+        return conn
+
+    def load(self, spreadsheet_id: str) -> dict[str, dict]:
+        """
+        Read every saved sheet of a spreadsheet.
+
+        Returns:
+            sheet_name -> {"columns", "version", "loaded_rows", "saved_at", "rows"};
+            empty if there is no usable snapshot
+        """
+        if not self.path.exists():
+            return {}
+
+        try:
+            conn = self._connect()
+            try:
+                records = conn.execute(
+                    "SELECT sheet_name, columns, version, loaded_rows, saved_at, rows "
+                    "FROM sheets WHERE spreadsheet_id = ?",
+                    (spreadsheet_id,),
+                ).fetchall()
+            finally:
+                conn.close()
+
+            return {
+                sheet_name: {
+                    "columns": json.loads(columns),
+                    "version": version,
+                    "loaded_rows": loaded_rows,
+                    "saved_at": saved_at,
+                    "rows": json.loads(zlib.decompress(rows)),
+                }
+                for sheet_name, columns, version, loaded_rows, saved_at, rows in records
+            }
+
+        except (sqlite3.Error, zlib.error, ValueError) as e:
+            print(f"⚠️  Could not read sheet snapshot {self.path}: {e}")
+            return {}
+
+    def save(self, spreadsheet_id: str, sheets: dict[str, dict]) -> None:
+        """
+        Write (replace) the given sheets.
+
+        Args:
+            spreadsheet_id: Spreadsheet the rows belong to
+            sheets: sheet_name -> {"columns", "version", "loaded_rows", "rows"}
+        """
+        if not sheets:
+            return
+
+        now = time.time()
+        records = [
+            (
+                spreadsheet_id,
+                sheet_name,
+                json.dumps(sheet["columns"]),
+                sheet["version"],
+                sheet["loaded_rows"],
+                now,
+                zlib.compress(json.dumps(sheet["rows"], separators=(",", ":"), default=str).encode()),
+            )
+            for sheet_name, sheet in sheets.items()
+        ]
+
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO sheets "
+                        "(spreadsheet_id, sheet_name, columns, version, loaded_rows, saved_at, rows) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        records,
+                    )
+            finally:
+                conn.close()
+
+        except sqlite3.Error as e:
+            print(f"⚠️  Could not write sheet snapshot {self.path}: {e}")
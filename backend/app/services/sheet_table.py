@@ -0,0 +1,240 @@
+"""
+Sheet Table - In-memory representation of a loaded sheet.
+Holds the decoded rows together with lookup indexes built once per load.
+Row dicts are never changed in place once built (writes replace them), so
+copies of a table share them; index buckets are shared too until one of the
+copies writes to them. Readers can pin the table's revision and later get a
+copy as of that revision (see `as_of`).
+"""
+
+import copy
+import sys
+from itertools import islice
+from typing import Any, Optional
+
+from app.services.cache_service import approximate_size
+from app.services.storage_engine import numeric_sort_key
+
+
+class _Bucket(dict):
+    """Rows with one value of an indexed field, by position in the table, tagged with the table that may change it in place."""
+
+    __slots__ = ("owner",)
+
+
+class SheetTable:
+    """Rows of one sheet plus a primary-key index and optional secondary indexes."""
+
+    def __init__(self, name: str, columns: list, rows: list[dict], index_fields: Optional[list[str]] = None):
+        """
+        Build the table and its indexes.
+
+        Args:
+            name: Sheet (tab) name
+            columns: Column mapping for the sheet; the first column is the id
+            rows: Decoded rows in sheet order
+            index_fields: Foreign-key style columns to build secondary indexes on
+        """
+        self.name = name
+        self.columns = columns
+        self.id_field = columns[0]
+        self.rows = rows
+        # Where the rows came from, set by the storage backend
+        self.version: Optional[str] = None  # Drive version the sheet was read at
+        self.loaded_rows = len(rows)  # sheet rows read (excludes rows appended locally)
+        self.by_id: dict[Any, dict] = {}
+        self._positions: dict[Any, int] = {}  # id -> index in rows of the row in by_id
+        self.indexes: dict[str, dict[Any, _Bucket]] = {
+            field: {} for field in (index_fields or [])
+        }
+        self._owner = object()  # tags the buckets this table may change in place (not shared with a copy)
+        self._sorted: dict[str, list[dict]] = {}  # field -> rows in numeric order, built on first use
+        self.revision = 0  # bumped by every write
+        self._pins: dict[int, int] = {}  # revision -> readers pinned to it
+        self._history: list[tuple] = []  # (revision, undo record) of writes made while pinned
+
+        for position, row in enumerate(rows):
+            self._index_id(row, position)
+            for field in self.indexes:
+                self._bucket(field, row.get(field))[position] = row
+
+    def _bucket(self, field: str, value: Any) -> _Bucket:
+        """Get the bucket of an indexed value to change, copying it first if another copy of the table shares it."""
+        index = self.indexes[field]
+        bucket = index.get(value)
+        if bucket is None or bucket.owner is not self._owner:
+            bucket = index[value] = _Bucket(bucket or ())
+            bucket.owner = self._owner
+        return bucket
+
+    def _index_id(self, row: dict, position: int) -> bool:
+        """Add a row to the primary-key index (first occurrence wins, like a scan); False if already taken."""
+        key = row.get(self.id_field)
+        if key not in (None, "") and key not in self.by_id:
+            self.by_id[key] = row
+            self._positions[key] = position
+            return True
+        return False
+
+    def _written(self, *undo) -> None:
+        """Count a write, keeping how to undo it while a reader is pinned to an earlier revision."""
+        if self._pins:
+            self._history.append((self.revision, undo))
+        self.revision += 1
+
+    def pin(self) -> int:
+        """Pin the current revision (so `as_of` can return it later) and return it."""
+        self._pins[self.revision] = self._pins.get(self.revision, 0) + 1
+        return self.revision
+
+    def unpin(self, revision: int) -> None:
+        """Release a pin, dropping undo records no pinned revision needs anymore."""
+        remaining = self._pins.get(revision, 0) - 1
+        if remaining > 0:
+            self._pins[revision] = remaining
+        else:
+            self._pins.pop(revision, None)
+        oldest = min(self._pins, default=self.revision)
+        if self._history and self._history[0][0] < oldest:
+            self._history = [record for record in self._history if record[0] >= oldest]
+
+    def as_of(self, revision: int) -> "SheetTable":
+        """Get a copy of the table as it was at a pinned `revision` (later writes undone)."""
+        table = self.copy()
+        for written_at, undo in reversed(self._history):
+            if written_at < revision:
+                break
+            if undo[0] == "append":
+                table._remove_appended(*undo[1:])
+            else:
+                table._replace(*undo[1:])
+        table.revision = revision
+        return table
+
+    def append(self, rows: list[dict]) -> None:
+        """Add newly written rows to the table and its indexes."""
+        indexed = []
+        for row in rows:
+            position = len(self.rows)
+            self.rows.append(row)
+            if self._index_id(row, position):
+                indexed.append(row.get(self.id_field))
+            for field in self.indexes:
+                self._bucket(field, row.get(field))[position] = row
+        self._sorted.clear()
+        self._written("append", len(rows), indexed)
+
+    def _remove_appended(self, count: int, indexed: list) -> None:
+        """Undo an append of `count` rows (`indexed` are the ids it added to the primary-key index)."""
+        start = len(self.rows) - count
+        for key in indexed:
+            del self.by_id[key]
+            del self._positions[key]
+        for field, index in self.indexes.items():
+            for position in range(start, len(self.rows)):
+                value = self.rows[position].get(field)
+                bucket = self._bucket(field, value)
+                del bucket[position]
+                if not bucket:
+                    del index[value]
+        del self.rows[start:]
+        self._sorted.clear()
+
+    def update(self, id_value: Any, changes: dict) -> bool:
+        """Replace an existing row with a copy that has the changes merged in, keeping indexes current."""
+        row = self.by_id.get(id_value)
+        if row is None:
+            return False
+
+        self._replace(id_value, {**row, **changes})
+        self._written("update", id_value, row)
+        return True
+
+    def _replace(self, id_value: Any, updated: dict) -> None:
+        """Put `updated` in place of the row with this id, in the rows and every index."""
+        row = self.by_id[id_value]
+        position = self._positions[id_value]
+        for field in self.indexes:
+            if updated.get(field) != row.get(field):
+                del self._bucket(field, row.get(field))[position]
+            self._bucket(field, updated.get(field))[position] = updated
+
+        self.rows[position] = updated
+        self.by_id[id_value] = updated
+        self._sorted.clear()  # re-sorted on next use
+
+    def copy(self) -> "SheetTable":
+        """
+        Copy the table so either copy can be changed without affecting the
+        other. Rows, index buckets and sort orders are shared; each copy
+        copies a bucket the first time it writes to it.
+        """
+        table = copy.copy(self)
+        table.rows = list(self.rows)
+        table.by_id = dict(self.by_id)
+        table._positions = dict(self._positions)
+        table.indexes = {field: dict(index) for field, index in self.indexes.items()}
+        table._sorted = dict(self._sorted)
+        # Neither table owns the (now shared) buckets anymore
+        table._owner = object()
+        self._owner = object()
+        table._pins = {}
+        table._history = []
+        return table
+
+    def __getstate__(self) -> dict:
+        # Pins belong to readers in this process
+        return {**self.__dict__, "_pins": {}, "_history": []}
+
+    def get(self, id_value: Any) -> Optional[dict]:
+        """Look up a row by its id in O(1)."""
+        return self.by_id.get(id_value)
+
+    def find(self, field: str, value: Any) -> Optional[dict]:
+        """Look up the first row where `field` equals `value`."""
+        if field == self.id_field:
+            return self.get(value)
+        for row in self.rows:
+            if row.get(field) == value:
+                return row
+        return None
+
+    def sorted_by(self, field: str) -> list[dict]:
+        """Get the rows ordered by the numeric value of `field` (sorted once until the table changes)."""
+        ordered = self._sorted.get(field)
+        if ordered is None:
+            ordered = self._sorted[field] = sorted(self.rows, key=lambda row: numeric_sort_key(row.get(field)))
+        return list(ordered)
+
+    def filter(self, filters: dict) -> list[dict]:
+        """
+        Get rows matching all filter criteria.
+        Uses the most selective secondary index among the filter keys, if any.
+        """
+        candidates = self.rows
+        for field, value in filters.items():
+            index = self.indexes.get(field)
+            if index is not None:
+                bucket = index.get(value, {})
+                if len(bucket) < len(candidates):
+                    candidates = bucket.values()
+
+        return [
+            row for row in candidates
+            if all(row.get(key) == value for key, value in filters.items())
+        ]
+
+    def approximate_size(self) -> int:
+        """Estimate the table's memory in bytes (used by the cache's byte budgets)."""
+        # Indexes point at the same row dicts: count only their own containers,
+        # extrapolating bucket sizes from a sample (re-measured on every write)
+        index_size = sys.getsizeof(self.by_id) + sys.getsizeof(self._positions)
+        for index in self.indexes.values():
+            buckets = list(islice(index.values(), 50))
+            index_size += sys.getsizeof(index)
+            if buckets:
+                index_size += int(sum(map(sys.getsizeof, buckets)) / len(buckets) * len(index))
+        return approximate_size(self.rows) + index_size
+
+    def __len__(self) -> int:
+        return len(self.rows)
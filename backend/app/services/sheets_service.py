@@ -3,131 +3,181 @@ Google Sheets Service - CRUD operations for all data storage.
 Uses Service Account authentication for server-to-server access.
 """
 
+import asyncio
 import os
+import re
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
 from datetime import datetime
 from typing import Any, Optional
 from pathlib import Path
 
 from google.oauth2 import service_account
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 
+from app.services.google_executor import GoogleApiExecutor
+from app.services.google_transport import PooledHttp, build_client
+from app.services.rate_limiter import GoogleRateLimiter
+from app.services.id_allocator import IdAllocator, parse_id_number
+from app.services.sheet_snapshot import SheetSnapshot
+from app.services.sheet_table import SheetTable
+from app.services.storage_engine import StorageEngine, WriteBatch, decode_cell
 
-class SheetsService:
-    """Service for Google Sheets operations."""
-    
-    # Sheet names matching our schema
-    SHEETS = {
-        "designs": "Designs",
-        "variants": "ProductVariants",
-        "dealers": "Dealers",
-        "designers": "Designers",
-        "materials": "Materials",
-        "invoices": "Invoices",
-        "invoice_items": "InvoiceItems",
-        "cost_breakdown": "CostBreakdown",
-        "settings": "Settings",
-        "workflow_stages": "WorkflowStages",
-        "product_progress": "ProductProgress",
-        "payments": "Payments",
-        "plating_rates": "PlatingRates",
-        "plating_jobs": "PlatingJobs",
-    }
-    
-    # Column mappings for each sheet (0-indexed)
-    DESIGN_COLUMNS = [
-        "design_id", "name", "category", "designer_id",
-        "base_design_cost", "image_drive_link", "spec_doc_link",
-        "notes", "status", "created_at", "updated_at"
-    ]
 
-    VARIANT_COLUMNS = [
-        "variant_id", "design_id", "variant_code", "size", "finish",
-        "material_cost", "making_cost", "finishing_cost", "packing_cost", "design_cost",
-        "final_cost", "selling_price", "profit", "profit_margin",
-        "stock_qty", "image_drive_link",
-        "notes", "status", "created_at", "updated_at"
-    ]
-    DEALER_COLUMNS = [
-        "dealer_id", "dealer_code", "dealer_type", "dealer_category", "name",
-        "contact_person", "phone", "email", "address", "gstin",
-        "bank_name", "account_no", "ifsc", "opening_balance", "current_balance",
-        "notes", "status", "created_at", "updated_at"
-    ]
+# Active write batch for the current request/task (None = write immediately)
+_write_batch: ContextVar[Optional[WriteBatch]] = ContextVar("sheets_write_batch", default=None)
+
+
+class ReadScope:
+    """
+    Sheet tables read inside `async with sheets.read_scope():`, one load per sheet.
     
-    DESIGNER_COLUMNS = [
-        "designer_id", "name", "company", "phone", "email",
-        "charge_type", "default_rate", "specialization", "portfolio",
-        "notes", "status", "created_at", "updated_at"
-    ]
+    Each table is pinned at the revision it was read at. Other requests'
+    writes patch the shared table in place; the scope notices the newer
+    revision on its next read and switches to a copy as of its pinned revision.
+    """
     
-    MATERIAL_COLUMNS = [
-        "material_id", "name", "category", "unit",
-        "current_stock", "min_stock_alert",
-        "last_purchase_price", "last_purchase_date",
-        "notes", "status", "created_at", "updated_at"
-    ]
+    def __init__(self):
+        self.tables: dict[str, asyncio.Future] = {}  # sheet_name -> table load
+        self.pins: dict[str, tuple[SheetTable, int]] = {}  # sheet_name -> (table, revision read at)
+        self.active = True  # False once the scope exits (tasks it spawned may outlive it)
+        self.loads = 0
+        self.reuses = 0
+        self.snapshots = 0  # copies made because another request wrote to a held table
     
-    INVOICE_COLUMNS = [
-        "invoice_id", "invoice_number", "invoice_type", "dealer_id",
-        "invoice_date", "due_date", "sub_total", "tax_percent", "tax_amount",
-        "discount_percent", "discount_amount", "grand_total", "amount_paid",
-        "balance_due", "payment_status", "bill_image_link", "notes",
-        "created_at", "updated_at"
-    ]
+    def peek(self, sheet_name: str) -> Optional[SheetTable]:
+        """Get a table this scope already holds (as of the revision it read), or None."""
+        task = self.tables.get(sheet_name)
+        if task is None or not task.done() or task.cancelled() or task.exception() is not None:
+            return None
+        
+        table = task.result()
+        pinned = self.pins.get(sheet_name)
+        if pinned is not None and pinned[0] is table and table.revision != pinned[1]:
+            self.snapshots += 1
+            table = table.as_of(pinned[1])
+            self.put(sheet_name, table)
+        return table
     
-    INVOICE_ITEM_COLUMNS = [
-        "item_id", "invoice_id", "product_id", "description", "quantity",
-        "unit_price", "total_price", "cost_type", "notes"
-    ]
+    def pin(self, sheet_name: str, table: SheetTable) -> None:
+        """Keep reading `table` as of its current revision (no-op once the scope has exited)."""
+        self.unpin(sheet_name)
+        if self.active:
+            self.pins[sheet_name] = (table, table.pin())
     
-    COST_BREAKDOWN_COLUMNS = [
-        "breakdown_id", "product_id", "cost_type", "invoice_id", "dealer_id",
-        "amount", "date", "notes", "created_at"
-    ]
+    def unpin(self, sheet_name: str) -> None:
+        """Release the pinned revision of a sheet's table."""
+        pinned = self.pins.pop(sheet_name, None)
+        if pinned is not None:
+            pinned[0].unpin(pinned[1])
     
-    SETTINGS_COLUMNS = [
-        "setting_key", "setting_value", "category", "updated_at"
-    ]
+    def put(self, sheet_name: str, table: SheetTable) -> None:
+        """Hold `table` for the rest of the scope (e.g. after this request wrote to it)."""
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(table)
+        self.tables[sheet_name] = future
+        self.pin(sheet_name, table)
     
-    WORKFLOW_STAGE_COLUMNS = [
-        "stage_order", "stage_code", "display_name", "is_final_stage"
-    ]
+    def forget(self, sheet_name: str) -> None:
+        """Read the sheet again on its next use in this scope."""
+        self.tables.pop(sheet_name, None)
+        self.unpin(sheet_name)
     
-    PRODUCT_PROGRESS_COLUMNS = [
-        "progress_id", "variant_id", "design_id", "stage_code",
-        "assigned_dealer_id", "quantity", "status", "cost",
-        "start_date", "end_date", "remarks",
-        "created_at", "updated_at"
-    ]
+    def close(self) -> None:
+        """Release every table (the scope has exited)."""
+        self.active = False
+        for sheet_name in list(self.pins):
+            self.unpin(sheet_name)
+        self.tables.clear()
+
+
+# Reads memoized for the current request (None = every read goes to the cache)
+_read_scope: ContextVar[Optional[ReadScope]] = ContextVar("sheets_read_scope", default=None)
+
+
+class SheetsService(StorageEngine):
+    """Storage backend that keeps all records in a Google Sheets spreadsheet."""
     
-    PAYMENT_COLUMNS = [
-        "payment_id", "payment_type", "related_to", "invoice_id",
-        "progress_id", "dealer_id", "amount", "payment_mode",
-        "reference_no", "payment_date", "notes",
-        "created_at", "updated_at"
-    ]
+    # Above this share of changed rows a tail refresh falls back to a full reload
+    TAIL_REFRESH_MAX_CHANGED = 0.25
     
-    PLATING_RATE_COLUMNS = [
-        "rate_id", "plating_type", "rate_per_kg", "unit", 
-        "effective_from", "vendor_dealer_id", "status",
-        "created_at", "updated_at"
-    ]
+    # Each sheet is its own cache namespace holding one table under this identifier
+    TABLE = "table"
     
-    PLATING_JOB_COLUMNS = [
-        "job_id", "progress_id", "variant_id", "design_id", 
-        "dealer_id", "quantity", "plating_type", "weight_in_kg", "rate_per_kg", 
-        "calculated_cost", "status", "start_date", "end_date", "notes",
-        "created_at", "updated_at"
-    ]
+    # Data reads return numbers and booleans as JSON values (decoded by COLUMN_TYPES)
+    # and dates as displayed; id and stamp lookups keep the formatted text
+    DATA_RENDER = {"valueRenderOption": "UNFORMATTED_VALUE", "dateTimeRenderOption": "FORMATTED_STRING"}
     
-    def __init__(self, credentials_path: str, spreadsheet_id: str, credentials_json: Optional[str] = None, cache_service=None):
-        """Initialize the Sheets service with credentials."""
+    def __init__(
+        self,
+        credentials_path: str,
+        spreadsheet_id: str,
+        credentials_json: Optional[str] = None,
+        cache_service=None,
+        max_concurrency: int = 8,
+        id_allocator: Optional[IdAllocator] = None,
+        version_check_interval: float = 10,
+        snapshot: Optional[SheetSnapshot] = None,
+        fake_google=None,
+        rate_limiter: Optional[GoogleRateLimiter] = None,
+        http_pool_size: int = 10,
+        http_timeout: tuple[float, float] = (10, 60),
+        append_only_sheets: Optional[list[str]] = None,
+        tail_refresh_full_every: int = 10,
+    ):
+        """
+        Initialize the Sheets service with credentials (or a FakeGoogle stand-in).
+        
+        `append_only_sheets` are refreshed by reading only the rows added since
+        the last load (plus rows whose updated_at changed) instead of the whole
+        sheet. Edits by hand to rows already loaded are not seen that way, so
+        only list sheets nobody edits by hand; every `tail_refresh_full_every`
+        refreshes they are downloaded in full anyway (0 = never).
+        """
         self.spreadsheet_id = spreadsheet_id
         self.service = None
+        self.http = None  # Pooled transport shared by the clients and executor threads
+        self.http_pool_size = http_pool_size
+        self.http_timeout = http_timeout  # (connect, read) seconds
+        self.drive = None  # Drive client, used only for change detection
+        self.executor: Optional[GoogleApiExecutor] = None
+        self.max_concurrency = max_concurrency
+        self.rate_limiter = rate_limiter  # Shared Google quota limiter
         self.cache = cache_service  # Inject cache service
+        self.ids = id_allocator or IdAllocator()
+        
+        # Per-sheet index of id (column A) -> 1-indexed sheet row number, and the
+        # Drive version it was built at (trusted without a check while current)
+        self._row_numbers: dict[str, dict[str, int]] = {}
+        self._row_number_versions: dict[str, str] = {}
+        self._headers: dict[str, list[str]] = {}  # sheet_name -> header row
+        
+        # Last loaded tables, kept past their cache TTL so an unchanged
+        # spreadsheet can be revalidated instead of re-downloaded
+        self._tables: dict[str, SheetTable] = {}
+        self._table_versions: dict[str, str] = {}  # sheet_name -> Drive version it was loaded at
+        self._loaded_rows: dict[str, int] = {}  # sheet_name -> sheet rows read into the table
+        self._generations: dict[str, int] = {}  # sheet_name -> times forgotten (detects writes during a load)
+        self.append_only_sheets = set(append_only_sheets or ())
+        self.tail_refresh_full_every = tail_refresh_full_every
+        self._tail_refreshes: dict[str, int] = {}  # sheet_name -> tail refreshes since its last full download
+        self.version_check_interval = version_check_interval
+        self._version: Optional[str] = None
+        self._version_checked: float = 0.0
+        self._version_lock = asyncio.Lock()
+        
+        # Local copy of the loaded sheets for warm restarts
+        self.snapshot = snapshot
+        self._snapshot_dirty: set[str] = set()  # sheets changed since the last save
+        self._unverified: set[str] = set()  # restored from the snapshot, not yet revalidated
         
-        if credentials_json:
+        if self.cache:
+            self.cache.add_eviction_listener(self._table_evicted)
+        
+        if fake_google is not None:
+            self._connect_fake(fake_google)
+        elif credentials_json:
             self._authenticate_from_json(credentials_json)
         elif credentials_path and spreadsheet_id:
             self._authenticate(credentials_path)
@@ -153,12 +203,15 @@ class SheetsService:
                 ]
             )
             
-            self.service = build("sheets", "v4", credentials=credentials)
+            self._connect(credentials)
             print("✅ Google Sheets service authenticated (File)")
             
         except Exception as e:
             print(f"❌ Failed to authenticate with Google Sheets: {e}")
             self.service = None
+            self.drive = None
+            self.executor = None
+            self.http = None
 
     def _authenticate_from_json(self, json_content: str):
         """Authenticate using JSON string content."""
@@ -172,98 +225,793 @@ class SheetsService:
                     "https://www.googleapis.com/auth/drive",
                 ]
             )
-            self.service = build("sheets", "v4", credentials=credentials)
+            self._connect(credentials)
             print("✅ Google Sheets service authenticated (Env Var)")
         except Exception as e:
             print(f"❌ Failed to authenticate with Google Sheets JSON: {e}")
             self.service = None
+            self.drive = None
+            self.executor = None
+            self.http = None
+
+    def _connect(self, credentials):
+        """Build the Sheets and Drive clients on one pooled keep-alive transport."""
+        connect_timeout, read_timeout = self.http_timeout
+        self.http = PooledHttp(
+            credentials,
+            pool_size=self.http_pool_size,
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+        )
+        self.service = build_client("sheets", "v4", self.http)
+        self.drive = build_client("drive", "v3", self.http)
+        self.executor = GoogleApiExecutor(
+            credentials,
+            max_workers=self.max_concurrency,
+            http_factory=lambda: self.http,
+            rate_limiter=self.rate_limiter,
+        )
+
+    def _connect_fake(self, fake_google):
+        """Use the in-process FakeGoogle APIs instead of Google (benchmarks, offline dev)."""
+        self.http = fake_google.http()
+        self.service = build_client("sheets", "v4", self.http)
+        self.drive = build_client("drive", "v3", self.http)
+        self.executor = GoogleApiExecutor(
+            None,
+            max_workers=self.max_concurrency,
+            http_factory=fake_google.http,
+            rate_limiter=self.rate_limiter,
+        )
+        print("🧪 Google Sheets service using fake Google APIs")
     
-    def _get_column_index(self, columns: list, field: str) -> int:
-        """Get the column index for a field name."""
-        try:
-            return columns.index(field)
-        except ValueError:
-            return -1
+    @property
+    def available(self) -> bool:
+        """True once authenticated with Google."""
+        return self.service is not None
     
-    def _row_to_dict(self, row: list, columns: list) -> dict:
-        """Convert a row to a dictionary using column mapping."""
-        result = {}
-        for i, col in enumerate(columns):
-            if i < len(row):
-                result[col] = row[i]
-            else:
-                result[col] = None
-        return result
+    async def _execute(self, request) -> Any:
+        """Run a Google API request on the bounded executor (off the event loop)."""
+        return await self.executor.execute(request)
+
+    def close(self) -> None:
+        """Save the snapshot and release the executor's worker threads and connections."""
+        if self.snapshot:
+            self.snapshot.save(self.spreadsheet_id, self._snapshot_payload())
+        if self.executor:
+            self.executor.shutdown()
+        if isinstance(self.http, PooledHttp):
+            self.http.close()
     
-    def _dict_to_row(self, data: dict, columns: list) -> list:
-        """Convert a dictionary to a row using column mapping."""
-        return [data.get(col, "") for col in columns]
+    @staticmethod
+    def _column_letter(index: int) -> str:
+        """Convert a 0-based column index to a sheet column letter (0 -> A, 26 -> AA)."""
+        letters = ""
+        index += 1
+        while index:
+            index, remainder = divmod(index - 1, 26)
+            letters = chr(65 + remainder) + letters
+        return letters
     
-    async def get_all_rows(self, sheet_name: str, columns: list) -> list[dict]:
-        """Get all rows from a sheet as dictionaries (cached)."""
+    def _store_rows(
+        self, sheet_name: str, columns: list, rows: list, version: Optional[str] = None
+    ) -> SheetTable:
+        """Convert raw sheet rows to an indexed table and cache it."""
+        records = [self._row_to_dict(row, columns, sheet_name) for row in rows]
+        table = SheetTable(sheet_name, columns, records, index_fields=self.INDEXES.get(sheet_name))
+        
+        # Data rows start at sheet row 2 (row 1 is the header)
+        id_field = columns[0]
+        self._row_numbers[sheet_name] = {
+            record[id_field]: i + 2 for i, record in enumerate(records) if record[id_field]
+        }
+        self._index_version(sheet_name, version)
+        self.ids.observe(sheet_name, table.by_id.keys())
+        
+        self._tail_refreshes.pop(sheet_name, None)
+        self._retain_table(sheet_name, table, len(rows), version)
+        return table
+    
+    def _retain_table(
+        self, sheet_name: str, table: SheetTable, loaded_rows: int, version: Optional[str]
+    ) -> None:
+        """Cache a freshly read table and keep it for later revalidation or tail refreshes."""
+        table.version = version
+        table.loaded_rows = loaded_rows
+        self._tables[sheet_name] = table
+        self._loaded_rows[sheet_name] = loaded_rows
+        self._unverified.discard(sheet_name)
+        self._snapshot_dirty.add(sheet_name)
+        if version is not None:
+            self._table_versions[sheet_name] = version
+        else:
+            self._table_versions.pop(sheet_name, None)
+        
+        if self.cache and not self.cache.set(sheet_name, self.TABLE, table):
+            # Over the sheet's cache budget: don't keep it around outside the cache either
+            self._release_table(sheet_name)
+    
+    async def _spreadsheet_version(self) -> Optional[str]:
+        """
+        Get the spreadsheet's Drive version, which increases on every edit.
+        
+        One metadata call serves all sheets for `version_check_interval`
+        seconds. Returns None if change detection is unavailable.
+        """
+        if not self.drive:
+            return None
+        
+        async with self._version_lock:
+            if self._version is not None and time.monotonic() - self._version_checked < self.version_check_interval:
+                return self._version
+            
+            try:
+                request = self.drive.files().get(
+                    fileId=self.spreadsheet_id,
+                    fields="version",
+                    supportsAllDrives=True,
+                )
+                result = await self._execute(request)
+            except HttpError as e:
+                print(f"Error checking spreadsheet version: {e}")
+                return None
+            
+            self._version = result.get("version")
+            self._version_checked = time.monotonic()
+            return self._version
+    
+    def _revalidate(self, sheet_names: list[str], version: Optional[str]) -> list[str]:
+        """
+        Re-cache previously loaded tables whose sheet hasn't changed since they were read.
+        
+        Returns:
+            The sheet names that still need to be downloaded
+        """
+        if version is None:
+            return sheet_names
+        
+        stale = []
+        for sheet_name in sheet_names:
+            table = self._tables.get(sheet_name)
+            if (
+                table is None
+                or self._table_versions.get(sheet_name) != version
+                or self._full_download_due(sheet_name)
+            ):
+                stale.append(sheet_name)
+                continue
+            
+            self._unverified.discard(sheet_name)
+            if self.cache and not self.cache.set(sheet_name, self.TABLE, table):
+                self._release_table(sheet_name)
+                stale.append(sheet_name)
+        return stale
+    
+    def restore_snapshot(self) -> int:
+        """
+        Load the sheets saved by a previous run into the cache.
+        
+        Restored sheets are served immediately but treated as unverified:
+        IDs are not allocated from them, and `revalidate()` should be run
+        soon after.
+        
+        Returns:
+            Number of sheets restored
+        """
+        if not self.service or not self.snapshot:
+            return 0
+        
+        restored = 0
+        for sheet_name, saved in self.snapshot.load(self.spreadsheet_id).items():
+            if saved["columns"] != self.SHEET_COLUMNS.get(sheet_name):
+                continue  # Column mapping changed since the snapshot was taken
+            
+            self._store_rows(sheet_name, saved["columns"], saved["rows"], saved["version"])
+            self._loaded_rows[sheet_name] = saved["loaded_rows"]
+            self._unverified.add(sheet_name)
+            self._snapshot_dirty.discard(sheet_name)
+            restored += 1
+        
+        return restored
+    
+    async def revalidate(self, sheet_names: Optional[list[str]] = None) -> int:
+        """
+        Reload sheets whose retained copy is older than the spreadsheet.
+        
+        Args:
+            sheet_names: Sheet (tab) names to check; None checks every sheet
+        
+        Returns:
+            Number of sheets reloaded
+        """
         if not self.service:
-            return []
+            return 0
         
-        # Check cache first
+        names = sheet_names or list(self.SHEETS.values())
+        version = await self._spreadsheet_version()
+        stale = [
+            name for name in names
+            if version is None or self._table_versions.get(name) != version
+        ]
+        self._unverified.difference_update(set(names) - set(stale))
+        
+        if self.cache:
+            for name in stale:
+                self.cache.delete(name, self.TABLE)
+        keys = [key for key, name in self.SHEETS.items() if name in stale]
+        loaded = await self.prefetch(keys) if keys else 0
+        
+        await self.save_snapshot()
+        return loaded
+    
+    def _snapshot_payload(self) -> dict[str, dict]:
+        """Copy the sheets changed since the last save into snapshot records."""
+        payload = {}
+        for sheet_name in self._snapshot_dirty:
+            table = self._tables.get(sheet_name)
+            if table is None:
+                continue
+            payload[sheet_name] = {
+                "columns": table.columns,
+                "version": self._table_versions.get(sheet_name),
+                "loaded_rows": self._loaded_rows.get(sheet_name, len(table.rows)),
+                "rows": [[row.get(col) for col in table.columns] for row in table.rows],
+            }
+        self._snapshot_dirty.clear()
+        return payload
+    
+    async def save_snapshot(self) -> None:
+        """Persist sheets changed since the last save (written off the event loop)."""
+        if self.snapshot:
+            payload = self._snapshot_payload()
+            await asyncio.to_thread(self.snapshot.save, self.spreadsheet_id, payload)
+    
+    def _forget_table(self, sheet_name: str) -> None:
+        """Drop a sheet's cached and retained copies so the next read downloads it."""
+        scope = _read_scope.get()
+        if scope is not None:
+            scope.forget(sheet_name)
+        self._generations[sheet_name] = self._generations.get(sheet_name, 0) + 1
+        self._row_number_versions.pop(sheet_name, None)
+        self._tables.pop(sheet_name, None)
+        self._table_versions.pop(sheet_name, None)
+        self._loaded_rows.pop(sheet_name, None)
         if self.cache:
-            cached_data = self.cache.get("sheets", sheet_name)
-            if cached_data is not None:
-                return cached_data
+            self.cache.delete(sheet_name, self.TABLE)
+    
+    def invalidate(self, sheet_names: Optional[list[str]] = None) -> None:
+        """
+        Drop cached and retained copies of sheets (None = all) for an explicit
+        refresh. The next read downloads them without trusting a recent
+        version check.
+        """
+        for sheet_name in sheet_names or list(self.SHEETS.values()):
+            self._forget_table(sheet_name)
+        self._version = None
+        self._version_checked = 0.0
+    
+    def _table_evicted(self, namespace: str, key: str) -> None:
+        """Release the retained copy of a sheet the cache evicted to stay within its memory budget."""
+        if key == self.TABLE:
+            self._release_table(namespace)
+    
+    def _release_table(self, sheet_name: str) -> None:
+        """Stop retaining a sheet's table (the cache no longer holds it)."""
+        if self._tables.pop(sheet_name, None) is not None:
+            self._table_versions.pop(sheet_name, None)
+            self._loaded_rows.pop(sheet_name, None)
+    
+    def _index_appended_rows(self, sheet_name: str, rows: list[list], result: dict) -> None:
+        """Record row numbers of appended rows from the append response's updatedRange."""
+        updated_range = result.get("updates", {}).get("updatedRange", "")
+        match = re.search(r"![A-Z]+(\d+)", updated_range)
+        index = self._row_numbers.get(sheet_name)
+        if not match or index is None:
+            return
+        
+        start = int(match.group(1))
+        for offset, row in enumerate(rows):
+            if row and row[0]:
+                index[str(row[0])] = start + offset
+    
+    async def _resolve_row_numbers(self, keys: list[tuple[str, str]]) -> dict[tuple[str, str], int]:
+        """
+        Map (sheet_name, id) to sheet row numbers using the in-memory index.
+        
+        Rows can be inserted, deleted or sorted by hand at any time. While the
+        spreadsheet version (checked at most every `version_check_interval`)
+        is the one a sheet's index was built at, its row numbers are used as
+        they are. Otherwise they are checked against their id cells before
+        being written to (one batchGet for all keys, instead of scanning
+        column A). Ids missing from the index or failing the check fall back
+        to a column A scan, which rebuilds that sheet's index.
+        """
+        found, verify, scan = {}, [], set()
+        version = await self._spreadsheet_version() if self._row_numbers else None
+        for sheet_name, id_value in keys:
+            row_num = self._row_numbers.get(sheet_name, {}).get(id_value)
+            if row_num is None:
+                scan.add(sheet_name)
+            elif version is not None and self._row_number_versions.get(sheet_name) == version:
+                found[(sheet_name, id_value)] = row_num
+            else:
+                verify.append((sheet_name, id_value, row_num))
+        
+        if verify:
+            request = self.service.spreadsheets().values().batchGet(
+                spreadsheetId=self.spreadsheet_id,
+                ranges=[f"{sheet_name}!A{row_num}" for sheet_name, _, row_num in verify],
+            )
+            result = await self._execute(request)
+            
+            for (sheet_name, id_value, row_num), value_range in zip(verify, result.get("valueRanges", [])):
+                values = value_range.get("values", [])
+                if values and values[0] and values[0][0] == id_value:
+                    found[(sheet_name, id_value)] = row_num
+                else:
+                    scan.add(sheet_name)
+        
+        if scan:
+            scanned = await self._find_row_numbers(sorted(scan))
+            for key in keys:
+                if key not in found and key in scanned:
+                    found[key] = scanned[key]
+        
+        return found
+    
+    async def get_table(self, sheet_name: str, columns: list) -> Optional[SheetTable]:
+        """
+        Get a sheet as an indexed table (cached).
+        
+        Concurrent misses for the same sheet share a single load. A table past
+        its soft TTL is returned immediately and refreshed in the background.
+        Inside a read scope each sheet is fetched once and the same table is
+        returned for the rest of the scope.
+        """
+        if not self.service:
+            return None
+        
+        scope = _read_scope.get()
+        if scope is None or not scope.active:
+            return await self._get_table(sheet_name, columns)
+        
+        task = scope.tables.get(sheet_name)
+        if task is None:
+            scope.loads += 1
+            
+            async def load() -> Optional[SheetTable]:
+                table = await self._get_table(sheet_name, columns)
+                if table is not None and scope.tables.get(sheet_name) is task:
+                    scope.pin(sheet_name, table)
+                return table
+            
+            task = scope.tables[sheet_name] = asyncio.ensure_future(load())
+            
+            def failed(done: asyncio.Future) -> None:
+                if done.cancelled() or done.exception() is not None:
+                    # Let the next read in this scope try again
+                    if scope.tables.get(sheet_name) is done:
+                        del scope.tables[sheet_name]
+            
+            task.add_done_callback(failed)
+        else:
+            scope.reuses += 1
+            held = scope.peek(sheet_name)
+            if held is not None:
+                return held
+        
+        table = await asyncio.shield(task)
+        held = scope.peek(sheet_name) if scope.active else None
+        return held if held is not None else table
+    
+    async def _get_table(self, sheet_name: str, columns: list) -> Optional[SheetTable]:
+        """Get a sheet's table from the cache, loading it on a miss."""
+        if not self.cache:
+            return await self._load_table(sheet_name, columns)
+        
+        # Check cache first
+        cached_table, stale = self.cache.lookup(sheet_name, self.TABLE)
+        if cached_table is not None:
+            if cached_table is not self._tables.get(sheet_name):
+                self._adopt_table(sheet_name, cached_table)
+            if stale:
+                self.cache.refresh(sheet_name, self.TABLE, lambda: self._load_table(sheet_name, columns))
+            return cached_table
+        
+        table = await self.cache.single_flight(
+            sheet_name, self.TABLE, lambda: self._load_table(sheet_name, columns)
+        )
+        if table is not None and table is not self._tables.get(sheet_name):
+            # Served from the shared tier (a table forgotten mid-load isn't cached)
+            if self.cache.peek(sheet_name, self.TABLE) is table:
+                self._adopt_table(sheet_name, table)
+        return table
+    
+    def _adopt_table(self, sheet_name: str, table: SheetTable) -> None:
+        """
+        Take over a table another worker loaded (served from the shared cache tier).
+        Its row index is rebuilt from its rows (checked before writes once the spreadsheet changes).
+        """
+        self._tables[sheet_name] = table
+        self._loaded_rows[sheet_name] = table.loaded_rows
+        if table.version is not None:
+            self._table_versions[sheet_name] = table.version
+        else:
+            self._table_versions.pop(sheet_name, None)
+        
+        id_field = table.id_field
+        self._row_numbers[sheet_name] = {
+            row[id_field]: i + 2 for i, row in enumerate(table.rows) if row.get(id_field)
+        }
+        self._index_version(sheet_name, table.version)
+        self._unverified.discard(sheet_name)
+        self.ids.observe(sheet_name, table.by_id.keys())
+    
+    async def _load_table(self, sheet_name: str, columns: list) -> Optional[SheetTable]:
+        """Load a sheet (revalidate, tail refresh or full download) and cache it."""
+        generation = self._generations.get(sheet_name, 0)
+        table = await self._fetch_table(sheet_name, columns)
+        if self._generations.get(sheet_name, 0) != generation:
+            # A write invalidated the sheet mid-load; don't keep what may predate it
+            self._forget_table(sheet_name)
+        return table
+    
+    async def _fetch_table(self, sheet_name: str, columns: list) -> Optional[SheetTable]:
+        """Bring a sheet's table up to date with as few reads as possible."""
+        # Skip the download if the spreadsheet hasn't changed since the last load.
+        # The version is read before the data so an edit in between forces a reload.
+        version = await self._spreadsheet_version()
+        if not self._revalidate([sheet_name], version):
+            return self._tables[sheet_name]
+        
+        if sheet_name in self.append_only_sheets:
+            table = await self._refresh_tail(sheet_name, columns, version)
+            if table is not None:
+                return table
         
         try:
-            result = self.service.spreadsheets().values().get(
+            request = self.service.spreadsheets().values().get(
                 spreadsheetId=self.spreadsheet_id,
                 range=f"{sheet_name}!A2:Z",  # Skip header row
-            ).execute()
+                **self.DATA_RENDER,
+            )
+            result = await self._execute(request)
+            
+            return self._store_rows(sheet_name, columns, result.get("values", []), version)
+            
+        except HttpError as e:
+            print(f"Error reading from {sheet_name}: {e}")
+            return None
+    
+    def _full_download_due(self, sheet_name: str) -> bool:
+        """
+        True once a sheet has been tail-refreshed `tail_refresh_full_every` times:
+        its older rows may hold hand edits only a full download picks up.
+        """
+        return bool(self.tail_refresh_full_every) and (
+            self._tail_refreshes.get(sheet_name, 0) >= self.tail_refresh_full_every
+        )
+    
+    async def _refresh_tail(
+        self, sheet_name: str, columns: list, version: Optional[str]
+    ) -> Optional[SheetTable]:
+        """
+        Bring a retained append-only table up to date incrementally.
+        
+        One batchGet reads the rows added after the last load together with the
+        id and updated_at columns of the rows already held; rows whose updated_at
+        differs are then re-read individually. Sheets without an updated_at
+        column are treated as strictly append-only.
+        
+        Returns:
+            The refreshed table, or None if a full reload is needed (nothing
+            retained, rows removed or reordered, too many rows changed, or a
+            periodic full download is due)
+        """
+        table = self._tables.get(sheet_name)
+        loaded = self._loaded_rows.get(sheet_name)
+        if table is None or loaded is None or loaded > len(table.rows) or sheet_name in self._unverified:
+            return None  # a restored snapshot may predate edits to its rows
+        if self._full_download_due(sheet_name):
+            return None
+        refreshes = self._tail_refreshes.get(sheet_name, 0)
+        
+        head = table.rows[:loaded]
+        local = table.rows[loaded:]  # Rows appended by this process since the load
+        id_field = columns[0]
+        stamp_field = "updated_at" if "updated_at" in columns else None
+        
+        ranges = [f"{sheet_name}!A{loaded + 2}:Z"]
+        if loaded:
+            ranges.append(f"{sheet_name}!A2:A{loaded + 1}")
+            if stamp_field:
+                letter = self._column_letter(columns.index(stamp_field))
+                ranges.append(f"{sheet_name}!{letter}2:{letter}{loaded + 1}")
+        
+        try:
+            request = self.service.spreadsheets().values().batchGet(
+                spreadsheetId=self.spreadsheet_id,
+                ranges=ranges,
+            )
+            result = await self._execute(request)
+            value_ranges = [value_range.get("values", []) for value_range in result.get("valueRanges", [])]
+            tail = value_ranges[0] if value_ranges else []
             
-            rows = result.get("values", [])
-            data = [self._row_to_dict(row, columns) for row in rows]
+            # Single-column reads: one [value] per row, [] for blanks, trailing blanks trimmed
+            def column(values: list) -> list[str]:
+                cells = [row[0] if row else "" for row in values]
+                return cells + [""] * (loaded - len(cells))
             
-            # Store in cache
-            if self.cache:
-                self.cache.set("sheets", sheet_name, data)
+            ids = column(value_ranges[1]) if loaded else []
+            if any((row.get(id_field) or "") != ids[i] for i, row in enumerate(head)):
+                return None
             
-            return data
+            changed = []
+            if loaded and stamp_field:
+                stamps = column(value_ranges[2])
+                changed = [
+                    i for i, row in enumerate(head)
+                    if ids[i] and str(row.get(stamp_field) or "") != stamps[i]
+                ]
+                if len(changed) > loaded * self.TAIL_REFRESH_MAX_CHANGED:
+                    return None
+            
+            updated = []
+            if changed:
+                request = self.service.spreadsheets().values().batchGet(
+                    spreadsheetId=self.spreadsheet_id,
+                    ranges=[f"{sheet_name}!A{i + 2}:Z{i + 2}" for i in changed],
+                    **self.DATA_RENDER,
+                )
+                result = await self._execute(request)
+                updated = [
+                    (value_range.get("values") or [[]])[0]
+                    for value_range in result.get("valueRanges", [])
+                ]
             
         except HttpError as e:
-            print(f"Error reading from {sheet_name}: {e}")
+            print(f"Error refreshing tail of {sheet_name}: {e}")
+            return None
+        
+        for row in updated:
+            if row:
+                record = self._row_to_dict(row, columns, sheet_name)
+                table.update(record[id_field], record)
+        
+        tail_rows = [self._row_to_dict(row, columns, sheet_name) for row in tail]
+        local_ids = [row.get(id_field) for row in local]
+        if local_ids == [row.get(id_field) for row in tail_rows[:len(local)]]:
+            # Our own appends landed first; replace them with the sheet's values
+            for row in tail_rows[:len(local)]:
+                table.update(row.get(id_field), row)
+            table.append(tail_rows[len(local):])
+        else:
+            # Other writers interleaved with ours; rebuild to keep sheet order
+            table = SheetTable(sheet_name, columns, head + tail_rows, index_fields=self.INDEXES.get(sheet_name))
+        
+        index = {}
+        tail_ids = [row[id_field] for row in tail_rows]
+        for i, id_value in enumerate(ids + tail_ids):
+            if id_value:
+                index.setdefault(id_value, i + 2)
+        self._row_numbers[sheet_name] = index
+        self._index_version(sheet_name, version)
+        self.ids.observe(sheet_name, [id_value for id_value in tail_ids if id_value])
+        
+        self._tail_refreshes[sheet_name] = refreshes + 1
+        self._retain_table(sheet_name, table, loaded + len(tail), version)
+        return table
+    
+    async def get_all_rows(self, sheet_name: str, columns: list) -> list[dict]:
+        """Get all rows from a sheet as dictionaries (cached)."""
+        table = await self.get_table(sheet_name, columns)
+        return list(table.rows) if table else []
+    
+    async def get_sorted_rows(self, sheet_name: str, columns: list, field: str) -> list[dict]:
+        """Get all rows ordered by the numeric value of `field` (sorted once per loaded table)."""
+        table = await self.get_table(sheet_name, columns)
+        return table.sorted_by(field) if table else []
+    
+    async def prefetch(self, sheet_names: Optional[list[str]] = None, force: bool = False) -> int:
+        """
+        Load several sheets into the cache with a single batchGet call.
+        
+        Args:
+            sheet_names: Keys of SHEETS to load (e.g. ["invoices", "dealers"]); None loads all
+            force: Reload sheets even if they are already cached or unchanged
+        
+        Returns:
+            Number of sheets loaded
+        """
+        if not self.service:
+            return 0
+        
+        names = [self.SHEETS[key] for key in (sheet_names or self.SHEETS.keys())]
+        if self.cache and not force:
+            names = [name for name in names if self.cache.get(name, self.TABLE) is None]
+        if not names:
+            return 0
+        
+        version = await self._spreadsheet_version()
+        refreshed = 0
+        if not force:
+            names = self._revalidate(names, version)
+            tails = [name for name in names if name in self.append_only_sheets and name in self._tables]
+            if tails:
+                results = await asyncio.gather(*(
+                    self._refresh_tail(name, self.SHEET_COLUMNS[name], version) for name in tails
+                ))
+                done = {name for name, table in zip(tails, results) if table is not None}
+                refreshed = len(done)
+                names = [name for name in names if name not in done]
+            if not names:
+                return refreshed
+        
+        try:
+            request = self.service.spreadsheets().values().batchGet(
+                spreadsheetId=self.spreadsheet_id,
+                ranges=[f"{name}!A2:Z" for name in names],  # Skip header rows
+                **self.DATA_RENDER,
+            )
+            result = await self._execute(request)
+            
+            value_ranges = result.get("valueRanges", [])
+            for name, value_range in zip(names, value_ranges):
+                self._store_rows(name, self.SHEET_COLUMNS[name], value_range.get("values", []), version)
+            
+            return refreshed + len(value_ranges)
+            
+        except HttpError as e:
+            print(f"Error prefetching sheets {names}: {e}")
+            return refreshed
+    
+    async def load_all(self) -> int:
+        """Warm the cache with every sheet in one round-trip."""
+        loaded = await self.prefetch(force=True)
+        await self.save_snapshot()
+        return loaded
+    
+    async def _column_letters(self, sheet_name: str, fields: list[str]) -> list[str]:
+        """Resolve field names to column letters using the sheet's header row (read once)."""
+        if sheet_name not in self._headers:
+            try:
+                request = self.service.spreadsheets().values().get(
+                    spreadsheetId=self.spreadsheet_id,
+                    range=f"{sheet_name}!1:1",
+                )
+                result = await self._execute(request)
+                values = result.get("values", [])
+                self._headers[sheet_name] = values[0] if values else []
+            except HttpError as e:
+                print(f"Error reading header of {sheet_name}: {e}")
+                return []
+        
+        header = self._headers[sheet_name]
+        columns = self.SHEET_COLUMNS.get(sheet_name, [])
+        letters = []
+        for field in fields:
+            if field in header:
+                letters.append(self._column_letter(header.index(field)))
+            elif field in columns:
+                # Header doesn't use field names; fall back to the column mapping
+                letters.append(self._column_letter(columns.index(field)))
+            else:
+                raise ValueError(f"Unknown column '{field}' in sheet {sheet_name}")
+        return letters
+    
+    async def get_columns(self, sheet_name: str, fields: list[str]) -> list[tuple]:
+        """
+        Get only some columns of a sheet as compact tuples, one per row.
+        
+        Served from the cached table when the sheet is already loaded; otherwise
+        only the requested columns are downloaded, in a single batchGet.
+        
+        Example:
+            for invoice_date, grand_total in await sheets.get_columns(
+                sheets.SHEETS["invoices"], ["invoice_date", "grand_total"]
+            ): ...
+        """
+        if not self.service:
+            return []
+        
+        scope = _read_scope.get()
+        table = scope.peek(sheet_name) if scope is not None and scope.active else None
+        if table is None and self.cache:
+            table = self.cache.peek(sheet_name, self.TABLE)
+        if table is not None:
+            return [tuple(row.get(field) for field in fields) for row in table.rows]
+        
+        letters = await self._column_letters(sheet_name, fields)
+        if not letters:
+            return []
+        
+        try:
+            request = self.service.spreadsheets().values().batchGet(
+                spreadsheetId=self.spreadsheet_id,
+                ranges=[f"{sheet_name}!{letter}2:{letter}" for letter in letters],  # Skip header row
+                majorDimension="COLUMNS",
+                **self.DATA_RENDER,
+            )
+            result = await self._execute(request)
+            
+            columns = [
+                (value_range.get("values") or [[]])[0]
+                for value_range in result.get("valueRanges", [])
+            ]
+            length = max((len(column) for column in columns), default=0)
+            types = [self.COLUMN_TYPES.get(sheet_name, {}).get(field, "str") for field in fields]
+            return [
+                tuple(
+                    decode_cell(column[i] if i < len(column) else None, kind)
+                    for column, kind in zip(columns, types)
+                )
+                for i in range(length)
+            ]
+            
+        except HttpError as e:
+            print(f"Error reading columns {fields} from {sheet_name}: {e}")
             return []
     
     async def get_row_by_id(
         self, sheet_name: str, columns: list, id_field: str, id_value: str
     ) -> Optional[dict]:
-        """Get a single row by its ID field."""
-        rows = await self.get_all_rows(sheet_name, columns)
-        for row in rows:
-            if row.get(id_field) == id_value:
-                return row
-        return None
+        """Get a single row by its ID field (O(1) when it is the sheet's id column)."""
+        table = await self.get_table(sheet_name, columns)
+        return table.find(id_field, id_value) if table else None
     
-    async def append_row(self, sheet_name: str, columns: list, data: dict) -> bool:
-        """Append a new row to a sheet."""
+    async def append_rows(
+        self, sheet_name: str, columns: list, rows: list[dict], id_prefix: Optional[str] = None
+    ) -> Optional[list[dict]]:
+        """
+        Append many rows to a sheet with a single values.append call.
+        
+        Args:
+            sheet_name: Sheet to append to
+            columns: Column mapping for the sheet
+            rows: Row dictionaries to write
+            id_prefix: If set, rows without an id get one allocated in bulk (e.g. "DLR")
+        
+        Returns:
+            The created rows (with ids), or None on failure
+        """
         if not self.service:
-            return False
+            return None
+        
+        created = [dict(data) for data in rows]
+        id_field = columns[0]
+        if id_prefix:
+            missing = [data for data in created if not data.get(id_field)]
+            new_ids = await self.allocate_ids(sheet_name, id_prefix, len(missing)) if missing else []
+            for data, new_id in zip(missing, new_ids):
+                data[id_field] = new_id
+        
+        values = [self._dict_to_row(data, columns) for data in created]
+        if not values:
+            return created
+        
+        batch = _write_batch.get()
+        if batch is not None:
+            batch.appends.setdefault(sheet_name, []).extend(values)
+            batch.columns[sheet_name] = columns
+            return created
         
         try:
-            row = self._dict_to_row(data, columns)
-            
-            self.service.spreadsheets().values().append(
+            request = self.service.spreadsheets().values().append(
                 spreadsheetId=self.spreadsheet_id,
                 range=f"{sheet_name}!A:Z",
                 valueInputOption="USER_ENTERED",
                 insertDataOption="INSERT_ROWS",
-                body={"values": [row]},
-            ).execute()
-            
-            # Invalidate cache for this sheet
-            if self.cache:
-                self.cache.delete("sheets", sheet_name)
+                body={"values": values},
+            )
+            result = await self._execute(request)
+            self._index_appended_rows(sheet_name, values, result)
+            self._write_through(sheet_name, columns, appended=values)
             
-            return True
+            return created
             
         except HttpError as e:
             print(f"Error appending to {sheet_name}: {e}")
-            return False
+            return None
     
     async def update_row(
         self, sheet_name: str, columns: list, id_field: str, id_value: str, data: dict
@@ -272,48 +1020,35 @@ class SheetsService:
         if not self.service:
             return False
         
+        batch = _write_batch.get()
+        if batch is not None:
+            return await self._queue_update(batch, sheet_name, columns, id_field, id_value, data)
+        
         try:
-            # First, find the row number
-            result = self.service.spreadsheets().values().get(
-                spreadsheetId=self.spreadsheet_id,
-                range=f"{sheet_name}!A:A",
-            ).execute()
-            
-            rows = result.get("values", [])
-            id_col_idx = self._get_column_index(columns, id_field)
-            
-            # Find the row with matching ID
-            row_num = None
-            for i, row in enumerate(rows):
-                if i == 0:  # Skip header
-                    continue
-                if row and row[0] == id_value:
-                    row_num = i + 1  # 1-indexed
-                    break
-            
-            if row_num is None:
-                return False
-            
-            # Get current row data
+            # Get current row data (loading the sheet also builds its row index)
             current = await self.get_row_by_id(sheet_name, columns, id_field, id_value)
             if not current:
                 return False
             
+            # Find the row number
+            found = await self._resolve_row_numbers([(sheet_name, id_value)])
+            row_num = found.get((sheet_name, id_value))
+            if row_num is None:
+                return False
+            
             # Merge with updates
             updated = {**current, **data, "updated_at": datetime.now().isoformat()}
             row = self._dict_to_row(updated, columns)
             
             # Update the row
-            self.service.spreadsheets().values().update(
+            request = self.service.spreadsheets().values().update(
                 spreadsheetId=self.spreadsheet_id,
                 range=f"{sheet_name}!A{row_num}:Z{row_num}",
                 valueInputOption="USER_ENTERED",
                 body={"values": [row]},
-            ).execute()
-            
-            # Invalidate cache for this sheet
-            if self.cache:
-                self.cache.delete("sheets", sheet_name)
+            )
+            await self._execute(request)
+            self._write_through(sheet_name, columns, updated={id_value: updated})
             
             return True
             
@@ -321,861 +1056,290 @@ class SheetsService:
             print(f"Error updating {sheet_name}: {e}")
             return False
     
-    async def delete_row(
-        self, sheet_name: str, columns: list, id_field: str, id_value: str
-    ) -> bool:
-        """Delete a row by its ID field (sets status to Deleted)."""
-        # Soft delete by updating status
-        return await self.update_row(
-            sheet_name, columns, id_field, id_value, {"status": "Deleted"}
-        )
-    
-    async def get_next_id(self, sheet_name: str, prefix: str) -> str:
-        """Generate the next ID for a sheet (e.g., DLR-00001)."""
-        if not self.service:
-            return f"{prefix}-00001"
-        
-        try:
-            result = self.service.spreadsheets().values().get(
-                spreadsheetId=self.spreadsheet_id,
-                range=f"{sheet_name}!A:A",
-            ).execute()
-            
-            rows = result.get("values", [])
-            if len(rows) <= 1:  # Only header or empty
-                return f"{prefix}-00001"
-            
-            # Extract numbers from existing IDs
-            max_num = 0
-            for row in rows[1:]:  # Skip header
-                if row and row[0].startswith(prefix):
-                    try:
-                        num = int(row[0].split("-")[1])
-                        max_num = max(max_num, num)
-                    except (IndexError, ValueError):
-                        continue
-            
-            return f"{prefix}-{max_num + 1:05d}"
-            
-        except HttpError as e:
-            print(f"Error getting next ID for {sheet_name}: {e}")
-            return f"{prefix}-00001"
-    
-    async def filter_rows(
-        self, sheet_name: str, columns: list, filters: dict
-    ) -> list[dict]:
-        """Get rows matching filter criteria."""
-        rows = await self.get_all_rows(sheet_name, columns)
-        
-        filtered = []
-        for row in rows:
-            match = True
-            for key, value in filters.items():
-                if row.get(key) != value:
-                    match = False
-                    break
-            if match:
-                filtered.append(row)
-        
-        return filtered
-    
-    # ============ Dealer Operations ============
-    
-    async def get_dealers(self, dealer_type: Optional[str] = None) -> list[dict]:
-        """Get all dealers, optionally filtered by type."""
-        # Get all rows without status filter - let the router handle filtering
-        rows = await self.get_all_rows(self.SHEETS["dealers"], self.DEALER_COLUMNS)
-        
-        if dealer_type:
-            rows = [r for r in rows if r.get("dealer_type") == dealer_type]
+    def _write_through(
+        self, sheet_name: str, columns: list,
+        appended: Optional[list[list]] = None, updated: Optional[dict[str, dict]] = None
+    ) -> None:
+        """
+        Apply a successful write to the cached table instead of invalidating it.
+        The cache entry keeps its TTL; sheets that aren't cached are reloaded on next read.
+        The table held by the current read scope is patched too, so the rest of
+        the request reads its own writes (even with caching off). Tables are
+        patched in place: other requests' read scopes keep reading the revision
+        they pinned.
+        """
+        scope = _read_scope.get()
+        if scope is not None and not scope.active:
+            scope = None
+        table = self.cache.peek(sheet_name, self.TABLE) if self.cache else None
+        held = scope.peek(sheet_name) if scope is not None else None
+        
+        if held is not None and held is not table:
+            if self._patch_table(held, sheet_name, columns, appended, updated):
+                scope.put(sheet_name, held)
+            else:
+                scope.forget(sheet_name)
+                held = None
+        
+        if table is None or not self._patch_table(table, sheet_name, columns, appended, updated):
+            # A retained copy would miss this write; reload on next read
+            self._forget_table(sheet_name)
+            if held is not None and held is not table:
+                scope.put(sheet_name, held)
+            return
         
-        return rows
+        # Re-measure the entry: the table grew or shrank with the write
+        if not self.cache.replace(sheet_name, self.TABLE, table):
+            self._release_table(sheet_name)
+        self._snapshot_dirty.add(sheet_name)
+        self.cache.publish(sheet_name, self.TABLE)
+        if scope is not None and (held is None or held is table):
+            scope.put(sheet_name, table)
     
-    async def get_dealer(self, dealer_id: str) -> Optional[dict]:
-        """Get a dealer by ID."""
-        return await self.get_row_by_id(
-            self.SHEETS["dealers"],
-            self.DEALER_COLUMNS,
-            "dealer_id",
-            dealer_id
-        )
+    def _patch_table(
+        self, table: SheetTable, sheet_name: str, columns: list,
+        appended: Optional[list[list]], updated: Optional[dict[str, dict]]
+    ) -> bool:
+        """Apply written rows to a table; False if an updated row isn't in it."""
+        if appended:
+            table.append([self._row_to_dict(row, columns, sheet_name) for row in appended])
+        for id_value, row in (updated or {}).items():
+            if not table.update(id_value, self._decode_row(sheet_name, dict(row))):
+                return False
+        return True
     
-    async def create_dealer(self, data: dict) -> Optional[dict]:
-        """Create a new dealer."""
-        dealer_id = await self.get_next_id(self.SHEETS["dealers"], "DLR")
-        now = datetime.now().isoformat()
-        
-        dealer = {
-            **data,
-            "dealer_id": dealer_id,
-            "current_balance": data.get("opening_balance", 0),
-            "created_at": now,
-            "updated_at": now,
-        }
-        
-        success = await self.append_row(
-            self.SHEETS["dealers"],
-            self.DEALER_COLUMNS,
-            dealer
-        )
+    async def _queue_update(
+        self, batch: WriteBatch, sheet_name: str, columns: list,
+        id_field: str, id_value: str, data: dict
+    ) -> bool:
+        """Merge an update into the active batch instead of writing it."""
+        key = (sheet_name, id_value)
+        current = batch.pending.get(key)
+        if current is None:
+            current = await self.get_row_by_id(sheet_name, columns, id_field, id_value)
+            if not current:
+                return False
         
-        return dealer if success else None
-    
-    async def update_dealer(self, dealer_id: str, data: dict) -> bool:
-        """Update an existing dealer."""
-        return await self.update_row(
-            self.SHEETS["dealers"],
-            self.DEALER_COLUMNS,
-            "dealer_id",
-            dealer_id,
-            data
-        )
+        updated = {**current, **data, "updated_at": datetime.now().isoformat()}
+        batch.pending[key] = updated
+        batch.updates[key] = self._dict_to_row(updated, columns)
+        batch.columns[sheet_name] = columns
+        return True
     
-    async def delete_dealer(self, dealer_id: str) -> bool:
-        """Soft delete a dealer."""
-        return await self.delete_row(
-            self.SHEETS["dealers"],
-            self.DEALER_COLUMNS,
-            "dealer_id",
-            dealer_id
-        )
-    
-    # ============ Designer Operations ============
-    
-    async def get_designers(self) -> list[dict]:
-        """Get all active designers."""
-        return await self.filter_rows(
-            self.SHEETS["designers"],
-            self.DESIGNER_COLUMNS,
-            {"status": "Active"}
-        )
-    
-    async def get_designer(self, designer_id: str) -> Optional[dict]:
-        """Get a designer by ID."""
-        return await self.get_row_by_id(
-            self.SHEETS["designers"],
-            self.DESIGNER_COLUMNS,
-            "designer_id",
-            designer_id
-        )
-    
-    async def create_designer(self, data: dict) -> Optional[dict]:
-        """Create a new designer."""
-        designer_id = await self.get_next_id(self.SHEETS["designers"], "DES")
-        now = datetime.now().isoformat()
-        
-        designer = {
-            **data,
-            "designer_id": designer_id,
-            "created_at": now,
-            "updated_at": now,
-        }
-        
-        success = await self.append_row(
-            self.SHEETS["designers"],
-            self.DESIGNER_COLUMNS,
-            designer
-        )
+    @asynccontextmanager
+    async def batch(self):
+        """
+        Collect row appends and updates and flush them together on exit.
+        
+        Appends are sent as one values.append per sheet and updates as a single
+        values.batchUpdate; cached tables are patched once at commit. The commit
+        isn't atomic: if one of the calls fails, others may still have been
+        applied (see `_commit_batch`). Nested batches join the outermost one.
+        Writes are discarded if the block raises.
+        
+        Usage:
+            async with sheets.batch() as batch:
+                await sheets.append_row(...)
+                await sheets.update_row(...)
+            if batch.failed:
+                ...
+        """
+        current = _write_batch.get()
+        if current is not None:
+            yield current
+            return
         
-        return designer if success else None
-    
-    async def update_designer(self, designer_id: str, data: dict) -> bool:
-        """Update an existing designer."""
-        return await self.update_row(
-            self.SHEETS["designers"],
-            self.DESIGNER_COLUMNS,
-            "designer_id",
-            designer_id,
-            data
-        )
-    
-    async def delete_designer(self, designer_id: str) -> bool:
-        """Soft delete a designer."""
-        return await self.delete_row(
-            self.SHEETS["designers"],
-            self.DESIGNER_COLUMNS,
-            "designer_id",
-            designer_id
-        )
-    
-    # ============ Material Operations ============
-    
-    async def get_materials(self, category: Optional[str] = None) -> list[dict]:
-        """Get all active materials."""
-        materials = await self.filter_rows(
-            self.SHEETS["materials"],
-            self.MATERIAL_COLUMNS,
-            {"status": "Active"}
-        )
+        batch = WriteBatch()
+        token = _write_batch.set(batch)
+        try:
+            yield batch
+        finally:
+            _write_batch.reset(token)
         
-        if category:
-            materials = [m for m in materials if m.get("category") == category]
-            
-        return materials
-    
-    async def get_material(self, material_id: str) -> Optional[dict]:
-        """Get a material by ID."""
-        return await self.get_row_by_id(
-            self.SHEETS["materials"],
-            self.MATERIAL_COLUMNS,
-            "material_id",
-            material_id
-        )
+        batch.committed = await self._commit_batch(batch)
     
-    async def create_material(self, data: dict) -> Optional[dict]:
-        """Create a new material."""
-        material_id = await self.get_next_id(self.SHEETS["materials"], "MAT")
-        now = datetime.now().isoformat()
-        
-        material = {
-            **data,
-            "material_id": material_id,
-            "current_stock": 0,
-            "last_purchase_price": 0,
-            "status": "Active",
-            "created_at": now,
-            "updated_at": now,
-        }
-        
-        success = await self.append_row(
-            self.SHEETS["materials"],
-            self.MATERIAL_COLUMNS,
-            material
-        )
+    @asynccontextmanager
+    async def read_scope(self):
+        """
+        Read each sheet at most once inside the block (one request).
+        
+        Repeated reads of a sheet return the table from its first read, so
+        the block sees a consistent snapshot even if the cache expires or is
+        refreshed meanwhile, and costs no extra calls when caching is off or
+        a write just invalidated the sheet. Writes made inside the block are
+        visible to its later reads; writes made by other requests meanwhile
+        are not (the block keeps reading each table as of the revision it
+        first read). Nested scopes join the outermost one.
+        
+        Usage:
+            async with sheets.read_scope():
+                invoice = await sheets.get_invoice(invoice_id)
+                ...
+        """
+        current = _read_scope.get()
+        if current is not None and current.active:
+            yield current
+            return
         
-        return material if success else None
-    
-    async def update_material(self, material_id: str, data: dict) -> bool:
-        """Update an existing material."""
-        return await self.update_row(
-            self.SHEETS["materials"],
-            self.MATERIAL_COLUMNS,
-            "material_id",
-            material_id,
-            data
-        )
-    
-    async def delete_material(self, material_id: str) -> bool:
-        """Soft delete a material."""
-        return await self.delete_row(
-            self.SHEETS["materials"],
-            self.MATERIAL_COLUMNS,
-            "material_id",
-            material_id
-        )
+        scope = ReadScope()
+        token = _read_scope.set(scope)
+        try:
+            yield scope
+        finally:
+            scope.close()
+            _read_scope.reset(token)
     
-    # ============ Design Operations ============
-
-    async def get_designs(self) -> list[dict]:
-        """Get all active designs."""
-        return await self.filter_rows(
-            self.SHEETS["designs"],
-            self.DESIGN_COLUMNS,
-            {"status": "Active"}
-        )
-
-    async def get_design(self, design_id: str) -> Optional[dict]:
-        """Get a design by ID."""
-        return await self.get_row_by_id(
-            self.SHEETS["designs"],
-            self.DESIGN_COLUMNS,
-            "design_id",
-            design_id
-        )
-
-    async def create_design(self, data: dict) -> Optional[dict]:
-        """Create a new design."""
-        design_id = await self.get_next_id(self.SHEETS["designs"], "DES")
-        now = datetime.now().isoformat()
-        
-        design = {
-            **data,
-            "design_id": design_id,
-            "status": "Active",
-            "created_at": now,
-            "updated_at": now,
-        }
-        
-        success = await self.append_row(
-            self.SHEETS["designs"],
-            self.DESIGN_COLUMNS,
-            design
-        )
-        
-        return design if success else None
-
-    async def update_design(self, design_id: str, data: dict) -> bool:
-        """Update an existing design."""
-        return await self.update_row(
-            self.SHEETS["designs"],
-            self.DESIGN_COLUMNS,
-            "design_id",
-            design_id,
-            data
-        )
-
-    async def delete_design(self, design_id: str) -> bool:
-        """Soft delete a design."""
-        return await self.delete_row(
-            self.SHEETS["designs"],
-            self.DESIGN_COLUMNS,
-            "design_id",
-            design_id
-        )
-
-    # ============ Variant Operations ============
-
-    async def get_variants(self, design_id: Optional[str] = None) -> list[dict]:
-        """Get all active variants, optionally filtered by design."""
-        if design_id:
-            return await self.filter_rows(
-                self.SHEETS["variants"],
-                self.VARIANT_COLUMNS,
-                {"design_id": design_id, "status": "Active"}
-            )
-        return await self.filter_rows(
-            self.SHEETS["variants"],
-            self.VARIANT_COLUMNS,
-            {"status": "Active"}
-        )
-
-    async def get_variant(self, variant_id: str) -> Optional[dict]:
-        """Get a variant by ID."""
-        return await self.get_row_by_id(
-            self.SHEETS["variants"],
-            self.VARIANT_COLUMNS,
-            "variant_id",
-            variant_id
-        )
-
-    async def create_variant(self, data: dict) -> Optional[dict]:
-        """Create a new variant with cost calculations."""
-        variant_id = await self.get_next_id(self.SHEETS["variants"], "VAR")
-        now = datetime.now().isoformat()
-        
-        # Calculate costs
-        material = float(data.get("material_cost", 0) or 0)
-        making = float(data.get("making_cost", 0) or 0)
-        finishing = float(data.get("finishing_cost", 0) or 0)
-        packing = float(data.get("packing_cost", 0) or 0)
-        design = float(data.get("design_cost", 0) or 0)
-        
-        final_cost = material + making + finishing + packing + design
-        selling_price = float(data.get("selling_price", 0) or 0)
-        profit = selling_price - final_cost
-        profit_margin = (profit / selling_price * 100) if selling_price > 0 else 0
-        
-        variant = {
-            **data,
-            "variant_id": variant_id,
-            "material_cost": material,
-            "making_cost": making,
-            "finishing_cost": finishing,
-            "packing_cost": packing,
-            "design_cost": design,
-            "final_cost": final_cost,
-            "profit": profit,
-            "profit_margin": round(profit_margin, 2),
-            "status": "Active",
-            "created_at": now,
-            "updated_at": now,
-        }
-        
-        success = await self.append_row(
-            self.SHEETS["variants"],
-            self.VARIANT_COLUMNS,
-            variant
-        )
-        
-        return variant if success else None
-
-    async def update_variant(self, variant_id: str, data: dict) -> bool:
-        """Update an existing variant."""
-        # Recalculate if cost/price fields are present
-        current = await self.get_variant(variant_id)
-        if not current:
+    async def _commit_batch(self, batch: WriteBatch) -> bool:
+        """
+        Flush a write batch to Google Sheets.
+        
+        The appends and the updates are separate calls, so the commit isn't
+        atomic. If an append or the row lookup fails, the updates aren't sent.
+        Sheets whose calls failed are reloaded on next read. Writes that
+        succeeded are still patched into the cached tables, and the batch is
+        reported as failed.
+        """
+        if not batch.appends and not batch.updates:
+            return True
+        if not self.service:
             return False
-            
-        merged = {**current, **data}
-        
-        material = float(merged.get("material_cost", 0) or 0)
-        making = float(merged.get("making_cost", 0) or 0)
-        finishing = float(merged.get("finishing_cost", 0) or 0)
-        packing = float(merged.get("packing_cost", 0) or 0)
-        design = float(merged.get("design_cost", 0) or 0)
-        
-        final_cost = material + making + finishing + packing + design
-        selling_price = float(merged.get("selling_price", 0) or 0)
-        profit = selling_price - final_cost
-        profit_margin = (profit / selling_price * 100) if selling_price > 0 else 0
-        
-        data["final_cost"] = final_cost
-        data["profit"] = profit
-        data["profit_margin"] = round(profit_margin, 2)
-        
-        return await self.update_row(
-            self.SHEETS["variants"],
-            self.VARIANT_COLUMNS,
-            "variant_id",
-            variant_id,
-            data
-        )
-
-    async def delete_variant(self, variant_id: str) -> bool:
-        """Soft delete a variant."""
-        return await self.delete_row(
-            self.SHEETS["variants"],
-            self.VARIANT_COLUMNS,
-            "variant_id",
-            variant_id
-        )
-
-    # ============ Invoice Operations ============
-    
-    async def get_invoices(
-        self, invoice_type: Optional[str] = None, dealer_id: Optional[str] = None
-    ) -> list[dict]:
-        """Get all invoices with optional filtering."""
-        invoices = await self.get_all_rows(
-            self.SHEETS["invoices"],
-            self.INVOICE_COLUMNS
-        )
-        
-        if invoice_type:
-            invoices = [i for i in invoices if i.get("invoice_type") == invoice_type]
-        if dealer_id:
-            invoices = [i for i in invoices if i.get("dealer_id") == dealer_id]
         
-        return invoices
-    
-    async def get_invoice(self, invoice_id: str) -> Optional[dict]:
-        """Get an invoice by ID with its items."""
-        invoice = await self.get_row_by_id(
-            self.SHEETS["invoices"],
-            self.INVOICE_COLUMNS,
-            "invoice_id",
-            invoice_id
-        )
-        
-        if invoice:
-            # Get invoice items
-            items = await self.filter_rows(
-                self.SHEETS["invoice_items"],
-                self.INVOICE_ITEM_COLUMNS,
-                {"invoice_id": invoice_id}
-            )
-            invoice["items"] = items
-        
-        return invoice
-    
-    async def create_invoice(self, data: dict, items: list[dict]) -> Optional[dict]:
-        """Create a new invoice with items."""
-        invoice_id = await self.get_next_id(self.SHEETS["invoices"], "INV")
-        now = datetime.now().isoformat()
-        
-        # Generate invoice number
-        invoice_type = data.get("invoice_type", "GEN")
-        type_prefix = {
-            "Material": "MAT",
-            "Making": "MKG",
-            "Finishing": "FIN",
-            "Packing": "PKG",
-            "Sales": "SAL",
-        }.get(invoice_type, "INV")
-        
-        year = datetime.now().year
-        invoice_number = f"{type_prefix}-{year}-{invoice_id.split('-')[1]}"
-        
-        # Calculate totals
-        sub_total = sum(item["quantity"] * item["unit_price"] for item in items)
-        tax_percent = float(data.get("tax_percent", 0) or 0)
-        discount_percent = float(data.get("discount_percent", 0) or 0)
-        
-        tax_amount = sub_total * (tax_percent / 100)
-        discount_amount = sub_total * (discount_percent / 100)
-        grand_total = sub_total + tax_amount - discount_amount
-        
-        invoice = {
-            **data,
-            "invoice_id": invoice_id,
-            "invoice_number": invoice_number,
-            "sub_total": sub_total,
-            "tax_amount": round(tax_amount, 2),
-            "discount_amount": round(discount_amount, 2),
-            "grand_total": round(grand_total, 2),
-            "amount_paid": 0,
-            "balance_due": round(grand_total, 2),
-            "payment_status": "Unpaid",
-            "created_at": now,
-            "updated_at": now,
-        }
-        
-        success = await self.append_row(
-            self.SHEETS["invoices"],
-            self.INVOICE_COLUMNS,
-            invoice
-        )
-        
-        if not success:
-            return None
-        
-        # Create invoice items
-        for i, item in enumerate(items):
-            item_id = f"ITM-{invoice_id.split('-')[1]}-{i+1:03d}"
-            
-            # Map item fields
-            item_data = {
-                "item_id": item_id,
-                "invoice_id": invoice_id,
-                "product_id": item.get("product_id"),
-                "description": item.get("description"),
-                "quantity": item.get("quantity"),
-                "unit_price": item.get("unit_price"),
-                "total_price": item.get("total_price"),
-                "cost_type": item.get("cost_type"),
-                "notes": item.get("notes"),
-            }
-            
-            await self.append_row(
-                self.SHEETS["invoice_items"],
-                self.INVOICE_ITEM_COLUMNS,
-                item_data
-            )
-            
-        return invoice
-    
-    # ============ Workflow & Progress Operations ============
-    
-    async def get_workflow_stages(self) -> list[dict]:
-        """Get all workflow stages ordered by sequence."""
-        stages = await self.get_all_rows(
-            self.SHEETS["workflow_stages"],
-            self.WORKFLOW_STAGE_COLUMNS
-        )
-        # Sort by stage_order (convert to int)
+        updated_sheets = {sheet_name for sheet_name, _ in batch.updates}
+        touched = set(batch.appends) | updated_sheets
+        failed = set(touched)  # sheets whose writes may be partly applied
+        appended, updates_sent, found, errors = set(), False, {}, []
         try:
-            stages.sort(key=lambda x: int(x.get("stage_order", 0)))
-        except ValueError:
-            pass
-        return stages
-        
-    async def get_product_progress(self, variant_id: str) -> list[dict]:
-        """Get progress history for a variant."""
-        return await self.filter_rows(
-            self.SHEETS["product_progress"],
-            self.PRODUCT_PROGRESS_COLUMNS,
-            {"variant_id": variant_id}
-        )
-    
-    async def get_current_stage(self, variant_id: str) -> Optional[dict]:
-        """Get the current active stage for a variant."""
-        history = await self.get_product_progress(variant_id)
-        # Find entry with status != Completed (Pending or InProgress)
-        for entry in history:
-            if entry.get("status") in ["Pending", "InProgress"]:
-                return entry
-        
-        # If all completed, return the last one (Delivered)
-        if history:
-            # Sort by date descending
-            history.sort(
-                key=lambda x: x.get("created_at", ""), 
-                reverse=True
-            )
-            return history[0]
+            appends = [
+                self._execute(self.service.spreadsheets().values().append(
+                    spreadsheetId=self.spreadsheet_id,
+                    range=f"{sheet_name}!A:Z",
+                    valueInputOption="USER_ENTERED",
+                    insertDataOption="INSERT_ROWS",
+                    body={"values": rows},
+                ))
+                for sheet_name, rows in batch.appends.items()
+            ]
+            row_numbers = self._resolve_row_numbers(list(batch.updates))
+            # Let every call finish before deciding what reached the spreadsheet
+            *results, found = await asyncio.gather(*appends, row_numbers, return_exceptions=True)
+            for outcome in (*results, found):
+                if isinstance(outcome, BaseException) and not isinstance(outcome, HttpError):
+                    raise outcome
             
-        return None
-        
-    async def create_progress_entry(self, data: dict) -> Optional[dict]:
-        """Create a new progress entry."""
-        progress_id = await self.get_next_id(self.SHEETS["product_progress"], "PRG")
-        now = datetime.now().isoformat()
-        
-        entry = {
-            **data,
-            "progress_id": progress_id,
-            "created_at": now,
-            "updated_at": now,
-        }
-        
-        success = await self.append_row(
-            self.SHEETS["product_progress"],
-            self.PRODUCT_PROGRESS_COLUMNS,
-            entry
-        )
-        
-        return entry if success else None
-        
-    async def update_progress_entry(self, progress_id: str, data: dict) -> bool:
-        """Update a progress entry."""
-        return await self.update_row(
-            self.SHEETS["product_progress"],
-            self.PRODUCT_PROGRESS_COLUMNS,
-            "progress_id",
-            progress_id,
-            data
-        )
-        
-    # ============ Payment Operations ============
-    
-    async def get_payments(
-        self,
-        invoice_id: Optional[str] = None,
-        dealer_id: Optional[str] = None,
-        progress_id: Optional[str] = None
-    ) -> list[dict]:
-        """Get payments with optional filtering."""
-        payments = await self.get_all_rows(
-            self.SHEETS["payments"],
-            self.PAYMENT_COLUMNS
-        )
-        
-        if invoice_id:
-            payments = [p for p in payments if p.get("invoice_id") == invoice_id]
-        if dealer_id:
-            payments = [p for p in payments if p.get("dealer_id") == dealer_id]
-        if progress_id:
-            payments = [p for p in payments if p.get("progress_id") == progress_id]
+            failed = set()
+            for (sheet_name, rows), result in zip(batch.appends.items(), results):
+                if isinstance(result, HttpError):
+                    errors.append(result)
+                    failed.add(sheet_name)
+                else:
+                    self._index_appended_rows(sheet_name, rows, result)
+                    appended.add(sheet_name)
+            if isinstance(found, HttpError):
+                errors.append(found)
+                found = {}
             
-        return payments
-        
-    async def create_payment(self, data: dict) -> Optional[dict]:
-        """Create a new payment."""
-        payment_id = await self.get_next_id(self.SHEETS["payments"], "PAY")
-        now = datetime.now().isoformat()
-        
-        entry = {
-            **data,
-            "payment_id": payment_id,
-            "created_at": now,
-            "updated_at": now,
-        }
-        
-        success = await self.append_row(
-            self.SHEETS["payments"],
-            self.PAYMENT_COLUMNS,
-            entry
-        )
-        
-        return entry if success else None
-        
-    async def record_payment(self, invoice_id: str, amount: float) -> bool:
-        """Deprecated: Use create_payment instead. This was for direct invoice updates."""
-        # Kept for backward compatibility if used elsewhere, but ideally logic moves to PaymentService
-        pass
+            data = []
+            for (sheet_name, id_value), row in batch.updates.items():
+                row_num = found.get((sheet_name, id_value))
+                if row_num is None:
+                    if not errors:
+                        print(f"Row {id_value} not found in {sheet_name}, skipping update")
+                    continue
+                data.append({"range": f"{sheet_name}!A{row_num}:Z{row_num}", "values": [row]})
             
-
-    
-    async def _update_product_cost(
-        self,
-        product_id: str,
-        cost_type: str,
-        amount: float,
-        invoice_id: str,
-        dealer_id: str
-    ):
-        """Update a product's cost based on an invoice."""
-        product = await self.get_product(product_id)
-        if not product:
-            return
-        
-        # Map invoice type to cost field
-        cost_field_map = {
-            "Material": "material_cost",
-            "Making": "making_cost",
-            "Finishing": "finishing_cost",
-            "Packing": "packing_cost",
-        }
-        
-        cost_field = cost_field_map.get(cost_type)
-        if cost_field:
-            # Add to existing cost
-            current_cost = float(product.get(cost_field, 0) or 0)
-            new_cost = current_cost + amount
+            if data and not errors:
+                request = self.service.spreadsheets().values().batchUpdate(
+                    spreadsheetId=self.spreadsheet_id,
+                    body={"valueInputOption": "USER_ENTERED", "data": data},
+                )
+                try:
+                    await self._execute(request)
+                    updates_sent = True
+                except HttpError as e:
+                    errors.append(e)
+                    failed |= updated_sheets
             
-            await self.update_product(product_id, {cost_field: new_cost})
-        
-        # Also add to cost breakdown
-        breakdown_id = await self.get_next_id(self.SHEETS["cost_breakdown"], "CST")
-        now = datetime.now()
-        
-        breakdown = {
-            "breakdown_id": breakdown_id,
-            "product_id": product_id,
-            "cost_type": cost_type,
-            "invoice_id": invoice_id,
-            "dealer_id": dealer_id,
-            "amount": amount,
-            "date": now.strftime("%Y-%m-%d"),
-            "notes": "",
-            "created_at": now.isoformat(),
-        }
-        
-        await self.append_row(
-            self.SHEETS["cost_breakdown"],
-            self.COST_BREAKDOWN_COLUMNS,
-            breakdown
-        )
-    
-    async def record_payment(self, invoice_id: str, amount: float) -> bool:
-        """Record a payment against an invoice."""
-        invoice = await self.get_invoice(invoice_id)
-        if not invoice:
+        finally:
+            for sheet_name in touched:
+                if sheet_name in failed:
+                    # Part of its writes may have been applied; reload on next read
+                    self._forget_table(sheet_name)
+                    continue
+                
+                # Patch cached tables once per written sheet
+                updated = {
+                    id_value: batch.pending[(name, id_value)]
+                    for (name, id_value) in batch.updates
+                    if name == sheet_name and (name, id_value) in found
+                } if updates_sent else {}
+                if sheet_name in appended or updated:
+                    self._write_through(
+                        sheet_name,
+                        batch.columns[sheet_name],
+                        appended=batch.appends.get(sheet_name) if sheet_name in appended else None,
+                        updated=updated,
+                    )
+        
+        if errors:
+            print(f"Error committing batch to {sorted(touched)}: {errors[0]}")
             return False
-        
-        current_paid = float(invoice.get("amount_paid", 0) or 0)
-        grand_total = float(invoice.get("grand_total", 0) or 0)
-        
-        new_paid = current_paid + amount
-        balance_due = grand_total - new_paid
-        
-        if balance_due <= 0:
-            status = "Paid"
-            balance_due = 0
-        elif new_paid > 0:
-            status = "Partial"
-        else:
-            status = "Unpaid"
-        
-        return await self.update_row(
-            self.SHEETS["invoices"],
-            self.INVOICE_COLUMNS,
-            "invoice_id",
-            invoice_id,
-            {
-                "amount_paid": new_paid,
-                "balance_due": balance_due,
-                "payment_status": status,
-            }
-        )
-    
-    # ============ Cost Breakdown Operations ============
+        return True
     
-    async def get_cost_breakdown(self, product_id: str) -> list[dict]:
-        """Get all cost entries for a product."""
-        return await self.filter_rows(
-            self.SHEETS["cost_breakdown"],
-            self.COST_BREAKDOWN_COLUMNS,
-            {"product_id": product_id}
-        )
-    
-    # ============ Settings Operations ============
-    
-    async def get_settings(self) -> dict:
-        """Get all settings as a dictionary."""
-        rows = await self.get_all_rows(
-            self.SHEETS["settings"],
-            self.SETTINGS_COLUMNS
+    async def _find_row_numbers(self, sheet_names: list[str]) -> dict[tuple[str, str], int]:
+        """Scan column A of each sheet with one batchGet and rebuild their row indexes."""
+        if not sheet_names:
+            return {}
+        
+        # Read before the scan, so an edit in between leaves the index unverified
+        version = await self._spreadsheet_version()
+        request = self.service.spreadsheets().values().batchGet(
+            spreadsheetId=self.spreadsheet_id,
+            ranges=[f"{sheet_name}!A:A" for sheet_name in sheet_names],
         )
+        result = await self._execute(request)
         
-        return {row["setting_key"]: row["setting_value"] for row in rows if row.get("setting_key")}
+        found = {}
+        for sheet_name, value_range in zip(sheet_names, result.get("valueRanges", [])):
+            index = {}
+            for i, row in enumerate(value_range.get("values", [])):
+                if i == 0 or not row:  # Skip header
+                    continue
+                index.setdefault(row[0], i + 1)  # 1-indexed
+                found.setdefault((sheet_name, row[0]), i + 1)
+            self._row_numbers[sheet_name] = index
+            self._index_version(sheet_name, version)
+        return found
     
-    async def update_setting(self, key: str, value: str, category: str = "General") -> bool:
-        """Update or create a setting."""
-        settings = await self.get_all_rows(
-            self.SHEETS["settings"],
-            self.SETTINGS_COLUMNS
-        )
-        
-        # Check if setting exists
-        for setting in settings:
-            if setting.get("setting_key") == key:
-                return await self.update_row(
-                    self.SHEETS["settings"],
-                    self.SETTINGS_COLUMNS,
-                    "setting_key",
-                    key,
-                    {"setting_value": value, "category": category}
-                )
-        
-        # Create new setting
-        return await self.append_row(
-            self.SHEETS["settings"],
-            self.SETTINGS_COLUMNS,
-            {
-                "setting_key": key,
-                "setting_value": value,
-                "category": category,
-                "updated_at": datetime.now().isoformat(),
-            }
-        )
-    # ============ Plating Operations ============
+    def _index_version(self, sheet_name: str, version: Optional[str]) -> None:
+        """Record the Drive version a sheet's row index was built at (None = always check it)."""
+        if version is not None:
+            self._row_number_versions[sheet_name] = version
+        else:
+            self._row_number_versions.pop(sheet_name, None)
     
-    async def get_plating_rates(self) -> list[dict]:
-        """Get all plating rates."""
-        return await self.filter_rows(
-            self.SHEETS["plating_rates"],
-            self.PLATING_RATE_COLUMNS,
-            {"status": "Active"}
-        )
+    async def allocate_ids(self, sheet_name: str, prefix: str, count: int) -> list[str]:
+        """
+        Allocate `count` sequential IDs from the in-memory allocator.
+        Counters are seeded once from the loaded sheet; later creates need no reads.
+        """
+        if not self.service:
+            return [f"{prefix}-{n:05d}" for n in range(1, count + 1)]
+        
+        async def seed() -> int:
+            if sheet_name in self._unverified:
+                # Snapshot data may miss rows added while the server was down
+                await self.revalidate([sheet_name])
+            table = await self.get_table(sheet_name, self.SHEET_COLUMNS[sheet_name])
+            if table is None or sheet_name in self._unverified:
+                raise RuntimeError(f"Could not load {sheet_name} to seed {prefix} IDs")
+            numbers = [parse_id_number(id_value, prefix) for id_value in table.by_id]
+            return max((n for n in numbers if n is not None), default=0)
+        
+        return await self.ids.allocate(sheet_name, prefix, count, seed)
     
-    async def create_plating_rate(self, data: dict) -> Optional[dict]:
-        """Create a new plating rate."""
-        rate_id = await self.get_next_id(self.SHEETS["plating_rates"], "RATE")
-        now = datetime.now().isoformat()
-        
-        rate = {
-            **data,
-            "rate_id": rate_id,
-            "status": "Active",
-            "created_at": now,
-            "updated_at": now,
-        }
-        
-        success = await self.append_row(
-            self.SHEETS["plating_rates"],
-            self.PLATING_RATE_COLUMNS,
-            rate
-        )
-        return rate if success else None
-        
-    async def update_plating_rate(self, rate_id: str, data: dict) -> bool:
-        """Update a plating rate."""
-        return await self.update_row(
-            self.SHEETS["plating_rates"],
-            self.PLATING_RATE_COLUMNS,
-            "rate_id",
-            rate_id,
-            data
-        )
-
-    async def get_plating_jobs(self, dealer_id: Optional[str] = None) -> list[dict]:
-        """Get plating jobs."""
-        if dealer_id:
-            return await self.filter_rows(
-                self.SHEETS["plating_jobs"],
-                self.PLATING_JOB_COLUMNS,
-                {"dealer_id": dealer_id}
-            )
-        return await self.get_all_rows(self.SHEETS["plating_jobs"], self.PLATING_JOB_COLUMNS)
-
-    async def create_plating_job(self, data: dict) -> Optional[dict]:
-        """Create a new plating job."""
-        job_id = await self.get_next_id(self.SHEETS["plating_jobs"], "JOB")
-        now = datetime.now().isoformat()
-        
-        job = {
-            **data,
-            "job_id": job_id,
-            "status": "Assigned",
-            "start_date": now,
-            "created_at": now,
-            "updated_at": now,
-        }
-        
-        success = await self.append_row(
-            self.SHEETS["plating_jobs"],
-            self.PLATING_JOB_COLUMNS,
-            job
-        )
-        return job if success else None
-
-    async def update_plating_job(self, job_id: str, data: dict) -> bool:
-        """Update a plating job."""
-        return await self.update_row(
-            self.SHEETS["plating_jobs"],
-            self.PLATING_JOB_COLUMNS,
-            "job_id",
-            job_id,
-            data
-        )
+    async def filter_rows(
+        self, sheet_name: str, columns: list, filters: dict
+    ) -> list[dict]:
+        """Get rows matching filter criteria (index-assisted for keys in INDEXES)."""
+        table = await self.get_table(sheet_name, columns)
+        return table.filter(filters) if table else []
@@ -0,0 +1,449 @@
+"""
+SQLite Storage - Local database backend for all records.
+Each sheet is a table with the same columns, indexed on every id and
+foreign-key column. Google Sheets can be kept as an asynchronous mirror
+so the data can still be opened in the spreadsheet.
+"""
+
+import asyncio
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Optional, TypeVar
+
+from app.services.id_allocator import IdAllocator, parse_id_number
+from app.services.storage_engine import StorageEngine, WriteBatch, decode_cell
+
+
+# Active transaction for the current request/task (None = autocommit each write)
+_transaction: ContextVar[Optional[WriteBatch]] = ContextVar("sqlite_transaction", default=None)
+
+T = TypeVar("T")
+
+
+def _quote(name: str) -> str:
+    """Quote a table or column name for SQL."""
+    return '"' + name.replace('"', '""') + '"'
+
+
+class SqliteStorage(StorageEngine):
+    """
+    Storage backend on a local SQLite database.
+
+    Statements run in a database thread per connection, off the event loop.
+    Writes share one connection, so transactions take turns under
+    `_transaction_lock`; a `batch()` is a single SQLite transaction and reads
+    inside it see its own writes. Other reads use a second connection, which
+    (in WAL mode) only sees committed data and doesn't wait for open transactions.
+    Committed writes are replayed on the mirror, if any, by a background task.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        mirror: Optional[StorageEngine] = None,
+        id_allocator: Optional[IdAllocator] = None,
+    ):
+        """
+        Open (or create) the database.
+
+        Args:
+            path: SQLite database file
+            mirror: Backend that receives a copy of every committed write (e.g. SheetsService)
+            id_allocator: Allocator for record IDs (shared-file blocks for multiple workers)
+        """
+        self.path = path
+        if mirror is not None and not mirror.available:
+            # Without a working Sheets client every mirrored commit would just fail
+            print("⚠️  Mirror backend is not available (check Google credentials) - SQLite writes won't be mirrored")
+            mirror = None
+        self.mirror = mirror
+        self.ids = id_allocator or IdAllocator()
+        self.mirror_failures = 0
+        self._mirror_queue: Optional[asyncio.Queue] = None
+        self._mirror_task: Optional[asyncio.Task] = None
+        # A batch keeps its transaction open across awaits; others wait for it
+        self._transaction_lock = asyncio.Lock()
+
+        # Autocommit mode; multi-statement writes use explicit BEGIN/COMMIT
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+        self._reader = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        # One thread per connection: its statements run in order, never concurrently
+        self._write_thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-write")
+        self._read_thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-read")
+        print(f"✅ SQLite storage ready ({path})")
+
+    @property
+    def available(self) -> bool:
+        """The local database is always available once opened."""
+        return True
+
+    def _indexed_columns(self, sheet_name: str, columns: list) -> list[str]:
+        """The id column, declared secondary indexes and every *_id column."""
+        indexed = [columns[0], *self.INDEXES.get(sheet_name, [])]
+        indexed += [col for col in columns if col.endswith("_id")]
+        return list(dict.fromkeys(indexed))
+
+    def _create_schema(self) -> None:
+        """Create a table per sheet, add columns new to the mapping, and build indexes."""
+        for sheet_name, columns in self.SHEET_COLUMNS.items():
+            table = _quote(sheet_name)
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ({', '.join(f'{_quote(col)} TEXT' for col in columns)})"
+            )
+
+            existing = {record[1] for record in self._conn.execute(f"PRAGMA table_info({table})")}
+            for col in columns:
+                if col not in existing:
+                    self._conn.execute(f"ALTER TABLE {table} ADD COLUMN {_quote(col)} TEXT")
+
+            for col in self._indexed_columns(sheet_name, columns):
+                index = _quote(f"idx_{sheet_name}_{col}")
+                self._conn.execute(f"CREATE INDEX IF NOT EXISTS {index} ON {table} ({_quote(col)})")
+
+    @staticmethod
+    def _to_db(value: Any) -> Any:
+        """Convert a Python value to something SQLite stores as-is (dates become ISO strings)."""
+        if value is None or isinstance(value, (str, int, float)):
+            return value
+        if hasattr(value, "isoformat"):
+            return value.isoformat()
+        return str(value)
+
+    async def _on_writer(self, work: Callable[[], T]) -> T:
+        """Run `work` (statements on the write connection) in its database thread."""
+        return await asyncio.get_running_loop().run_in_executor(self._write_thread, work)
+
+    @asynccontextmanager
+    async def _write(self):
+        """Run statements in the active batch's transaction, or in their own."""
+        if _transaction.get() is not None:
+            yield
+            return
+
+        async with self._transaction_lock:
+            try:
+                # Inside the try: if the task is cancelled while BEGIN runs, it's still rolled back
+                await self._on_writer(lambda: self._conn.execute("BEGIN"))
+                yield
+            except BaseException:
+                await self._on_writer(lambda: self._conn.execute("ROLLBACK"))
+                raise
+            await self._on_writer(lambda: self._conn.execute("COMMIT"))
+
+    async def _query(self, sql: str, params: tuple = ()) -> list[tuple]:
+        """
+        Fetch all records of a query: inside the current batch's transaction if
+        there is one (to see its writes), otherwise from committed data only.
+        """
+        if _transaction.get() is not None:
+            return await self._on_writer(lambda: self._conn.execute(sql, params).fetchall())
+        return await asyncio.get_running_loop().run_in_executor(
+            self._read_thread, lambda: self._reader.execute(sql, params).fetchall()
+        )
+
+    async def _select(self, sheet_name: str, columns: list, where: str = "", params: tuple = ()) -> list[dict]:
+        """Run a SELECT of the mapped columns and return rows as typed dictionaries."""
+        cols = ", ".join(_quote(col) for col in columns)
+        records = await self._query(f"SELECT {cols} FROM {_quote(sheet_name)} {where} ORDER BY rowid", params)
+        return [self._row_to_dict(record, columns, sheet_name) for record in records]
+
+    # ============ Row Primitives ============
+
+    async def get_all_rows(self, sheet_name: str, columns: list) -> list[dict]:
+        """Get all rows from a table, in insertion order."""
+        return await self._select(sheet_name, columns)
+
+    async def get_row_by_id(
+        self, sheet_name: str, columns: list, id_field: str, id_value: str
+    ) -> Optional[dict]:
+        """Get the first row where `id_field` equals `id_value` (indexed)."""
+        if id_field not in columns:
+            return None
+        rows = await self._select(sheet_name, columns, f"WHERE {_quote(id_field)} = ?", (id_value,))
+        return rows[0] if rows else None
+
+    async def filter_rows(
+        self, sheet_name: str, columns: list, filters: dict
+    ) -> list[dict]:
+        """Get rows matching all filter criteria with a single WHERE query."""
+        if any(key not in columns for key in filters):
+            return []  # Unknown fields never match, as with Sheets rows
+
+        clauses, params = [], []
+        for key, value in filters.items():
+            if value is None:
+                clauses.append(f"{_quote(key)} IS NULL")
+            else:
+                clauses.append(f"{_quote(key)} = ?")
+                params.append(self._to_db(value))
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return await self._select(sheet_name, columns, where, tuple(params))
+
+    async def get_columns(self, sheet_name: str, fields: list[str]) -> list[tuple]:
+        """Get only some columns of a table as tuples, one per row."""
+        columns = self.SHEET_COLUMNS.get(sheet_name, [])
+        for field in fields:
+            if field not in columns:
+                raise ValueError(f"Unknown column '{field}' in sheet {sheet_name}")
+
+        cols = ", ".join(_quote(field) for field in fields)
+        types = [self.COLUMN_TYPES.get(sheet_name, {}).get(field, "str") for field in fields]
+        records = await self._query(f"SELECT {cols} FROM {_quote(sheet_name)} ORDER BY rowid")
+        return [tuple(decode_cell(value, kind) for value, kind in zip(record, types)) for record in records]
+
+    async def append_rows(
+        self, sheet_name: str, columns: list, rows: list[dict], id_prefix: Optional[str] = None
+    ) -> Optional[list[dict]]:
+        """Insert rows in one transaction (ids allocated in bulk when `id_prefix` is set)."""
+        created = [dict(data) for data in rows]
+        id_field = columns[0]
+        if id_prefix:
+            missing = [data for data in created if not data.get(id_field)]
+            new_ids = await self.allocate_ids(sheet_name, id_prefix, len(missing)) if missing else []
+            for data, new_id in zip(missing, new_ids):
+                data[id_field] = new_id
+
+        values = [self._dict_to_row(data, columns) for data in created]
+        if not values:
+            return created
+
+        try:
+            async with self._write():
+                await self._on_writer(lambda: self._conn.executemany(
+                    f"INSERT INTO {_quote(sheet_name)} ({', '.join(_quote(col) for col in columns)}) "
+                    f"VALUES ({', '.join('?' for _ in columns)})",
+                    [[self._to_db(value) for value in row] for row in values],
+                ))
+        except sqlite3.Error as e:
+            print(f"Error appending to {sheet_name}: {e}")
+            return None
+
+        batch = _transaction.get()
+        if batch is not None:
+            batch.appends.setdefault(sheet_name, []).extend(values)
+            batch.columns[sheet_name] = columns
+        else:
+            self._mirror(WriteBatch(), appends={sheet_name: values}, columns=columns)
+
+        return created
+
+    async def update_row(
+        self, sheet_name: str, columns: list, id_field: str, id_value: str, data: dict
+    ) -> bool:
+        """Merge `data` into the first row whose `id_field` equals `id_value`."""
+        if id_field not in columns:
+            return False
+        table = _quote(sheet_name)
+
+        def merge() -> Optional[tuple[dict, list]]:
+            # Read and write in the same transaction so concurrent updates don't drop each other's fields
+            record = self._conn.execute(
+                f"SELECT rowid, {', '.join(_quote(col) for col in columns)} FROM {table} "
+                f"WHERE {_quote(id_field)} = ? ORDER BY rowid LIMIT 1",
+                (id_value,),
+            ).fetchone()
+            if record is None:
+                return None
+
+            current = self._row_to_dict(record[1:], columns, sheet_name)
+            updated = {**current, **data, "updated_at": datetime.now().isoformat()}
+            row = self._dict_to_row(updated, columns)
+            self._conn.execute(
+                f"UPDATE {table} SET {', '.join(f'{_quote(col)} = ?' for col in columns)} WHERE rowid = ?",
+                [*(self._to_db(value) for value in row), record[0]],
+            )
+            return updated, row
+
+        try:
+            async with self._write():
+                merged = await self._on_writer(merge)
+        except sqlite3.Error as e:
+            print(f"Error updating {sheet_name}: {e}")
+            return False
+        if merged is None:
+            return False
+        updated, row = merged
+
+        batch = _transaction.get()
+        if batch is not None:
+            batch.updates[(sheet_name, id_value)] = row
+            batch.pending[(sheet_name, id_value)] = updated
+            batch.columns[sheet_name] = columns
+        else:
+            self._mirror(WriteBatch(), updates={(sheet_name, id_value): updated}, columns=columns)
+
+        return True
+
+    async def allocate_ids(self, sheet_name: str, prefix: str, count: int) -> list[str]:
+        """Allocate `count` sequential IDs, seeding the counter from the table once."""
+        async def seed() -> int:
+            id_field = _quote(self.SHEET_COLUMNS[sheet_name][0])
+            records = await self._query(
+                f"SELECT {id_field} FROM {_quote(sheet_name)} WHERE {id_field} LIKE ?",
+                (f"{prefix}-%",),
+            )
+            numbers = [parse_id_number(id_value, prefix) for (id_value,) in records]
+            return max((n for n in numbers if n is not None), default=0)
+
+        return await self.ids.allocate(sheet_name, prefix, count, seed)
+
+    @asynccontextmanager
+    async def batch(self):
+        """
+        Run the enclosed writes in one SQLite transaction.
+
+        The transaction is rolled back if the block raises; nested batches
+        join the outermost one. Concurrent batches (and single writes) wait
+        for the open transaction to finish. Committed writes are mirrored together.
+        """
+        current = _transaction.get()
+        if current is not None:
+            yield current
+            return
+
+        batch = WriteBatch()
+        async with self._transaction_lock:
+            token = _transaction.set(batch)
+            try:
+                await self._on_writer(lambda: self._conn.execute("BEGIN"))
+                yield batch
+            except BaseException:
+                await self._on_writer(lambda: self._conn.execute("ROLLBACK"))
+                raise
+            finally:
+                _transaction.reset(token)
+
+            try:
+                await self._on_writer(lambda: self._conn.execute("COMMIT"))
+                batch.committed = True
+            except sqlite3.Error as e:
+                print(f"Error committing transaction: {e}")
+                await self._on_writer(lambda: self._conn.execute("ROLLBACK"))
+                batch.committed = False
+                return
+
+        self._mirror(batch)
+
+    # ============ Mirror ============
+
+    def _mirror(
+        self,
+        batch: WriteBatch,
+        appends: Optional[dict[str, list[list]]] = None,
+        updates: Optional[dict[tuple[str, str], dict]] = None,
+        columns: Optional[list] = None,
+    ) -> None:
+        """Queue committed writes for the mirror (one mirror batch per local commit)."""
+        if self.mirror is None:
+            return
+
+        for sheet_name, rows in (appends or {}).items():
+            batch.appends[sheet_name] = rows
+            batch.columns[sheet_name] = columns
+        for key, updated in (updates or {}).items():
+            batch.pending[key] = updated
+            batch.columns[key[0]] = columns
+
+        if self._mirror_queue is None:
+            self._mirror_queue = asyncio.Queue()
+            self._mirror_task = asyncio.create_task(self._mirror_worker())
+        self._mirror_queue.put_nowait(batch)
+
+    async def _mirror_worker(self) -> None:
+        """Replay committed batches on the mirror, in commit order."""
+        while True:
+            batch = await self._mirror_queue.get()
+            try:
+                await self._replay(batch)
+            except Exception as e:
+                self.mirror_failures += 1
+                print(f"Error mirroring writes to {sorted(batch.columns)}: {e}")
+            finally:
+                self._mirror_queue.task_done()
+
+    async def _replay(self, batch: WriteBatch) -> None:
+        """Apply one committed batch to the mirror as a single mirror batch."""
+        async with self.mirror.batch() as mirrored:
+            for sheet_name, rows in batch.appends.items():
+                columns = batch.columns[sheet_name]
+                await self.mirror.append_rows(
+                    sheet_name, columns, [self._row_to_dict(row, columns) for row in rows]
+                )
+            for (sheet_name, id_value), updated in batch.pending.items():
+                columns = batch.columns[sheet_name]
+                await self.mirror.update_row(
+                    sheet_name, columns, columns[0], id_value,
+                    {col: updated.get(col) for col in columns},
+                )
+
+        if mirrored.failed:
+            raise RuntimeError("mirror batch was not committed")
+
+    async def flush(self) -> None:
+        """Wait until every queued write has reached the mirror."""
+        if self._mirror_queue is not None:
+            await self._mirror_queue.join()
+
+    # ============ Lifecycle ============
+
+    async def _is_empty(self) -> bool:
+        """True if no table has any rows yet."""
+        for sheet_name in self.SHEET_COLUMNS:
+            if await self._query(f"SELECT 1 FROM {_quote(sheet_name)} LIMIT 1"):
+                return False
+        return True
+
+    async def load_all(self) -> int:
+        """
+        Import every sheet from the mirror the first time the database is used,
+        so switching an existing shop to SQLite keeps its data.
+
+        Returns:
+            Number of sheets imported
+        """
+        if self.mirror is None or not self.mirror.available or not await self._is_empty():
+            return 0
+
+        await self.mirror.load_all()
+        sheets = {
+            sheet_name: await self.mirror.get_all_rows(sheet_name, columns)
+            for sheet_name, columns in self.SHEET_COLUMNS.items()
+        }
+
+        def insert() -> None:
+            for sheet_name, rows in sheets.items():
+                columns = self.SHEET_COLUMNS[sheet_name]
+                self._conn.executemany(
+                    f"INSERT INTO {_quote(sheet_name)} ({', '.join(_quote(col) for col in columns)}) "
+                    f"VALUES ({', '.join('?' for _ in columns)})",
+                    [
+                        [self._to_db(row.get(col)) for col in columns]
+                        for row in rows
+                        if any(row.get(col) not in (None, "") for col in columns)
+                    ],
+                )
+
+        async with self._write():
+            await self._on_writer(insert)
+
+        print(f"✅ Imported {len(sheets)} sheets from Google Sheets into SQLite")
+        return len(sheets)
+
+    def close(self) -> None:
+        """Stop the mirror task and close the database."""
+        if self._mirror_task is not None:
+            self._mirror_task.cancel()
+        if self.mirror is not None:
+            self.mirror.close()
+        self._write_thread.shutdown(wait=True)
+        self._read_thread.shutdown(wait=True)
+        self._reader.close()
+        self._conn.close()
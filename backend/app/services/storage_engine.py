@@ -0,0 +1,1214 @@
+"""
+Storage Engine - Backend-independent record storage.
+Defines the sheet schema and the domain operations (dealers, invoices,
+payments, ...) on top of a small set of row primitives that each
+storage backend implements.
+"""
+
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from typing import Any, Optional
+
+
+# Day zero of spreadsheet date serial numbers
+SERIAL_EPOCH = datetime(1899, 12, 30)
+
+
+def decode_cell(value: Any, kind: str) -> Any:
+    """
+    Convert a cell value to its column type.
+    
+    Numbers arrive as int/float from UNFORMATTED_VALUE reads, or as text from
+    older snapshots and SQLite; blank numeric cells become None and text that
+    doesn't parse is kept unchanged.
+    """
+    if kind == "str":
+        if isinstance(value, bool):
+            return "TRUE" if value else "FALSE"
+        if isinstance(value, float) and value.is_integer():
+            return str(int(value))  # e.g. a phone number stored as a number
+        if isinstance(value, (int, float)):
+            return str(value)
+        return value
+    
+    if value is None or value == "":
+        return None
+    
+    if kind == "bool":
+        if isinstance(value, bool):
+            return value
+        text = str(value).strip().upper()
+        if text in ("TRUE", "YES", "1"):
+            return True
+        if text in ("FALSE", "NO", "0"):
+            return False
+        return value
+    
+    if kind == "date":
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return (SERIAL_EPOCH + timedelta(days=value)).date().isoformat()
+        return value
+    
+    # float / int
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str):
+        try:
+            value = float(value.replace(",", ""))
+        except ValueError:
+            return value
+    if kind == "int" and float(value).is_integer():
+        return int(value)
+    return float(value) if kind == "float" else value
+
+
+def numeric_sort_key(value: Any) -> tuple:
+    """
+    Sort key ordering values numerically ("2" before "10"); blank or
+    non-numeric values sort last instead of raising.
+    """
+    number = decode_cell(value, "float")
+    if isinstance(number, (int, float)) and not isinstance(number, bool):
+        return (0, number)
+    return (1, 0)
+
+
+class WriteBatch:
+    """Row appends and updates collected inside `async with storage.batch():`."""
+    
+    def __init__(self):
+        self.appends: dict[str, list[list]] = {}  # sheet_name -> rows to append
+        self.updates: dict[tuple[str, str], list] = {}  # (sheet_name, id) -> merged row
+        self.pending: dict[tuple[str, str], dict] = {}  # (sheet_name, id) -> merged dict
+        self.columns: dict[str, list] = {}  # sheet_name -> column mapping
+        self.committed: Optional[bool] = None  # None until the batch is flushed
+    
+    @property
+    def failed(self) -> bool:
+        """True if the batch was flushed and the commit failed."""
+        return self.committed is False
+
+
+class StorageEngine:
+    """
+    Base class for storage backends.
+    
+    Subclasses implement the row primitives (get_all_rows, get_row_by_id,
+    filter_rows, append_rows, update_row, allocate_ids, get_columns, batch);
+    everything else is shared.
+    """
+    
+    # Sheet names matching our schema
+    SHEETS = {
+        "designs": "Designs",
+        "variants": "ProductVariants",
+        "dealers": "Dealers",
+        "designers": "Designers",
+        "materials": "Materials",
+        "invoices": "Invoices",
+        "invoice_items": "InvoiceItems",
+        "cost_breakdown": "CostBreakdown",
+        "settings": "Settings",
+        "workflow_stages": "WorkflowStages",
+        "product_progress": "ProductProgress",
+        "payments": "Payments",
+        "plating_rates": "PlatingRates",
+        "plating_jobs": "PlatingJobs",
+    }
+    
+    # Column mappings for each sheet (0-indexed)
+    DESIGN_COLUMNS = [
+        "design_id", "name", "category", "designer_id",
+        "base_design_cost", "image_drive_link", "spec_doc_link",
+        "notes", "status", "created_at", "updated_at"
+    ]
+
+    VARIANT_COLUMNS = [
+        "variant_id", "design_id", "variant_code", "size", "finish",
+        "material_cost", "making_cost", "finishing_cost", "packing_cost", "design_cost",
+        "final_cost", "selling_price", "profit", "profit_margin",
+        "stock_qty", "image_drive_link",
+        "notes", "status", "created_at", "updated_at"
+    ]
+    DEALER_COLUMNS = [
+        "dealer_id", "dealer_code", "dealer_type", "dealer_category", "name",
+        "contact_person", "phone", "email", "address", "gstin",
+        "bank_name", "account_no", "ifsc", "opening_balance", "current_balance",
+        "notes", "status", "created_at", "updated_at"
+    ]
+    
+    DESIGNER_COLUMNS = [
+        "designer_id", "name", "company", "phone", "email",
+        "charge_type", "default_rate", "specialization", "portfolio",
+        "notes", "status", "created_at", "updated_at"
+    ]
+    
+    MATERIAL_COLUMNS = [
+        "material_id", "name", "category", "unit",
+        "current_stock", "min_stock_alert",
+        "last_purchase_price", "last_purchase_date",
+        "notes", "status", "created_at", "updated_at"
+    ]
+    
+    INVOICE_COLUMNS = [
+        "invoice_id", "invoice_number", "invoice_type", "dealer_id",
+        "invoice_date", "due_date", "sub_total", "tax_percent", "tax_amount",
+        "discount_percent", "discount_amount", "grand_total", "amount_paid",
+        "balance_due", "payment_status", "bill_image_link", "notes",
+        "created_at", "updated_at"
+    ]
+    
+    INVOICE_ITEM_COLUMNS = [
+        "item_id", "invoice_id", "product_id", "description", "quantity",
+        "unit_price", "total_price", "cost_type", "notes"
+    ]
+    
+    COST_BREAKDOWN_COLUMNS = [
+        "breakdown_id", "product_id", "cost_type", "invoice_id", "dealer_id",
+        "amount", "date", "notes", "created_at"
+    ]
+    
+    SETTINGS_COLUMNS = [
+        "setting_key", "setting_value", "category", "updated_at"
+    ]
+    
+    WORKFLOW_STAGE_COLUMNS = [
+        "stage_order", "stage_code", "display_name", "is_final_stage"
+    ]
+    
+    PRODUCT_PROGRESS_COLUMNS = [
+        "progress_id", "variant_id", "design_id", "stage_code",
+        "assigned_dealer_id", "quantity", "status", "cost",
+        "start_date", "end_date", "remarks",
+        "created_at", "updated_at"
+    ]
+    
+    PAYMENT_COLUMNS = [
+        "payment_id", "payment_type", "related_to", "invoice_id",
+        "progress_id", "dealer_id", "amount", "payment_mode",
+        "reference_no", "payment_date", "notes",
+        "created_at", "updated_at"
+    ]
+    
+    PLATING_RATE_COLUMNS = [
+        "rate_id", "plating_type", "rate_per_kg", "unit", 
+        "effective_from", "vendor_dealer_id", "status",
+        "created_at", "updated_at"
+    ]
+    
+    PLATING_JOB_COLUMNS = [
+        "job_id", "progress_id", "variant_id", "design_id", 
+        "dealer_id", "quantity", "plating_type", "weight_in_kg", "rate_per_kg", 
+        "calculated_cost", "status", "start_date", "end_date", "notes",
+        "created_at", "updated_at"
+    ]
+    
+    # Column mapping for each sheet, keyed by sheet name
+    SHEET_COLUMNS = {
+        SHEETS["designs"]: DESIGN_COLUMNS,
+        SHEETS["variants"]: VARIANT_COLUMNS,
+        SHEETS["dealers"]: DEALER_COLUMNS,
+        SHEETS["designers"]: DESIGNER_COLUMNS,
+        SHEETS["materials"]: MATERIAL_COLUMNS,
+        SHEETS["invoices"]: INVOICE_COLUMNS,
+        SHEETS["invoice_items"]: INVOICE_ITEM_COLUMNS,
+        SHEETS["cost_breakdown"]: COST_BREAKDOWN_COLUMNS,
+        SHEETS["settings"]: SETTINGS_COLUMNS,
+        SHEETS["workflow_stages"]: WORKFLOW_STAGE_COLUMNS,
+        SHEETS["product_progress"]: PRODUCT_PROGRESS_COLUMNS,
+        SHEETS["payments"]: PAYMENT_COLUMNS,
+        SHEETS["plating_rates"]: PLATING_RATE_COLUMNS,
+        SHEETS["plating_jobs"]: PLATING_JOB_COLUMNS,
+    }
+    
+    # Column types applied when rows are loaded ("float", "int", "bool", "date");
+    # unlisted columns, including every id column, are kept as text
+    COLUMN_TYPES = {
+        SHEETS["designs"]: {"base_design_cost": "float"},
+        SHEETS["variants"]: {
+            "material_cost": "float", "making_cost": "float", "finishing_cost": "float",
+            "packing_cost": "float", "design_cost": "float", "final_cost": "float",
+            "selling_price": "float", "profit": "float", "profit_margin": "float",
+            "stock_qty": "int",
+        },
+        SHEETS["dealers"]: {"opening_balance": "float", "current_balance": "float"},
+        SHEETS["designers"]: {"default_rate": "float"},
+        SHEETS["materials"]: {
+            "current_stock": "float", "min_stock_alert": "float",
+            "last_purchase_price": "float", "last_purchase_date": "date",
+        },
+        SHEETS["invoices"]: {
+            "invoice_date": "date", "due_date": "date",
+            "sub_total": "float", "tax_percent": "float", "tax_amount": "float",
+            "discount_percent": "float", "discount_amount": "float", "grand_total": "float",
+            "amount_paid": "float", "balance_due": "float",
+        },
+        SHEETS["invoice_items"]: {"quantity": "float", "unit_price": "float", "total_price": "float"},
+        SHEETS["cost_breakdown"]: {"amount": "float", "date": "date"},
+        SHEETS["workflow_stages"]: {"is_final_stage": "bool"},
+        SHEETS["product_progress"]: {
+            "quantity": "int", "cost": "float", "start_date": "date", "end_date": "date",
+        },
+        SHEETS["payments"]: {"amount": "float", "payment_date": "date"},
+        SHEETS["plating_rates"]: {"rate_per_kg": "float", "effective_from": "date"},
+        SHEETS["plating_jobs"]: {
+            "quantity": "int", "weight_in_kg": "float", "rate_per_kg": "float",
+            "calculated_cost": "float", "start_date": "date", "end_date": "date",
+        },
+    }
+    
+    # Secondary indexes built on each loaded sheet; filter_rows uses them automatically
+    INDEXES = {
+        SHEETS["variants"]: ["design_id"],
+        SHEETS["invoices"]: ["invoice_type", "dealer_id"],
+        SHEETS["invoice_items"]: ["invoice_id"],
+        SHEETS["cost_breakdown"]: ["product_id"],
+        SHEETS["product_progress"]: ["variant_id", "stage_code"],
+        SHEETS["payments"]: ["invoice_id", "dealer_id", "progress_id"],
+        SHEETS["plating_jobs"]: ["dealer_id", "progress_id"],
+    }
+    
+    @property
+    def available(self) -> bool:
+        """True if the backend is configured and can serve requests."""
+        raise NotImplementedError
+    
+    # ============ Row Primitives ============
+    
+    async def get_all_rows(self, sheet_name: str, columns: list) -> list[dict]:
+        """Get all rows from a sheet as dictionaries, in insertion order."""
+        raise NotImplementedError
+    
+    async def get_row_by_id(
+        self, sheet_name: str, columns: list, id_field: str, id_value: str
+    ) -> Optional[dict]:
+        """Get the first row where `id_field` equals `id_value`."""
+        raise NotImplementedError
+    
+    async def filter_rows(
+        self, sheet_name: str, columns: list, filters: dict
+    ) -> list[dict]:
+        """Get rows matching all filter criteria (field -> exact value)."""
+        raise NotImplementedError
+    
+    async def get_columns(self, sheet_name: str, fields: list[str]) -> list[tuple]:
+        """Get only some columns of a sheet as tuples, one per row."""
+        raise NotImplementedError
+    
+    async def get_sorted_rows(self, sheet_name: str, columns: list, field: str) -> list[dict]:
+        """Get all rows ordered by the numeric value of `field` (blank or non-numeric last)."""
+        rows = await self.get_all_rows(sheet_name, columns)
+        return sorted(rows, key=lambda row: numeric_sort_key(row.get(field)))
+    
+    async def append_rows(
+        self, sheet_name: str, columns: list, rows: list[dict], id_prefix: Optional[str] = None
+    ) -> Optional[list[dict]]:
+        """
+        Append rows to a sheet.
+        
+        Args:
+            sheet_name: Sheet to append to
+            columns: Column mapping for the sheet
+            rows: Row dictionaries to write
+            id_prefix: If set, rows without an id get one allocated in bulk (e.g. "DLR")
+        
+        Returns:
+            The created rows (with ids), or None on failure
+        """
+        raise NotImplementedError
+    
+    async def update_row(
+        self, sheet_name: str, columns: list, id_field: str, id_value: str, data: dict
+    ) -> bool:
+        """Merge `data` into the row whose `id_field` equals `id_value`."""
+        raise NotImplementedError
+    
+    async def allocate_ids(self, sheet_name: str, prefix: str, count: int) -> list[str]:
+        """Allocate `count` sequential IDs (e.g. DLR-00042) for a sheet."""
+        raise NotImplementedError
+    
+    def batch(self):
+        """
+        Async context manager grouping writes so they are applied together.
+        Yields a WriteBatch whose `failed` flag is set if the commit fails.
+        """
+        raise NotImplementedError
+    
+    @asynccontextmanager
+    async def read_scope(self):
+        """
+        Async context manager under which each sheet is read at most once
+        (e.g. for one API request). Backends with cheap reads don't memoize.
+        """
+        yield None
+    
+    # ============ Lifecycle ============
+    
+    def restore_snapshot(self) -> int:
+        """Load locally persisted data at startup; returns the number of sheets restored."""
+        return 0
+    
+    async def revalidate(self, sheet_names: Optional[list[str]] = None) -> int:
+        """Bring locally held data up to date; returns the number of sheets reloaded."""
+        return 0
+    
+    async def load_all(self) -> int:
+        """Warm the backend at startup; returns the number of sheets loaded."""
+        return 0
+    
+    def invalidate(self, sheet_names: Optional[list[str]] = None) -> None:
+        """Drop locally held copies (None = all sheets) so the next reads fetch fresh data."""
+    
+    async def flush(self) -> None:
+        """Wait for background writes (e.g. mirroring) to finish."""
+    
+    def close(self) -> None:
+        """Release resources on shutdown."""
+    
+    # ============ Shared Helpers ============
+    
+    def _get_column_index(self, columns: list, field: str) -> int:
+        """Get the column index for a field name."""
+        try:
+            return columns.index(field)
+        except ValueError:
+            return -1
+    
+    def _row_to_dict(self, row: list, columns: list, sheet_name: Optional[str] = None) -> dict:
+        """
+        Convert a row to a dictionary using column mapping.
+        With `sheet_name`, values are decoded to the sheet's COLUMN_TYPES.
+        """
+        result = {}
+        for i, col in enumerate(columns):
+            if i < len(row):
+                result[col] = row[i]
+            else:
+                result[col] = None
+        return self._decode_row(sheet_name, result) if sheet_name else result
+    
+    def _decode_row(self, sheet_name: str, data: dict) -> dict:
+        """Decode a row dictionary's values to the sheet's column types (in place)."""
+        types = self.COLUMN_TYPES.get(sheet_name, {})
+        for col, value in data.items():
+            data[col] = decode_cell(value, types.get(col, "str"))
+        return data
+    
+    def _dict_to_row(self, data: dict, columns: list) -> list:
+        """Convert a dictionary to a row using column mapping."""
+        return [data.get(col, "") for col in columns]
+    
+    async def append_row(self, sheet_name: str, columns: list, data: dict) -> bool:
+        """Append a new row to a sheet."""
+        return await self.append_rows(sheet_name, columns, [data]) is not None
+    
+    async def delete_row(
+        self, sheet_name: str, columns: list, id_field: str, id_value: str
+    ) -> bool:
+        """Delete a row by its ID field (sets status to Deleted)."""
+        # Soft delete by updating status
+        return await self.update_row(
+            sheet_name, columns, id_field, id_value, {"status": "Deleted"}
+        )
+    
+    async def get_next_id(self, sheet_name: str, prefix: str) -> str:
+        """Generate the next ID for a sheet (e.g., DLR-00001)."""
+        return (await self.allocate_ids(sheet_name, prefix, 1))[0]
+    
+    # ============ Dealer Operations ============
+    
+    async def get_dealers(self, dealer_type: Optional[str] = None) -> list[dict]:
+        """Get all dealers, optionally filtered by type."""
+        # Get all rows without status filter - let the router handle filtering
+        rows = await self.get_all_rows(self.SHEETS["dealers"], self.DEALER_COLUMNS)
+        
+        if dealer_type:
+            rows = [r for r in rows if r.get("dealer_type") == dealer_type]
+        
+        return rows
+    
+    async def get_dealer(self, dealer_id: str) -> Optional[dict]:
+        """Get a dealer by ID."""
+        return await self.get_row_by_id(
+            self.SHEETS["dealers"],
+            self.DEALER_COLUMNS,
+            "dealer_id",
+            dealer_id
+        )
+    
+    async def create_dealer(self, data: dict) -> Optional[dict]:
+        """Create a new dealer."""
+        dealer_id = await self.get_next_id(self.SHEETS["dealers"], "DLR")
+        now = datetime.now().isoformat()
+        
+        dealer = {
+            **data,
+            "dealer_id": dealer_id,
+            "current_balance": data.get("opening_balance", 0),
+            "created_at": now,
+            "updated_at": now,
+        }
+        
+        success = await self.append_row(
+            self.SHEETS["dealers"],
+            self.DEALER_COLUMNS,
+            dealer
+        )
+        
+        return dealer if success else None
+    
+    async def update_dealer(self, dealer_id: str, data: dict) -> bool:
+        """Update an existing dealer."""
+        return await self.update_row(
+            self.SHEETS["dealers"],
+            self.DEALER_COLUMNS,
+            "dealer_id",
+            dealer_id,
+            data
+        )
+    
+    async def delete_dealer(self, dealer_id: str) -> bool:
+        """Soft delete a dealer."""
+        return await self.delete_row(
+            self.SHEETS["dealers"],
+            self.DEALER_COLUMNS,
+            "dealer_id",
+            dealer_id
+        )
+    
+    # ============ Designer Operations ============
+    
+    async def get_designers(self) -> list[dict]:
+        """Get all active designers."""
+        return await self.filter_rows(
+            self.SHEETS["designers"],
+            self.DESIGNER_COLUMNS,
+            {"status": "Active"}
+        )
+    
+    async def get_designer(self, designer_id: str) -> Optional[dict]:
+        """Get a designer by ID."""
+        return await self.get_row_by_id(
+            self.SHEETS["designers"],
+            self.DESIGNER_COLUMNS,
+            "designer_id",
+            designer_id
+        )
+    
+    async def create_designer(self, data: dict) -> Optional[dict]:
+        """Create a new designer."""
+        designer_id = await self.get_next_id(self.SHEETS["designers"], "DES")
+        now = datetime.now().isoformat()
+        
+        designer = {
+            **data,
+            "designer_id": designer_id,
+            "created_at": now,
+            "updated_at": now,
+        }
+        
+        success = await self.append_row(
+            self.SHEETS["designers"],
+            self.DESIGNER_COLUMNS,
+            designer
+        )
+        
+        return designer if success else None
+    
+    async def update_designer(self, designer_id: str, data: dict) -> bool:
+        """Update an existing designer."""
+        return await self.update_row(
+            self.SHEETS["designers"],
+            self.DESIGNER_COLUMNS,
+            "designer_id",
+            designer_id,
+            data
+        )
+    
+    async def delete_designer(self, designer_id: str) -> bool:
+        """Soft delete a designer."""
+        return await self.delete_row(
+            self.SHEETS["designers"],
+            self.DESIGNER_COLUMNS,
+            "designer_id",
+            designer_id
+        )
+    
+    # ============ Material Operations ============
+    
+    async def get_materials(self, category: Optional[str] = None) -> list[dict]:
+        """Get all active materials."""
+        materials = await self.filter_rows(
+            self.SHEETS["materials"],
+            self.MATERIAL_COLUMNS,
+            {"status": "Active"}
+        )
+        
+        if category:
+            materials = [m for m in materials if m.get("category") == category]
+            
+        return materials
+    
+    async def get_material(self, material_id: str) -> Optional[dict]:
+        """Get a material by ID."""
+        return await self.get_row_by_id(
+            self.SHEETS["materials"],
+            self.MATERIAL_COLUMNS,
+            "material_id",
+            material_id
+        )
+    
+    async def create_material(self, data: dict) -> Optional[dict]:
+        """Create a new material."""
+        material_id = await self.get_next_id(self.SHEETS["materials"], "MAT")
+        now = datetime.now().isoformat()
+        
+        material = {
+            **data,
+            "material_id": material_id,
+            "current_stock": 0,
+            "last_purchase_price": 0,
+            "status": "Active",
+            "created_at": now,
+            "updated_at": now,
+        }
+        
+        success = await self.append_row(
+            self.SHEETS["materials"],
+            self.MATERIAL_COLUMNS,
+            material
+        )
+        
+        return material if success else None
+    
+    async def update_material(self, material_id: str, data: dict) -> bool:
+        """Update an existing material."""
+        return await self.update_row(
+            self.SHEETS["materials"],
+            self.MATERIAL_COLUMNS,
+            "material_id",
+            material_id,
+            data
+        )
+    
+    async def delete_material(self, material_id: str) -> bool:
+        """Soft delete a material."""
+        return await self.delete_row(
+            self.SHEETS["materials"],
+            self.MATERIAL_COLUMNS,
+            "material_id",
+            material_id
+        )
+    
+    # ============ Design Operations ============
+
+    async def get_designs(self) -> list[dict]:
+        """Get all active designs."""
+        return await self.filter_rows(
+            self.SHEETS["designs"],
+            self.DESIGN_COLUMNS,
+            {"status": "Active"}
+        )
+
+    async def get_design(self, design_id: str) -> Optional[dict]:
+        """Get a design by ID."""
+        return await self.get_row_by_id(
+            self.SHEETS["designs"],
+            self.DESIGN_COLUMNS,
+            "design_id",
+            design_id
+        )
+
+    async def create_design(self, data: dict) -> Optional[dict]:
+        """Create a new design."""
+        design_id = await self.get_next_id(self.SHEETS["designs"], "DES")
+        now = datetime.now().isoformat()
+        
+        design = {
+            **data,
+            "design_id": design_id,
+            "status": "Active",
+            "created_at": now,
+            "updated_at": now,
+        }
+        
+        success = await self.append_row(
+            self.SHEETS["designs"],
+            self.DESIGN_COLUMNS,
+            design
+        )
+        
+        return design if success else None
+
+    async def update_design(self, design_id: str, data: dict) -> bool:
+        """Update an existing design."""
+        return await self.update_row(
+            self.SHEETS["designs"],
+            self.DESIGN_COLUMNS,
+            "design_id",
+            design_id,
+            data
+        )
+
+    async def delete_design(self, design_id: str) -> bool:
+        """Soft delete a design."""
+        return await self.delete_row(
+            self.SHEETS["designs"],
+            self.DESIGN_COLUMNS,
+            "design_id",
+            design_id
+        )
+
+    # ============ Variant Operations ============
+
+    async def get_variants(self, design_id: Optional[str] = None) -> list[dict]:
+        """Get all active variants, optionally filtered by design."""
+        if design_id:
+            return await self.filter_rows(
+                self.SHEETS["variants"],
+                self.VARIANT_COLUMNS,
+                {"design_id": design_id, "status": "Active"}
+            )
+        return await self.filter_rows(
+            self.SHEETS["variants"],
+            self.VARIANT_COLUMNS,
+            {"status": "Active"}
+        )
+
+    async def get_variant(self, variant_id: str) -> Optional[dict]:
+        """Get a variant by ID."""
+        return await self.get_row_by_id(
+            self.SHEETS["variants"],
+            self.VARIANT_COLUMNS,
+            "variant_id",
+            variant_id
+        )
+
+    async def create_variant(self, data: dict) -> Optional[dict]:
+        """Create a new variant with cost calculations."""
+        variant_id = await self.get_next_id(self.SHEETS["variants"], "VAR")
+        now = datetime.now().isoformat()
+        
+        # Calculate costs
+        material = float(data.get("material_cost", 0) or 0)
+        making = float(data.get("making_cost", 0) or 0)
+        finishing = float(data.get("finishing_cost", 0) or 0)
+        packing = float(data.get("packing_cost", 0) or 0)
+        design = float(data.get("design_cost", 0) or 0)
+        
+        final_cost = material + making + finishing + packing + design
+        selling_price = float(data.get("selling_price", 0) or 0)
+        profit = selling_price - final_cost
+        profit_margin = (profit / selling_price * 100) if selling_price > 0 else 0
+        
+        variant = {
+            **data,
+            "variant_id": variant_id,
+            "material_cost": material,
+            "making_cost": making,
+            "finishing_cost": finishing,
+            "packing_cost": packing,
+            "design_cost": design,
+            "final_cost": final_cost,
+            "profit": profit,
+            "profit_margin": round(profit_margin, 2),
+            "status": "Active",
+            "created_at": now,
+            "updated_at": now,
+        }
+        
+        success = await self.append_row(
+            self.SHEETS["variants"],
+            self.VARIANT_COLUMNS,
+            variant
+        )
+        
+        return variant if success else None
+
+    async def update_variant(self, variant_id: str, data: dict) -> bool:
+        """Update an existing variant."""
+        # Recalculate if cost/price fields are present
+        current = await self.get_variant(variant_id)
+        if not current:
+            return False
+            
+        merged = {**current, **data}
+        
+        material = float(merged.get("material_cost", 0) or 0)
+        making = float(merged.get("making_cost", 0) or 0)
+        finishing = float(merged.get("finishing_cost", 0) or 0)
+        packing = float(merged.get("packing_cost", 0) or 0)
+        design = float(merged.get("design_cost", 0) or 0)
+        
+        final_cost = material + making + finishing + packing + design
+        selling_price = float(merged.get("selling_price", 0) or 0)
+        profit = selling_price - final_cost
+        profit_margin = (profit / selling_price * 100) if selling_price > 0 else 0
+        
+        data["final_cost"] = final_cost
+        data["profit"] = profit
+        data["profit_margin"] = round(profit_margin, 2)
+        
+        return await self.update_row(
+            self.SHEETS["variants"],
+            self.VARIANT_COLUMNS,
+            "variant_id",
+            variant_id,
+            data
+        )
+
+    async def delete_variant(self, variant_id: str) -> bool:
+        """Soft delete a variant."""
+        return await self.delete_row(
+            self.SHEETS["variants"],
+            self.VARIANT_COLUMNS,
+            "variant_id",
+            variant_id
+        )
+
+    # ============ Invoice Operations ============
+    
+    async def get_invoices(
+        self, invoice_type: Optional[str] = None, dealer_id: Optional[str] = None
+    ) -> list[dict]:
+        """Get all invoices with optional filtering."""
+        filters = {}
+        if invoice_type:
+            filters["invoice_type"] = invoice_type
+        if dealer_id:
+            filters["dealer_id"] = dealer_id
+        
+        return await self.filter_rows(
+            self.SHEETS["invoices"],
+            self.INVOICE_COLUMNS,
+            filters
+        )
+    
+    async def get_invoice(self, invoice_id: str) -> Optional[dict]:
+        """Get an invoice by ID with its items."""
+        invoice = await self.get_row_by_id(
+            self.SHEETS["invoices"],
+            self.INVOICE_COLUMNS,
+            "invoice_id",
+            invoice_id
+        )
+        
+        if invoice:
+            # Get invoice items
+            items = await self.filter_rows(
+                self.SHEETS["invoice_items"],
+                self.INVOICE_ITEM_COLUMNS,
+                {"invoice_id": invoice_id}
+            )
+            invoice = {**invoice, "items": items}  # Don't mutate the cached row
+        
+        return invoice
+    
+    async def create_invoice(self, data: dict, items: list[dict]) -> Optional[dict]:
+        """Create a new invoice with items."""
+        invoice_id = await self.get_next_id(self.SHEETS["invoices"], "INV")
+        now = datetime.now().isoformat()
+        
+        # Generate invoice number
+        invoice_type = data.get("invoice_type", "GEN")
+        type_prefix = {
+            "Material": "MAT",
+            "Making": "MKG",
+            "Finishing": "FIN",
+            "Packing": "PKG",
+            "Sales": "SAL",
+        }.get(invoice_type, "INV")
+        
+        year = datetime.now().year
+        invoice_number = f"{type_prefix}-{year}-{invoice_id.split('-')[1]}"
+        
+        # Calculate totals
+        sub_total = sum(item["quantity"] * item["unit_price"] for item in items)
+        tax_percent = float(data.get("tax_percent", 0) or 0)
+        discount_percent = float(data.get("discount_percent", 0) or 0)
+        
+        tax_amount = sub_total * (tax_percent / 100)
+        discount_amount = sub_total * (discount_percent / 100)
+        grand_total = sub_total + tax_amount - discount_amount
+        
+        invoice = {
+            **data,
+            "invoice_id": invoice_id,
+            "invoice_number": invoice_number,
+            "sub_total": sub_total,
+            "tax_amount": round(tax_amount, 2),
+            "discount_amount": round(discount_amount, 2),
+            "grand_total": round(grand_total, 2),
+            "amount_paid": 0,
+            "balance_due": round(grand_total, 2),
+            "payment_status": "Unpaid",
+            "created_at": now,
+            "updated_at": now,
+        }
+        
+        # Invoice and all its items are written together
+        async with self.batch() as batch:
+            success = await self.append_row(
+                self.SHEETS["invoices"],
+                self.INVOICE_COLUMNS,
+                invoice
+            )
+            
+            if not success:
+                return None
+            
+            # Create invoice items (one multi-row append)
+            items_data = [
+                {
+                    "item_id": f"ITM-{invoice_id.split('-')[1]}-{i+1:03d}",
+                    "invoice_id": invoice_id,
+                    "product_id": item.get("product_id"),
+                    "description": item.get("description"),
+                    "quantity": item.get("quantity"),
+                    "unit_price": item.get("unit_price"),
+                    "total_price": item.get("total_price"),
+                    "cost_type": item.get("cost_type"),
+                    "notes": item.get("notes"),
+                }
+                for i, item in enumerate(items)
+            ]
+            
+            await self.append_rows(
+                self.SHEETS["invoice_items"],
+                self.INVOICE_ITEM_COLUMNS,
+                items_data
+            )
+            
+        return None if batch.failed else invoice
+    
+    # ============ Workflow & Progress Operations ============
+    
+    async def get_workflow_stages(self) -> list[dict]:
+        """Get all workflow stages ordered by sequence."""
+        # stage_order is the sheet's id column, so it stays text; the order is computed once per load
+        return await self.get_sorted_rows(
+            self.SHEETS["workflow_stages"],
+            self.WORKFLOW_STAGE_COLUMNS,
+            "stage_order",
+        )
+        
+    async def get_product_progress(self, variant_id: str) -> list[dict]:
+        """Get progress history for a variant."""
+        return await self.filter_rows(
+            self.SHEETS["product_progress"],
+            self.PRODUCT_PROGRESS_COLUMNS,
+            {"variant_id": variant_id}
+        )
+    
+    async def get_current_stage(self, variant_id: str) -> Optional[dict]:
+        """Get the current active stage for a variant."""
+        history = await self.get_product_progress(variant_id)
+        # Find entry with status != Completed (Pending or InProgress)
+        for entry in history:
+            if entry.get("status") in ["Pending", "InProgress"]:
+                return entry
+        
+        # If all completed, return the last one (Delivered)
+        if history:
+            # Sort by date descending
+            history.sort(
+                key=lambda x: x.get("created_at", ""), 
+                reverse=True
+            )
+            return history[0]
+            
+        return None
+        
+    async def create_progress_entry(self, data: dict) -> Optional[dict]:
+        """Create a new progress entry."""
+        progress_id = await self.get_next_id(self.SHEETS["product_progress"], "PRG")
+        now = datetime.now().isoformat()
+        
+        entry = {
+            **data,
+            "progress_id": progress_id,
+            "created_at": now,
+            "updated_at": now,
+        }
+        
+        success = await self.append_row(
+            self.SHEETS["product_progress"],
+            self.PRODUCT_PROGRESS_COLUMNS,
+            entry
+        )
+        
+        return entry if success else None
+        
+    async def update_progress_entry(self, progress_id: str, data: dict) -> bool:
+        """Update a progress entry."""
+        return await self.update_row(
+            self.SHEETS["product_progress"],
+            self.PRODUCT_PROGRESS_COLUMNS,
+            "progress_id",
+            progress_id,
+            data
+        )
+        
+    # ============ Payment Operations ============
+    
+    async def get_payments(
+        self,
+        invoice_id: Optional[str] = None,
+        dealer_id: Optional[str] = None,
+        progress_id: Optional[str] = None
+    ) -> list[dict]:
+        """Get payments with optional filtering."""
+        filters = {}
+        if invoice_id:
+            filters["invoice_id"] = invoice_id
+        if dealer_id:
+            filters["dealer_id"] = dealer_id
+        if progress_id:
+            filters["progress_id"] = progress_id
+        
+        return await self.filter_rows(
+            self.SHEETS["payments"],
+            self.PAYMENT_COLUMNS,
+            filters
+        )
+        
+    async def create_payment(self, data: dict) -> Optional[dict]:
+        """Create a new payment."""
+        payment_id = await self.get_next_id(self.SHEETS["payments"], "PAY")
+        now = datetime.now().isoformat()
+        
+        entry = {
+            **data,
+            "payment_id": payment_id,
+            "created_at": now,
+            "updated_at": now,
+        }
+        
+        success = await self.append_row(
+            self.SHEETS["payments"],
+            self.PAYMENT_COLUMNS,
+            entry
+        )
+        
+        return entry if success else None
+        
+    async def record_payment(self, invoice_id: str, amount: float) -> bool:
+        """Deprecated: Use create_payment instead. This was for direct invoice updates."""
+        # Kept for backward compatibility if used elsewhere, but ideally logic moves to PaymentService
+        pass
+            
+
+    
+    async def _update_product_cost(
+        self,
+        product_id: str,
+        cost_type: str,
+        amount: float,
+        invoice_id: str,
+        dealer_id: str
+    ):
+        """Update a product's cost based on an invoice."""
+        product = await self.get_product(product_id)
+        if not product:
+            return
+        
+        # Map invoice type to cost field
+        cost_field_map = {
+            "Material": "material_cost",
+            "Making": "making_cost",
+            "Finishing": "finishing_cost",
+            "Packing": "packing_cost",
+        }
+        
+        cost_field = cost_field_map.get(cost_type)
+        if cost_field:
+            # Add to existing cost
+            current_cost = product.get(cost_field) or 0
+            new_cost = current_cost + amount
+            
+            await self.update_product(product_id, {cost_field: new_cost})
+        
+        # Also add to cost breakdown
+        breakdown_id = await self.get_next_id(self.SHEETS["cost_breakdown"], "CST")
+        now = datetime.now()
+        
+        breakdown = {
+            "breakdown_id": breakdown_id,
+            "product_id": product_id,
+            "cost_type": cost_type,
+            "invoice_id": invoice_id,
+            "dealer_id": dealer_id,
+            "amount": amount,
+            "date": now.strftime("%Y-%m-%d"),
+            "notes": "",
+            "created_at": now.isoformat(),
+        }
+        
+        await self.append_row(
+            self.SHEETS["cost_breakdown"],
+            self.COST_BREAKDOWN_COLUMNS,
+            breakdown
+        )
+    
+    async def record_payment(self, invoice_id: str, amount: float) -> bool:
+        """Record a payment against an invoice."""
+        invoice = await self.get_invoice(invoice_id)
+        if not invoice:
+            return False
+        
+        current_paid = invoice.get("amount_paid") or 0
+        grand_total = invoice.get("grand_total") or 0
+        
+        new_paid = current_paid + amount
+        balance_due = grand_total - new_paid
+        
+        if balance_due <= 0:
+            status = "Paid"
+            balance_due = 0
+        elif new_paid > 0:
+            status = "Partial"
+        else:
+            status = "Unpaid"
+        
+        return await self.update_row(
+            self.SHEETS["invoices"],
+            self.INVOICE_COLUMNS,
+            "invoice_id",
+            invoice_id,
+            {
+                "amount_paid": new_paid,
+                "balance_due": balance_due,
+                "payment_status": status,
+            }
+        )
+    
+    # ============ Cost Breakdown Operations ============
+    
+    async def get_cost_breakdown(self, product_id: str) -> list[dict]:
+        """Get all cost entries for a product."""
+        return await self.filter_rows(
+            self.SHEETS["cost_breakdown"],
+            self.COST_BREAKDOWN_COLUMNS,
+            {"product_id": product_id}
+        )
+    
+    # ============ Settings Operations ============
+    
+    async def get_settings(self) -> dict:
+        """Get all settings as a dictionary."""
+        rows = await self.get_all_rows(
+            self.SHEETS["settings"],
+            self.SETTINGS_COLUMNS
+        )
+        
+        return {row["setting_key"]: row["setting_value"] for row in rows if row.get("setting_key")}
+    
+    async def update_setting(self, key: str, value: str, category: str = "General") -> bool:
+        """Update or create a setting."""
+        settings = await self.get_all_rows(
+            self.SHEETS["settings"],
+            self.SETTINGS_COLUMNS
+        )
+        
+        # Check if setting exists
+        for setting in settings:
+            if setting.get("setting_key") == key:
+                return await self.update_row(
+                    self.SHEETS["settings"],
+                    self.SETTINGS_COLUMNS,
+                    "setting_key",
+                    key,
+                    {"setting_value": value, "category": category}
+                )
+        
+        # Create new setting
+        return await self.append_row(
+            self.SHEETS["settings"],
+            self.SETTINGS_COLUMNS,
+            {
+                "setting_key": key,
+                "setting_value": value,
+                "category": category,
+                "updated_at": datetime.now().isoformat(),
+            }
+        )
+    # ============ Plating Operations ============
+    
+    async def get_plating_rates(self) -> list[dict]:
+        """Get all plating rates."""
+        return await self.filter_rows(
+            self.SHEETS["plating_rates"],
+            self.PLATING_RATE_COLUMNS,
+            {"status": "Active"}
+        )
+    
+    async def create_plating_rate(self, data: dict) -> Optional[dict]:
+        """Create a new plating rate."""
+        rate_id = await self.get_next_id(self.SHEETS["plating_rates"], "RATE")
+        now = datetime.now().isoformat()
+        
+        rate = {
+            **data,
+            "rate_id": rate_id,
+            "status": "Active",
+            "created_at": now,
+            "updated_at": now,
+        }
+        
+        success = await self.append_row(
+            self.SHEETS["plating_rates"],
+            self.PLATING_RATE_COLUMNS,
+            rate
+        )
+        return rate if success else None
+        
+    async def update_plating_rate(self, rate_id: str, data: dict) -> bool:
+        """Update a plating rate."""
+        return await self.update_row(
+            self.SHEETS["plating_rates"],
+            self.PLATING_RATE_COLUMNS,
+            "rate_id",
+            rate_id,
+            data
+        )
+
+    async def get_plating_jobs(self, dealer_id: Optional[str] = None) -> list[dict]:
+        """Get plating jobs."""
+        if dealer_id:
+            return await self.filter_rows(
+                self.SHEETS["plating_jobs"],
+                self.PLATING_JOB_COLUMNS,
+                {"dealer_id": dealer_id}
+            )
+        return await self.get_all_rows(self.SHEETS["plating_jobs"], self.PLATING_JOB_COLUMNS)
+
+    async def create_plating_job(self, data: dict) -> Optional[dict]:
+        """Create a new plating job."""
+        job_id = await self.get_next_id(self.SHEETS["plating_jobs"], "JOB")
+        now = datetime.now().isoformat()
+        
+        job = {
+            **data,
+            "job_id": job_id,
+            "status": "Assigned",
+            "start_date": now,
+            "created_at": now,
+            "updated_at": now,
+        }
+        
+        success = await self.append_row(
+            self.SHEETS["plating_jobs"],
+            self.PLATING_JOB_COLUMNS,
+            job
+        )
+        return job if success else None
+
+    async def update_plating_job(self, job_id: str, data: dict) -> bool:
+        """Update a plating job."""
+        return await self.update_row(
+            self.SHEETS["plating_jobs"],
+            self.PLATING_JOB_COLUMNS,
+            "job_id",
+            job_id,
+            data
+        )
@@ -71,15 +71,12 @@ class WorkflowService:
     async def complete_stage(self, progress_id: str, data: ProgressUpdate) -> Optional[ProductProgress]:
         """Complete a stage and trigger the next one."""
         # Get current entry
-        all_rows = await self.sheets.get_all_rows(
+        current_entry = await self.sheets.get_row_by_id(
             self.sheets.SHEETS["product_progress"],
-            self.sheets.PRODUCT_PROGRESS_COLUMNS
+            self.sheets.PRODUCT_PROGRESS_COLUMNS,
+            "progress_id",
+            progress_id
         )
-        current_entry = None
-        for row in all_rows:
-            if row.get("progress_id") == progress_id:
-                current_entry = row
-                break
         
         if not current_entry:
             return None
@@ -0,0 +1,164 @@
+"""
+Benchmark script for the Google Sheets data layer.
+Runs common request paths against the in-process fake Google APIs
+and reports wall time and API calls per scenario.
+"""
+
+import sys
+import time
+import asyncio
+import argparse
+from pathlib import Path
+
+# Add backend directory to path
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from app.models.payment import PaymentCreate
+from app.services.cache_service import CacheService
+from app.services.fake_google import FakeGoogle
+from app.services.payment_service import PaymentService
+from app.services.rate_limiter import GoogleRateLimiter
+from app.services.sheets_service import SheetsService
+
+SPREADSHEET_ID = "fake-spreadsheet"
+
+
+async def run_scenario(fake: FakeGoogle, name: str, scenario) -> None:
+    """Run one scenario and print its wall time and API call counts."""
+    fake.reset_stats()
+    start = time.perf_counter()
+    try:
+        await scenario()
+        status = "ok"
+    except Exception as e:
+        status = f"failed: {e}"
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    calls = sum(fake.calls.values())
+    detail = ", ".join(f"{endpoint}={count}" for endpoint, count in sorted(fake.calls.items()))
+    print(f"{name:<32} {elapsed_ms:>9.1f} ms {calls:>5} calls  {detail}  [{status}]")
+    if fake.errors:
+        print(f"{'':<32} {fake.errors} injected errors")
+
+
+async def main(args: argparse.Namespace):
+    print("🚀 Benchmarking Google Sheets data layer against fake APIs...")
+    print(
+        f"   latency={args.latency}ms jitter={args.jitter}ms rows={args.rows} "
+        f"error_rate={args.error_rate} concurrency={args.concurrency}"
+    )
+
+    fake = FakeGoogle(
+        latency_ms=args.latency,
+        jitter_ms=args.jitter,
+        error_rate=args.error_rate,
+        quota_per_minute=args.quota,
+        seed=args.seed,
+    )
+    fake.seed_dataset(SPREADSHEET_ID, rows=args.rows)
+
+    sheets = SheetsService(
+        "",
+        SPREADSHEET_ID,
+        cache_service=CacheService(),
+        max_concurrency=args.concurrency,
+        fake_google=fake,
+        rate_limiter=GoogleRateLimiter(
+            sheets_reads_per_minute=args.reads_per_minute,
+            sheets_writes_per_minute=args.writes_per_minute,
+            drive_per_minute=0,
+            max_retries=args.max_retries,
+        ),
+    )
+    payments = PaymentService(sheets)
+
+    dealers = [f"DLR-{i:05d}" for i in range(1, min(args.rows, args.concurrency) + 1)]
+    invoice_ids: list[str] = []
+
+    async def cold_load():
+        await sheets.load_all()
+
+    async def cached_reads():
+        await asyncio.gather(*(sheets.get_dealer(dealer_id) for dealer_id in dealers))
+        await asyncio.gather(*(sheets.get_invoices() for _ in range(args.concurrency)))
+
+    async def revalidate_unchanged():
+        sheets.cache.clear()
+        sheets._version_checked = 0
+        await sheets.get_invoices()
+
+    async def create_invoice():
+        items = [
+            {"product_id": f"VAR-{i:05d}", "quantity": 1, "unit_price": 100}
+            for i in range(1, 21)
+        ]
+        invoice = await sheets.create_invoice(
+            {"invoice_type": "Sales", "dealer_id": dealers[0], "invoice_date": "2024-01-01"},
+            items,
+        )
+        invoice_ids.append(invoice["invoice_id"])
+
+    async def create_payment():
+        await payments.create_payment(
+            PaymentCreate(
+                payment_type="IN",
+                related_to="INVOICE",
+                invoice_id=invoice_ids[0] if invoice_ids else None,
+                dealer_id=dealers[0],
+                amount=500,
+                payment_mode="Cash",
+                payment_date="2024-01-01",
+            )
+        )
+
+    async def concurrent_updates():
+        await asyncio.gather(*(
+            sheets.update_dealer(dealer_id, {"notes": "benchmark"})
+            for dealer_id in dealers
+        ))
+
+    async def external_edit_reload():
+        fake.edit(SPREADSHEET_ID, "Invoices!Q2", [["edited by hand"]])
+        sheets.cache.clear()
+        sheets._version_checked = 0
+        await sheets.get_invoices()
+
+    print()
+    await run_scenario(fake, "cold load_all", cold_load)
+    await run_scenario(fake, "concurrent cached reads", cached_reads)
+    await run_scenario(fake, "expired, version unchanged", revalidate_unchanged)
+    await run_scenario(fake, "create_invoice (20 items)", create_invoice)
+    await run_scenario(fake, "create_payment", create_payment)
+    await run_scenario(fake, f"update_dealer x{len(dealers)}", concurrent_updates)
+    await run_scenario(fake, "expired, edited externally", external_edit_reload)
+
+    limiter = sheets.rate_limiter.stats()
+    print()
+    for name, quota in limiter["quotas"].items():
+        print(
+            f"{name:<32} {quota['delayed']} delayed ({quota['wait_seconds']} s), "
+            f"{quota['throttled']} throttled, {quota['retries']} retries"
+        )
+    print(f"{'failed after retries':<32} {limiter['failures']}")
+
+    sheets.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency", type=float, default=80, help="Base latency per API call in ms")
+    parser.add_argument("--jitter", type=float, default=20, help="Random latency added or removed in ms")
+    parser.add_argument("--rows", type=int, default=500, help="Rows seeded into each sheet")
+    parser.add_argument("--error-rate", type=float, default=0, help="Fraction of calls answered with HTTP 429")
+    parser.add_argument("--quota", type=int, default=0, help="Calls allowed per minute (0 = unlimited)")
+    parser.add_argument("--reads-per-minute", type=int, default=0, help="Client-side Sheets read limit (0 = unlimited)")
+    parser.add_argument("--writes-per-minute", type=int, default=0, help="Client-side Sheets write limit (0 = unlimited)")
+    parser.add_argument("--max-retries", type=int, default=5, help="Retries per call on 429/5xx")
+    parser.add_argument("--concurrency", type=int, default=8, help="Parallel Google API calls")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for data and jitter")
+
+    try:
+        asyncio.run(main(parser.parse_args()))
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
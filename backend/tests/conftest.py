@@ -0,0 +1,36 @@
+"""
+Shared fixtures: storage services backed by the in-process fake Google APIs.
+Coroutines are driven with asyncio.run, so no async pytest plugin is needed.
+"""
+
+import pytest
+
+from app.services.cache_service import CacheService
+from app.services.fake_google import FakeGoogle
+from app.services.sheets_service import SheetsService
+
+SPREADSHEET_ID = "test-spreadsheet"
+
+
+@pytest.fixture
+def fake() -> FakeGoogle:
+    """A fake spreadsheet seeded with 20 rows per sheet."""
+    google = FakeGoogle(seed=0)
+    google.seed_dataset(SPREADSHEET_ID, rows=20)
+    return google
+
+
+@pytest.fixture
+def make_sheets(fake):
+    """Factory for SheetsService instances on the fake spreadsheet (closed after the test)."""
+    created = []
+    
+    def make(cache=True, **kwargs) -> SheetsService:
+        cache_service = CacheService() if cache is True else (cache or None)
+        sheets = SheetsService("", SPREADSHEET_ID, cache_service=cache_service, fake_google=fake, **kwargs)
+        created.append(sheets)
+        return sheets
+    
+    yield make
+    for sheets in created:
+        sheets.close()
@@ -0,0 +1,52 @@
+"""Application startup and shutdown with each storage backend."""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import dependencies
+from app.config import get_settings
+
+
+@pytest.fixture
+def configured(monkeypatch, tmp_path):
+    """Apply settings from environment variables, with fresh service instances."""
+    def configure(**env):
+        monkeypatch.setenv("GOOGLE_API_FAKE", "true")
+        monkeypatch.setenv("PREFETCH_SHEETS_ON_STARTUP", "false")
+        monkeypatch.setenv("SHEETS_SNAPSHOT_ENABLED", "false")
+        monkeypatch.setenv("SQLITE_PATH", str(tmp_path / "app.sqlite3"))
+        for name, value in env.items():
+            monkeypatch.setenv(name, value)
+        clear()
+    
+    def clear():
+        get_settings.cache_clear()
+        for name in dir(dependencies):
+            getter = getattr(dependencies, name)
+            if name.startswith("get_") and hasattr(getter, "cache_clear"):
+                getter.cache_clear()
+    
+    yield configure
+    clear()
+
+
+@pytest.mark.parametrize("backend", ["sheets", "sqlite"])
+def test_startup_and_shutdown(configured, backend):
+    configured(STORAGE_BACKEND=backend)
+    from app.main import app
+    
+    with TestClient(app) as client:
+        assert client.get("/api/health").status_code == 200
+        assert client.get("/api/cache/stats").status_code == 200
+
+
+def test_shutdown_closes_drive_service(configured, monkeypatch):
+    configured(STORAGE_BACKEND="sheets")
+    from app.main import app
+    
+    closed = []
+    drive = dependencies.get_drive_service()
+    monkeypatch.setattr(drive, "close", lambda: closed.append(drive))
+    with TestClient(app):
+        pass
+    assert closed == [drive]
@@ -0,0 +1,249 @@
+"""CacheService: single-flight loads, stale-while-revalidate and byte budgets."""
+
+import asyncio
+
+import pytest
+
+from app.services.cache_service import CacheService
+from tests.conftest import SPREADSHEET_ID
+
+
+class Loader:
+    """Counts calls and returns `value` once released."""
+
+    def __init__(self, value="loaded", error=None):
+        self.value = value
+        self.error = error
+        self.calls = 0
+        self.started = asyncio.Event()
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        self.started.set()
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+def test_concurrent_misses_share_one_load():
+    cache = CacheService()
+
+    async def scenario():
+        loader = Loader()
+        waiters = [asyncio.ensure_future(cache.get_or_load("Dealers", "table", loader)) for _ in range(10)]
+        await loader.started.wait()
+        loader.release.set()
+        results = await asyncio.gather(*waiters)
+        return loader.calls, results
+
+    calls, results = asyncio.run(scenario())
+    assert calls == 1
+    assert results == ["loaded"] * 10
+    stats = cache.get_stats()["namespaces"]["Dealers"]
+    assert (stats["loads"], stats["coalesced_waits"]) == (1, 9)
+    assert cache.peek("Dealers", "table") == "loaded"
+
+
+def test_failed_load_is_shared_but_not_cached():
+    cache = CacheService()
+
+    async def scenario():
+        loader = Loader(error=RuntimeError("quota"))
+        waiters = [asyncio.ensure_future(cache.get_or_load("Dealers", "table", loader)) for _ in range(3)]
+        await loader.started.wait()
+        loader.release.set()
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert loader.calls == 1
+
+        retry = Loader("second try")
+        retry.release.set()
+        return await cache.get_or_load("Dealers", "table", retry)
+
+    assert asyncio.run(scenario()) == "second try"
+
+
+def test_cancelling_one_waiter_keeps_the_load_for_the_others():
+    cache = CacheService()
+
+    async def scenario():
+        loader = Loader()
+        first = asyncio.ensure_future(cache.single_flight("Dealers", "table", loader))
+        second = asyncio.ensure_future(cache.single_flight("Dealers", "table", loader))
+        await loader.started.wait()
+        first.cancel()
+        loader.release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(scenario()) == "loaded"
+
+
+def test_load_finishing_after_invalidation_is_not_stored():
+    cache = CacheService()
+
+    async def scenario():
+        loader = Loader("before the write")
+        waiting = asyncio.ensure_future(cache.get_or_load("Dealers", "table", loader))
+        await loader.started.wait()
+        cache.delete("Dealers")
+        loader.release.set()
+        assert await waiting == "before the write"
+
+        # Later callers don't join the outdated load
+        fresh = Loader("after the write")
+        fresh.release.set()
+        return await cache.get_or_load("Dealers", "table", fresh)
+
+    assert asyncio.run(scenario()) == "after the write"
+    assert cache.peek("Dealers", "table") == "after the write"
+
+
+def test_concurrent_sheet_reads_download_once(fake, make_sheets):
+    sheets = make_sheets()
+
+    async def scenario():
+        return await asyncio.gather(*(sheets.get_dealer(f"DLR-{i:05d}") for i in range(1, 9)))
+
+    dealers = asyncio.run(scenario())
+    assert [dealer["dealer_id"] for dealer in dealers] == [f"DLR-{i:05d}" for i in range(1, 9)]
+    assert fake.calls["values.get"] == 1
+
+
+def test_stale_entry_served_while_refreshed_in_background():
+    cache = CacheService(default_ttl=60, soft_ttl=0)
+
+    async def scenario():
+        cache.set("Dealers", "table", "old")
+        loader = Loader("new")
+        assert await cache.get_or_load("Dealers", "table", loader) == "old"
+        await loader.started.wait()
+        # A second stale read doesn't start another refresh
+        assert await cache.get_or_load("Dealers", "table", loader) == "old"
+        loader.release.set()
+        await asyncio.sleep(0.01)
+        return loader.calls
+
+    assert asyncio.run(scenario()) == 1
+    assert cache.peek("Dealers", "table") == "new"
+    stats = cache.get_stats()
+    assert (stats["stale_served"], stats["background_refreshes"]) == (2, 1)
+
+
+def test_failed_refresh_keeps_serving_stale_entry(capsys):
+    cache = CacheService(default_ttl=60, soft_ttl=0)
+
+    async def scenario():
+        cache.set("Dealers", "table", "old")
+        loader = Loader(error=RuntimeError("quota"))
+        loader.release.set()
+        assert await cache.get_or_load("Dealers", "table", loader) == "old"
+        await asyncio.sleep(0.01)
+        return cache.lookup("Dealers", "table")
+
+    assert asyncio.run(scenario()) == ("old", True)
+    assert "Background refresh of Dealers:table failed: quota" in capsys.readouterr().out
+
+
+def test_entry_past_hard_ttl_is_reloaded():
+    cache = CacheService(default_ttl=0.05, soft_ttl=0)
+
+    async def scenario():
+        cache.set("Dealers", "table", "old")
+        await asyncio.sleep(0.1)
+        loader = Loader("new")
+        loader.release.set()
+        return await cache.get_or_load("Dealers", "table", loader)
+
+    assert asyncio.run(scenario()) == "new"
+
+
+def test_stale_sheet_served_from_cache(fake, make_sheets):
+    sheets = make_sheets(cache=CacheService(default_ttl=60, soft_ttl=0), version_check_interval=0)
+
+    async def scenario():
+        await sheets.get_dealer("DLR-00001")
+        fake.reset_stats()
+        fake.edit(SPREADSHEET_ID, "Dealers!E2", [["Renamed"]])
+        stale = await sheets.get_dealer("DLR-00001")
+        assert sum(fake.calls.values()) == 0  # answered before any call
+        await asyncio.sleep(0.05)
+        return stale, await sheets.get_dealer("DLR-00001")
+
+    stale, refreshed = asyncio.run(scenario())
+    assert stale["name"] != "Renamed"
+    assert refreshed["name"] == "Renamed"
+
+
+def test_value_larger_than_namespace_budget_is_rejected(capsys):
+    cache = CacheService(namespace_max_bytes=1024)
+    assert not cache.set("Dealers", "table", "x" * 4096)
+    assert not cache.set("Dealers", "table", "x" * 4096)
+    assert cache.peek("Dealers", "table") is None
+    assert cache.get_stats()["rejected"] == 2
+    assert capsys.readouterr().out.count("Not caching Dealers:table") == 1
+
+
+def test_replace_remeasures_entry():
+    cache = CacheService(namespace_max_bytes=64 * 1024)
+    rows = ["r" * 100]
+    cache.set("Dealers", "table", rows)
+    small = cache.get_stats()["namespaces"]["Dealers"]["bytes"]
+
+    rows.extend(["r" * 100] * 50)  # grown in place by a write
+    assert cache.replace("Dealers", "table", rows)
+    assert cache.get_stats()["namespaces"]["Dealers"]["bytes"] > small
+
+    rows.extend(["r" * 100] * 1000)  # now over the namespace budget
+    assert not cache.replace("Dealers", "table", rows)
+    assert cache.peek("Dealers", "table") is None
+
+
+def test_sheet_over_budget_is_not_retained(fake, make_sheets):
+    sheets = make_sheets(cache=CacheService(policies={"Dealers": {"max_bytes": 1024}}))
+
+    async def scenario():
+        await sheets.get_dealer("DLR-00001")
+        assert "Dealers" not in sheets._tables
+        fake.reset_stats()
+        await sheets.get_dealer("DLR-00002")
+
+    asyncio.run(scenario())
+    assert fake.calls["values.get"] == 1  # downloaded again rather than served outside the budget
+
+
+def test_table_outgrowing_budget_through_writes_is_released(make_sheets):
+    measured = make_sheets(cache=False)
+    asyncio.run(measured.get_dealer("DLR-00001"))
+    budget = measured._tables["Dealers"].approximate_size() + 1024
+    sheets = make_sheets(cache=CacheService(policies={"Dealers": {"max_bytes": budget}}))
+
+    async def scenario():
+        await sheets.get_dealer("DLR-00001")
+        assert sheets.cache.peek("Dealers", sheets.TABLE) is not None
+        for i in range(20):
+            await sheets.create_dealer({"name": f"Dealer {i}"})
+
+    asyncio.run(scenario())
+    assert sheets.cache.peek("Dealers", sheets.TABLE) is None
+    assert "Dealers" not in sheets._tables
+
+
+def test_global_ceiling_evicts_lowest_priority_first():
+    evicted = []
+    cache = CacheService(
+        max_bytes=3000,
+        policies={"WorkflowStages": {"priority": 2}, "InvoiceItems": {"priority": 0}},
+    )
+    cache.add_eviction_listener(lambda namespace, key: evicted.append(namespace))
+    cache.set("WorkflowStages", "table", "s" * 1000)
+    cache.set("InvoiceItems", "table", "i" * 1000)
+    cache.set("Dealers", "table", "d" * 1000)
+
+    assert evicted == ["InvoiceItems"]
+    assert cache.peek("InvoiceItems", "table") is None
+    assert cache.peek("WorkflowStages", "table") is not None
+    assert cache.peek("Dealers", "table") is not None
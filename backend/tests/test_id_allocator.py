@@ -0,0 +1,77 @@
+"""IdAllocator: sequential IDs from in-memory counters."""
+
+import asyncio
+
+from app.services.id_allocator import IdAllocator
+
+
+def test_concurrent_allocations_never_share_an_id():
+    allocator = IdAllocator()
+    
+    async def seed() -> int:
+        await asyncio.sleep(0.01)
+        return 41
+    
+    async def scenario():
+        return await asyncio.gather(*(allocator.allocate("Dealers", "DLR", 3, seed) for _ in range(10)))
+    
+    ids = [id_value for batch in asyncio.run(scenario()) for id_value in batch]
+    assert len(set(ids)) == 30
+    assert min(ids) == "DLR-00042" and max(ids) == "DLR-00071"
+
+
+def test_seeding_one_sheet_does_not_block_others():
+    allocator = IdAllocator()
+    
+    async def scenario():
+        release = asyncio.Event()
+        
+        async def slow_seed() -> int:
+            await release.wait()  # e.g. a slow sheet download
+            return 0
+        
+        async def fast_seed() -> int:
+            return 7
+        
+        slow = asyncio.create_task(allocator.allocate("Invoices", "INV", 1, slow_seed))
+        await asyncio.sleep(0)
+        fast = await asyncio.wait_for(allocator.allocate("Dealers", "DLR", 1, fast_seed), timeout=1)
+        assert not slow.done()
+        release.set()
+        return fast, await slow
+    
+    fast, slow = asyncio.run(scenario())
+    assert fast == ["DLR-00008"]
+    assert slow == ["INV-00001"]
+
+
+def test_observe_advances_past_ids_added_by_hand():
+    allocator = IdAllocator()
+    
+    async def seed() -> int:
+        return 5
+    
+    async def scenario():
+        await allocator.allocate("Dealers", "DLR", 1, seed)
+        allocator.observe("Dealers", ["DLR-00020", "DLR-00003"])
+        return await allocator.allocate("Dealers", "DLR", 1, seed)
+    
+    assert asyncio.run(scenario()) == ["DLR-00021"]
+
+
+def test_reserved_blocks_do_not_overlap_across_workers(tmp_path):
+    state = tmp_path / "ids.json"
+    workers = [IdAllocator(mode="reserved", block_size=5, state_path=state) for _ in range(2)]
+    
+    async def seed() -> int:
+        return 0
+    
+    async def scenario():
+        ids = []
+        for _ in range(4):
+            for allocator in workers:
+                ids += await allocator.allocate("Payments", "PAY", 3, seed)
+        return ids
+    
+    ids = asyncio.run(scenario())
+    assert len(ids) == len(set(ids)) == 24
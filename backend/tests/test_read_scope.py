@@ -0,0 +1,111 @@
+"""Per-request read scopes: one load per sheet, read-your-writes and isolation from other requests."""
+
+import asyncio
+
+
+def test_each_sheet_loaded_once_per_scope(make_sheets):
+    sheets = make_sheets(cache=False)
+
+    async def scenario():
+        async with sheets.read_scope() as scope:
+            await sheets.get_dealer("DLR-00001")
+            await sheets.get_dealer("DLR-00002")
+            await sheets.get_all_rows("Dealers", sheets.SHEET_COLUMNS["Dealers"])
+            return scope.loads, scope.reuses
+
+    assert asyncio.run(scenario()) == (1, 2)
+
+
+def test_scope_reads_its_own_writes_without_cache(make_sheets):
+    sheets = make_sheets(cache=False)
+
+    async def scenario():
+        async with sheets.read_scope():
+            await sheets.get_dealer("DLR-00004")
+            assert await sheets.update_dealer("DLR-00004", {"notes": "written"})
+            return await sheets.get_dealer("DLR-00004")
+
+    assert asyncio.run(scenario())["notes"] == "written"
+
+
+def test_other_requests_writes_stay_out_of_scope(make_sheets):
+    sheets = make_sheets()
+
+    async def scenario():
+        read, written = asyncio.Event(), asyncio.Event()
+
+        async def reader():
+            async with sheets.read_scope():
+                before = await sheets.get_dealer("DLR-00003")
+                rows = await sheets.get_all_rows("Dealers", sheets.SHEET_COLUMNS["Dealers"])
+                read.set()
+                await written.wait()
+                after = await sheets.get_dealer("DLR-00003")
+                return before, after, rows
+
+        async def writer():
+            await read.wait()
+            async with sheets.read_scope():
+                assert await sheets.update_dealer("DLR-00003", {"notes": "other request"})
+                assert (await sheets.get_dealer("DLR-00003"))["notes"] == "other request"
+            written.set()
+
+        (before, after, rows), _ = await asyncio.gather(reader(), writer())
+        return before, after, rows, await sheets.get_dealer("DLR-00003")
+
+    before, after, rows, latest = asyncio.run(scenario())
+    assert after["notes"] == before["notes"] != "other request"
+    assert [row for row in rows if row["dealer_id"] == "DLR-00003"] == [before]
+    # The write reached the cache for everyone else
+    assert latest["notes"] == "other request"
+
+
+def test_tables_are_patched_in_place_when_no_other_scope_holds_them(make_sheets):
+    sheets = make_sheets()
+
+    async def scenario():
+        async with sheets.read_scope() as scope:
+            await sheets.get_dealer("DLR-00005")
+        table = sheets.cache.peek("Dealers", sheets.TABLE)
+        assert await sheets.update_dealer("DLR-00005", {"notes": "patched"})
+        return scope, table
+
+    scope, table = asyncio.run(scenario())
+    assert not scope.active
+    assert sheets.cache.peek("Dealers", sheets.TABLE) is table
+    assert table.get("DLR-00005")["notes"] == "patched"
+
+
+def test_writers_patch_in_place_while_other_scopes_hold_the_table(make_sheets):
+    sheets = make_sheets()
+
+    async def scenario():
+        read, written = asyncio.Event(), asyncio.Event()
+
+        async def reader():
+            async with sheets.read_scope() as scope:
+                before = await sheets.get_dealer("DLR-00006")
+                read.set()
+                await written.wait()
+                after = await sheets.get_dealer("DLR-00006")
+                await sheets.get_dealer("DLR-00007")
+                return scope, before, after
+
+        async def writer():
+            await read.wait()
+            table = sheets.cache.peek("Dealers", sheets.TABLE)
+            for i in range(5):
+                async with sheets.read_scope():
+                    assert await sheets.update_dealer("DLR-00006", {"notes": f"write {i}"})
+            assert sheets.cache.peek("Dealers", sheets.TABLE) is table  # never copied
+            written.set()
+            return table
+
+        (scope, before, after), table = await asyncio.gather(reader(), writer())
+        return scope, before, after, table
+
+    scope, before, after, table = asyncio.run(scenario())
+    assert after["notes"] == before["notes"]
+    assert scope.snapshots == 1  # one copy, made by the reader on its first read after the writes
+    assert table.get("DLR-00006")["notes"] == "write 4"
+    assert table._history == [] and table._pins == {}  # released once the reader finished
@@ -0,0 +1,94 @@
+"""Revalidating expired sheets against the Drive version, and explicit refreshes."""
+
+import asyncio
+
+from app.routers import cache as cache_router
+from app.services.cache_service import CacheService
+from tests.conftest import SPREADSHEET_ID
+
+
+def test_expired_unchanged_sheet_costs_one_version_check(fake, make_sheets):
+    sheets = make_sheets()
+    
+    async def scenario():
+        await sheets.get_dealers()
+        sheets.cache.clear()
+        sheets._version_checked = 0
+        fake.reset_stats()
+        return await sheets.get_dealers()
+    
+    assert len(asyncio.run(scenario())) == 20
+    assert dict(fake.calls) == {"files.get": 1}
+
+
+def test_refresh_bypasses_retained_copy_and_version_throttle(fake, make_sheets, monkeypatch):
+    sheets = make_sheets()
+    monkeypatch.setattr(cache_router, "get_cache_service", lambda: sheets.cache)
+    monkeypatch.setattr(cache_router, "get_sheets_service", lambda: sheets)
+    
+    async def scenario():
+        await sheets.get_dealers()
+        fake.edit(SPREADSHEET_ID, "Dealers!E2", [["Edited by hand"]])
+        # Within the version-check interval the retained table would be served again
+        await cache_router.refresh_cache()
+        return await sheets.get_dealer("DLR-00001")
+    
+    assert asyncio.run(scenario())["name"] == "Edited by hand"
+
+
+def test_clear_one_sheet_reloads_it(fake, make_sheets, monkeypatch):
+    sheets = make_sheets()
+    monkeypatch.setattr(cache_router, "get_cache_service", lambda: sheets.cache)
+    monkeypatch.setattr(cache_router, "get_sheets_service", lambda: sheets)
+    
+    async def scenario():
+        await sheets.get_dealers()
+        fake.edit(SPREADSHEET_ID, "Dealers!E2", [["Edited by hand"]])
+        await cache_router.clear_sheet_cache("Dealers")
+        return await sheets.get_dealer("DLR-00001")
+    
+    assert asyncio.run(scenario())["name"] == "Edited by hand"
+
+
+def ledger_rows(sheets, sheet_name: str) -> list[dict]:
+    return sheets.get_all_rows(sheet_name, sheets.SHEET_COLUMNS[sheet_name])
+
+
+def test_hand_edits_to_ledger_rows_seen_after_expiry(fake, make_sheets):
+    sheets = make_sheets(cache=CacheService(default_ttl=0.05), version_check_interval=0)
+    
+    async def scenario():
+        await sheets.load_all()
+        fake.edit(SPREADSHEET_ID, "InvoiceItems!E2", [[777]])
+        fake.edit(SPREADSHEET_ID, "Payments!G2", [[12345]])
+        await asyncio.sleep(0.1)
+        return (await ledger_rows(sheets, "InvoiceItems"))[0], (await ledger_rows(sheets, "Payments"))[0]
+    
+    item, payment = asyncio.run(scenario())
+    assert item["quantity"] == 777
+    assert payment["amount"] == 12345
+
+
+def test_append_only_sheets_downloaded_in_full_periodically(fake, make_sheets):
+    sheets = make_sheets(
+        cache=CacheService(default_ttl=0.05), version_check_interval=0,
+        append_only_sheets=["Payments"], tail_refresh_full_every=1,
+    )
+    
+    async def expire_and_read():
+        await asyncio.sleep(0.1)
+        return await ledger_rows(sheets, "Payments")
+    
+    async def scenario():
+        await sheets.load_all()
+        fake.edit(SPREADSHEET_ID, "Payments!G2", [[12345]])
+        fake.edit(SPREADSHEET_ID, "Payments!A22", [["PAY-HAND"]])
+        fake.reset_stats()
+        tail = await expire_and_read()
+        assert fake.calls["values.get"] == 0  # only the new rows were read
+        return tail, await expire_and_read()
+    
+    tail, full = asyncio.run(scenario())
+    assert tail[-1]["payment_id"] == "PAY-HAND"
+    assert tail[0]["amount"] != 12345  # the tail path can't see edits to loaded rows...
+    assert full[0]["amount"] == 12345  # ...the next full download does
@@ -0,0 +1,80 @@
+"""Row-number index used to address updates (id -> sheet row)."""
+
+import asyncio
+
+from tests.conftest import SPREADSHEET_ID
+
+
+def dealer_rows(fake) -> list[list]:
+    return fake._sheet(SPREADSHEET_ID, "Dealers")
+
+
+def test_update_uses_indexed_row(fake, make_sheets):
+    sheets = make_sheets()
+    
+    async def scenario():
+        await sheets.load_all()
+        fake.reset_stats()
+        assert await sheets.update_dealer("DLR-00005", {"notes": "indexed"})
+    
+    asyncio.run(scenario())
+    assert dealer_rows(fake)[5][0] == "DLR-00005"
+    assert "indexed" in dealer_rows(fake)[5]
+    # The spreadsheet hasn't changed since the index was built: just the write
+    assert fake.calls["values.batchGet"] == 0
+    assert fake.calls["values.update"] == 1
+
+
+def test_index_checked_once_the_spreadsheet_changed(fake, make_sheets):
+    sheets = make_sheets(version_check_interval=0)
+    
+    async def scenario():
+        await sheets.load_all()
+        fake.edit(SPREADSHEET_ID, "Invoices!B2", [["edited elsewhere"]])
+        fake.reset_stats()
+        assert await sheets.update_dealer("DLR-00005", {"notes": "checked"})
+    
+    asyncio.run(scenario())
+    assert "checked" in dealer_rows(fake)[5]
+    # One id-cell check and the write; no column A scan
+    assert fake.calls["values.batchGet"] == 1
+    assert fake.calls["values.update"] == 1
+
+
+def test_update_after_row_inserted_by_hand(fake, make_sheets):
+    sheets = make_sheets(version_check_interval=0)
+    
+    async def scenario():
+        await sheets.load_all()
+        # Someone inserts a row above DLR-00005 in the sheet UI; the cached index is now off by one
+        fake.insert_rows(SPREADSHEET_ID, "Dealers", 3, [["DLR-HAND", "HAND"]])
+        assert await sheets.update_dealer("DLR-00005", {"notes": "moved"})
+    
+    asyncio.run(scenario())
+    rows = {row[0]: row for row in dealer_rows(fake)[1:]}
+    assert len(rows) == 21  # the 20 seeded dealers and the hand-inserted row
+    assert "moved" in rows["DLR-00005"]
+    assert "moved" not in rows["DLR-00004"]
+    assert rows["DLR-00004"][4] != rows["DLR-00005"][4]  # names differ: DLR-00004 wasn't overwritten
+    assert dealer_rows(fake)[6][0] == "DLR-00005"
+
+
+def test_batch_update_after_rows_sorted_by_hand(fake, make_sheets):
+    sheets = make_sheets(version_check_interval=0)
+    
+    async def scenario():
+        await sheets.load_all()
+        rows = dealer_rows(fake)
+        rows[1:] = list(reversed(rows[1:]))  # sorted descending by hand
+        fake._touch(SPREADSHEET_ID)  # which changes the Drive version
+        async with sheets.batch() as batch:
+            await sheets.update_dealer("DLR-00002", {"notes": "two"})
+            await sheets.update_dealer("DLR-00007", {"notes": "seven"})
+        assert batch.committed
+    
+    asyncio.run(scenario())
+    rows = {row[0]: row for row in dealer_rows(fake)[1:]}
+    assert len(rows) == 20  # no record was overwritten by another
+    assert "two" in rows["DLR-00002"] and "seven" in rows["DLR-00007"]
+    assert sum("two" in row for row in rows.values()) == 1
+    assert sum("seven" in row for row in rows.values()) == 1
@@ -0,0 +1,143 @@
+"""Cache tier shared by workers: serving, invalidation and background serialization."""
+
+import asyncio
+import threading
+
+import pytest
+
+from app.services import cache_service
+from app.services.cache_service import CacheService
+from app.services.shared_cache import SqliteSharedCache
+
+
+@pytest.fixture
+def shared_path(tmp_path):
+    return tmp_path / "shared_cache.sqlite3"
+
+
+@pytest.fixture
+def make_cache(shared_path):
+    """Factory for cache services of separate "workers" on one shared file (closed after the test)."""
+    created = []
+
+    def make() -> CacheService:
+        # Invalidations are polled explicitly in the tests
+        cache = CacheService(shared=SqliteSharedCache(shared_path), shared_poll_interval=60)
+        created.append(cache)
+        return cache
+
+    yield make
+    for cache in created:
+        cache.close()
+
+
+@pytest.fixture
+def encodes(monkeypatch):
+    """Record the thread of every value pickled for the shared tier."""
+    threads = []
+    encode = cache_service._encode
+
+    def recording(data):
+        threads.append(threading.current_thread())
+        return encode(data)
+
+    monkeypatch.setattr(cache_service, "_encode", recording)
+    return threads
+
+
+def read_dealers(sheets):
+    return sheets.get_all_rows("Dealers", sheets.SHEET_COLUMNS["Dealers"])
+
+
+def test_second_worker_served_from_shared_tier(fake, make_sheets, make_cache, encodes):
+    first, second = make_sheets(cache=make_cache()), make_sheets(cache=make_cache())
+
+    async def scenario():
+        loaded = await read_dealers(first)
+        await first.cache.flush()
+        fake.reset_stats()
+        return loaded, await read_dealers(second)
+
+    loaded, served = asyncio.run(scenario())
+    assert served == loaded
+    assert sum(fake.calls.values()) == 0
+    assert second.cache.get_stats()["namespaces"]["Dealers"]["shared_hits"] == 1
+    # Pickled in the shared tier's worker thread, not on the event loop
+    assert encodes and threading.main_thread() not in encodes
+
+
+def test_write_through_publishes_invalidation_only(fake, make_sheets, make_cache, encodes):
+    first, second = make_sheets(cache=make_cache()), make_sheets(cache=make_cache())
+
+    async def scenario():
+        await read_dealers(first)
+        await first.cache.flush()
+        await read_dealers(second)
+        pickled = len(encodes)
+
+        assert await first.update_dealer("DLR-00003", {"notes": "from first"})
+        await first.cache.flush()
+        assert len(encodes) == pickled  # the patched table isn't serialized again
+        assert first.cache.shared.get("Dealers", first.TABLE) is None
+
+        await second.cache.poll_shared()
+        return await second.get_dealer("DLR-00003")
+
+    dealer = asyncio.run(scenario())
+    assert dealer["notes"] == "from first"
+
+
+def test_delete_and_clear_reach_other_workers(make_cache):
+    first, second = make_cache(), make_cache()
+
+    async def scenario():
+        first.set("Dealers", "table", ["a"])
+        first.set("Invoices", "table", ["b"])
+        await first.flush()
+        assert await second.get_or_load("Dealers", "table", lambda: asyncio.sleep(0, ["loaded"])) == ["a"]
+        assert await second.get_or_load("Invoices", "table", lambda: asyncio.sleep(0, ["loaded"])) == ["b"]
+
+        first.delete("Dealers")
+        await first.flush()
+        await second.poll_shared()
+        assert second.peek("Dealers", "table") is None
+        assert second.peek("Invoices", "table") == ["b"]
+
+        first.clear()
+        await first.flush()
+        await second.poll_shared()
+        assert second.peek("Invoices", "table") is None
+        assert first.shared.get("Invoices", "table") is None
+
+    asyncio.run(scenario())
+
+
+def test_superseded_share_is_skipped(make_cache, encodes):
+    cache = make_cache()
+
+    async def scenario():
+        cache.set("Dealers", "table", ["before"])
+        cache.publish("Dealers", "table")  # changed in place before the share ran
+        await cache.flush()
+
+    asyncio.run(scenario())
+    assert encodes == []
+    assert cache.shared.get("Dealers", "table") is None
+
+
+def test_shared_entry_changed_locally_while_read_is_ignored(make_cache):
+    first, second = make_cache(), make_cache()
+
+    async def scenario():
+        first.set("Dealers", "table", ["shared"])
+        await first.flush()
+
+        async def load():
+            return ["loaded"]
+
+        reading = asyncio.ensure_future(second.get_or_load("Dealers", "table", load))
+        await asyncio.sleep(0)  # the shared tier read is now running in a thread
+        second.set("Dealers", "table", ["local"])
+        return await reading
+
+    assert asyncio.run(scenario()) == ["loaded"]
@@ -0,0 +1,107 @@
+"""SheetTable indexes and the stage ordering built on it."""
+
+import asyncio
+
+from app.services.sheet_table import SheetTable
+from tests.conftest import SPREADSHEET_ID
+
+COLUMNS = ["stage_order", "stage_code", "display_name", "is_final_stage"]
+
+
+def make_table() -> SheetTable:
+    rows = [
+        {"stage_order": "10", "stage_code": "TEN"},
+        {"stage_order": "2", "stage_code": "TWO"},
+        {"stage_order": None, "stage_code": "BLANK"},
+        {"stage_order": "x", "stage_code": "TEXT"},
+        {"stage_order": "1", "stage_code": "ONE"},
+    ]
+    return SheetTable("WorkflowStages", COLUMNS, rows, index_fields=["stage_code"])
+
+
+def codes(rows: list[dict]) -> list[str]:
+    return [row["stage_code"] for row in rows]
+
+
+def test_sorted_by_orders_numerically_with_blanks_last():
+    table = make_table()
+    assert codes(table.sorted_by("stage_order")) == ["ONE", "TWO", "TEN", "BLANK", "TEXT"]
+    assert codes(table.rows) == ["TEN", "TWO", "BLANK", "TEXT", "ONE"]  # sheet order untouched
+
+
+def test_sorted_by_follows_writes():
+    table = make_table()
+    table.sorted_by("stage_order")
+    table.update("2", {"stage_order": "20"})
+    table.append([{"stage_order": "5", "stage_code": "FIVE"}])
+    assert codes(table.sorted_by("stage_order")) == ["ONE", "FIVE", "TEN", "TWO", "BLANK", "TEXT"]
+
+
+def test_index_lookups_follow_updates():
+    table = make_table()
+    table.update("1", {"stage_code": "FIRST"})
+    assert table.get("1")["stage_code"] == "FIRST"
+    assert table.filter({"stage_code": "FIRST"}) == [table.get("1")]
+    assert table.filter({"stage_code": "ONE"}) == []
+
+
+def test_workflow_stages_with_blank_order_cell(fake, make_sheets):
+    sheets = make_sheets()
+    fake.edit(SPREADSHEET_ID, "WorkflowStages!A2", [[""]])
+    fake.edit(SPREADSHEET_ID, "WorkflowStages!A3", [["12"]])
+    
+    stages = asyncio.run(sheets.get_workflow_stages())
+    orders = [stage["stage_order"] for stage in stages]
+    assert orders[-2:] == ["12", ""]
+    assert orders[:-2] == sorted(orders[:-2], key=int)
+
+
+def test_copy_is_independent_of_the_original():
+    table = make_table()
+    table.sorted_by("stage_order")
+    original_rows = table.rows
+    copy = table.copy()
+    copy.update("2", {"stage_code": "TWICE"})
+    copy.append([{"stage_order": "3", "stage_code": "THREE"}])
+    
+    assert table.rows is original_rows
+    assert codes(table.rows) == ["TEN", "TWO", "BLANK", "TEXT", "ONE"]
+    assert table.filter({"stage_code": "TWICE"}) == [] == table.filter({"stage_code": "THREE"})
+    assert table.filter({"stage_code": "TWO"}) == [table.get("2")]
+    assert codes(table.sorted_by("stage_order")) == ["ONE", "TWO", "TEN", "BLANK", "TEXT"]
+    assert codes(copy.sorted_by("stage_order")) == ["ONE", "TWICE", "THREE", "TEN", "BLANK", "TEXT"]
+    assert copy.filter({"stage_code": "TWICE"}) == [copy.get("2")]
+
+
+def test_as_of_undoes_writes_after_the_pinned_revision():
+    table = make_table()
+    revision = table.pin()
+    table.update("2", {"stage_code": "TWICE"})
+    table.append([{"stage_order": "3", "stage_code": "THREE"}, {"stage_order": "1", "stage_code": "DUPLICATE"}])
+    table.update("3", {"stage_order": "30"})
+    
+    before = table.as_of(revision)
+    assert codes(before.rows) == ["TEN", "TWO", "BLANK", "TEXT", "ONE"]
+    assert before.get("3") is None and before.get("1")["stage_code"] == "ONE"
+    assert before.filter({"stage_code": "TWO"}) == [before.get("2")]
+    assert before.filter({"stage_code": "TWICE"}) == [] == before.filter({"stage_code": "THREE"})
+    assert codes(table.rows) == ["TEN", "TWICE", "BLANK", "TEXT", "ONE", "THREE", "DUPLICATE"]  # untouched
+    
+    table.unpin(revision)
+    assert table._history == []
+    table.update("10", {"display_name": "Ten"})
+    assert table._history == []  # nothing recorded without a pinned reader
+
+
+def test_buckets_change_in_place_until_shared_with_a_copy():
+    table = make_table()
+    bucket = table.indexes["stage_code"]["TWO"]
+    table.update("2", {"display_name": "Two"})
+    assert table.indexes["stage_code"]["TWO"] is bucket  # not shared: no copy
+    
+    copy = table.copy()
+    table.update("2", {"display_name": "Second"})
+    assert table.indexes["stage_code"]["TWO"] is not bucket
+    assert copy.indexes["stage_code"]["TWO"] is bucket
+    assert copy.filter({"stage_code": "TWO"})[0]["display_name"] == "Two"
+    assert table.filter({"stage_code": "TWO"})[0]["display_name"] == "Second"
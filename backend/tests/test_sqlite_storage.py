@@ -0,0 +1,155 @@
+"""SqliteStorage transactions under concurrent requests."""
+
+import asyncio
+
+import pytest
+
+from app.models.payment import PaymentCreate
+from app.services.id_allocator import IdAllocator
+from app.services.payment_service import PaymentService
+from app.services.sheets_service import SheetsService
+from app.services.sqlite_storage import SqliteStorage
+from tests.conftest import SPREADSHEET_ID
+
+
+@pytest.fixture
+def storage(tmp_path):
+    db = SqliteStorage(
+        tmp_path / "test.sqlite3",
+        id_allocator=IdAllocator(mode="reserved", block_size=2, state_path=tmp_path / "ids.json"),
+    )
+    yield db
+    db.close()
+
+
+async def seed_invoice(storage: SqliteStorage) -> tuple[dict, dict]:
+    dealer = await storage.create_dealer({"name": "Dealer", "current_balance": 0})
+    invoice = await storage.create_invoice(
+        {"invoice_type": "Sales", "dealer_id": dealer["dealer_id"], "invoice_date": "2024-01-01"},
+        [{"product_id": "VAR-00001", "quantity": 1, "unit_price": 1000}],
+    )
+    return dealer, invoice
+
+
+def test_concurrent_payments_take_turns_on_the_connection(storage):
+    payments = PaymentService(storage)
+    
+    async def scenario():
+        dealer, invoice = await seed_invoice(storage)
+        created = await asyncio.gather(*(
+            payments.create_payment(PaymentCreate(
+                payment_type="IN", related_to="INVOICE", invoice_id=invoice["invoice_id"],
+                dealer_id=dealer["dealer_id"], amount=100, payment_mode="Cash", payment_date="2024-01-02",
+            ))
+            for _ in range(6)
+        ))
+        return created, await storage.get_invoice(invoice["invoice_id"])
+    
+    created, invoice = asyncio.run(scenario())
+    assert all(payment is not None for payment in created)
+    assert len({payment.payment_id for payment in created}) == 6
+    assert invoice["amount_paid"] == 600
+
+
+def test_rolled_back_batch_does_not_affect_concurrent_writes(storage):
+    sheet = storage.SHEETS["dealers"]
+    columns = storage.SHEET_COLUMNS[sheet]
+    
+    async def failing():
+        with pytest.raises(RuntimeError):
+            async with storage.batch():
+                await storage.append_rows(sheet, columns, [{"name": "rolled back"}], id_prefix="DLR")
+                await asyncio.sleep(0.01)
+                raise RuntimeError("abort")
+    
+    async def succeeding():
+        await asyncio.sleep(0)
+        return await storage.append_rows(sheet, columns, [{"name": "kept"}], id_prefix="DLR")
+    
+    async def scenario():
+        await asyncio.gather(failing(), succeeding())
+        return await storage.get_all_rows(sheet, columns)
+    
+    assert [row["name"] for row in asyncio.run(scenario())] == ["kept"]
+
+
+def test_concurrent_updates_keep_each_others_fields(storage):
+    sheet = storage.SHEETS["dealers"]
+    columns = storage.SHEET_COLUMNS[sheet]
+    
+    async def scenario():
+        dealer = await storage.create_dealer({"name": "Dealer"})
+        dealer_id = dealer["dealer_id"]
+        
+        async def in_batch():
+            async with storage.batch():
+                await asyncio.sleep(0.01)  # the other update starts meanwhile
+                await storage.update_row(sheet, columns, "dealer_id", dealer_id, {"notes": "from batch"})
+        
+        async def single():
+            await asyncio.sleep(0)  # the batch's transaction is open now
+            assert await storage.update_row(sheet, columns, "dealer_id", dealer_id, {"phone": "98250 00001"})
+        
+        await asyncio.gather(in_batch(), single())
+        return await storage.get_row_by_id(sheet, columns, "dealer_id", dealer_id)
+    
+    row = asyncio.run(scenario())
+    assert (row["notes"], row["phone"]) == ("from batch", "98250 00001")
+
+
+def test_reads_outside_a_batch_see_only_committed_rows(storage):
+    sheet = storage.SHEETS["dealers"]
+    columns = storage.SHEET_COLUMNS[sheet]
+    
+    async def scenario():
+        written, read = asyncio.Event(), asyncio.Event()
+        
+        async def in_batch():
+            async with storage.batch():
+                await storage.append_rows(sheet, columns, [{"name": "uncommitted"}], id_prefix="DLR")
+                inside = await storage.get_all_rows(sheet, columns)
+                written.set()
+                await read.wait()
+            return [row["name"] for row in inside]
+        
+        async def outside():
+            await written.wait()
+            rows = await storage.get_all_rows(sheet, columns)
+            read.set()
+            return [row["name"] for row in rows]
+        
+        return await asyncio.gather(in_batch(), outside())
+    
+    inside, outside = asyncio.run(scenario())
+    assert inside == ["uncommitted"]  # the batch reads its own writes
+    assert outside == []
+
+
+def test_unavailable_mirror_is_turned_off(tmp_path, capsys):
+    unauthenticated = SheetsService("", "")
+    db = SqliteStorage(tmp_path / "test.sqlite3", mirror=unauthenticated)
+    
+    async def scenario():
+        for i in range(3):
+            await db.create_dealer({"name": f"Dealer {i}"})
+        await db.flush()
+    
+    try:
+        asyncio.run(scenario())
+    finally:
+        db.close()
+    assert db.mirror is None
+    assert db.mirror_failures == 0
+    assert capsys.readouterr().out.count("won't be mirrored") == 1
+
+
+def test_available_mirror_receives_commits(tmp_path, fake, make_sheets):
+    db = SqliteStorage(tmp_path / "test.sqlite3", mirror=make_sheets())
+    
+    async def scenario():
+        await db.create_dealer({"name": "Mirrored"})
+        await db.flush()
+    
+    asyncio.run(scenario())
+    assert "Mirrored" in fake._sheet(SPREADSHEET_ID, "Dealers")[-1]
+    assert db.mirror_failures == 0
@@ -0,0 +1,98 @@
+"""Write batches: coalesced commits, discarded blocks and failed commits."""
+
+import asyncio
+
+from tests.conftest import SPREADSHEET_ID
+
+
+def dealer_rows(fake) -> list[list]:
+    return fake._sheet(SPREADSHEET_ID, "Dealers")
+
+
+def test_batch_commits_with_one_call_per_kind(fake, make_sheets):
+    sheets = make_sheets()
+
+    async def scenario():
+        await sheets.load_all()
+        fake.reset_stats()
+        async with sheets.batch() as batch:
+            first = await sheets.create_dealer({"name": "First"})
+            second = await sheets.create_dealer({"name": "Second"})
+            await sheets.update_dealer("DLR-00002", {"notes": "one"})
+            await sheets.update_dealer("DLR-00002", {"phone": "98250 00002"})
+            await sheets.update_dealer("DLR-00009", {"notes": "nine"})
+            assert sum(fake.calls.values()) == 0  # nothing sent before the block ends
+        assert batch.committed
+        return first, second, await sheets.get_dealer("DLR-00002")
+
+    first, second, updated = asyncio.run(scenario())
+    assert fake.calls["values.append"] == 1
+    assert fake.calls["values.batchUpdate"] == 1
+    assert fake.calls["values.batchGet"] == 0  # the row index is current: no id-cell check
+    assert (updated["notes"], updated["phone"]) == ("one", "98250 00002")  # both updates merged
+    assert {"one", "98250 00002"} <= set(dealer_rows(fake)[2])
+    ids = [row[0] for row in dealer_rows(fake)[1:]]
+    assert ids[-2:] == [first["dealer_id"], second["dealer_id"]]
+
+
+def test_writes_discarded_when_block_raises(fake, make_sheets):
+    sheets = make_sheets()
+
+    async def scenario():
+        await sheets.load_all()
+        fake.reset_stats()
+        try:
+            async with sheets.batch():
+                await sheets.create_dealer({"name": "Never"})
+                await sheets.update_dealer("DLR-00003", {"notes": "never"})
+                raise ValueError("validation failed")
+        except ValueError:
+            pass
+        return await sheets.get_dealer("DLR-00003")
+
+    dealer = asyncio.run(scenario())
+    assert sum(fake.calls.values()) == 0
+    assert len(dealer_rows(fake)) == 21
+    assert dealer["notes"] != "never"
+
+
+def test_failed_commit_is_reported_and_not_cached(fake, make_sheets):
+    sheets = make_sheets()
+
+    async def scenario():
+        await sheets.load_all()
+        fake.error_rate = 1.0
+        async with sheets.batch() as batch:
+            await sheets.update_dealer("DLR-00004", {"notes": "lost"})
+        fake.error_rate = 0
+        return batch, await sheets.get_dealer("DLR-00004")
+
+    batch, dealer = asyncio.run(scenario())
+    assert batch.failed
+    assert dealer["notes"] != "lost"
+    assert "lost" not in dealer_rows(fake)[4]
+
+
+def test_partly_failed_commit_keeps_written_sheets_cached(fake, make_sheets):
+    sheets = make_sheets()
+    payments = sheets.SHEETS["payments"]
+
+    async def scenario():
+        await sheets.load_all()
+        dealers = sheets.cache.peek("Dealers", sheets.TABLE)
+        del fake._spreadsheets[SPREADSHEET_ID][payments]  # its append will fail
+        async with sheets.batch() as batch:
+            created = await sheets.create_dealer({"name": "Appended"})
+            await sheets.update_dealer("DLR-00005", {"notes": "not sent"})
+            await sheets.append_rows(payments, sheets.SHEET_COLUMNS[payments], [{"payment_id": "PAY-LOST"}])
+        return batch, dealers, created
+
+    batch, dealers, created = asyncio.run(scenario())
+    assert batch.failed
+    assert fake.calls["values.batchUpdate"] == 0  # updates aren't added to a failed commit
+    assert dealer_rows(fake)[-1][0] == created["dealer_id"]
+    # The append that went through is patched in; the update that wasn't sent isn't
+    assert sheets.cache.peek("Dealers", sheets.TABLE) is dealers
+    assert dealers.get(created["dealer_id"])["name"] == "Appended"
+    assert dealers.get("DLR-00005")["notes"] != "not sent"
+    assert sheets.cache.peek(payments, sheets.TABLE) is None  # reloaded on next read